@@ -6,13 +6,16 @@ except ImportError:
     pass
 from apis_core.apis_metainfo.models import *
 from apis_core.generic.serializers import GenericHyperlinkedModelSerializer
+from apis_core.generic.pagination import GenericPagination
+from apis_core.generic.api_views import ValuesListMixin
+from apis_core.generic.api_renderers import FastJSONRenderer
 
 # from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 from django.conf import settings
-from rest_framework import pagination, serializers, viewsets
+from django.db.models import ForeignKey, Q
+from rest_framework import serializers, viewsets
 from rest_framework import renderers
-from rest_framework.response import Response
 
 from drf_spectacular.utils import (
     extend_schema,
@@ -22,6 +25,7 @@ from drf_spectacular.types import OpenApiTypes
 from django_filters import rest_framework as filters
 from .api_renderers import NetJsonRenderer
 from .apis_relations.models import Triple, Property
+from .apis_metainfo.models import RootObject, InheritanceForeignKey
 from apis_core.utils import caching
 from apis_core.core.mixins import ListViewObjectFilterMixin
 
@@ -45,18 +49,8 @@ def create_query_parameters(entity):
         print(f.name, f.__class__.__name__)
 
 
-class CustomPagination(pagination.LimitOffsetPagination):
-    def get_paginated_response(self, data):
-        return Response(
-            {
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link(),
-                "count": self.count,
-                "limit": self.limit,
-                "offset": self.offset,
-                "results": data,
-            }
-        )
+class CustomPagination(GenericPagination):
+    pass
 
 
 class ApisBaseSerializer(serializers.ModelSerializer):
@@ -92,6 +86,7 @@ class EntitySerializer(ApisBaseSerializer):
         return instance.__class__.__name__
 
     class Meta(ApisBaseSerializer.Meta):
+        model = RootObject
         fields = ApisBaseSerializer.Meta.fields + ["type"]
 
 
@@ -110,6 +105,22 @@ class LabelSerializer(ApisBaseSerializer):
         ]
 
 
+class RelatedPropertyForwardSerializer(ApisBaseSerializer):
+    label = serializers.CharField(source="name_forward")
+
+    class Meta:
+        model = Property
+        fields = ["id", "label", "url"]
+
+
+class RelatedPropertyReverseSerializer(ApisBaseSerializer):
+    label = serializers.CharField(source="name_reverse")
+
+    class Meta:
+        model = Property
+        fields = ["id", "label", "url"]
+
+
 class RelatedTripleSerializer(ApisBaseSerializer):
     relation_type = serializers.SerializerMethodField(
         method_name="add_related_property"
@@ -124,35 +135,23 @@ class RelatedTripleSerializer(ApisBaseSerializer):
         self._pk_instance = kwargs.pop("pk_instance")
         super(RelatedTripleSerializer, self).__init__(*args, **kwargs)
 
+    # we compare the foreign key values instead of `triple.subj.pk`, so
+    # we do not have to fetch the subclass instances for that
     def add_related_property(self, triple):
-        if triple.subj.pk == self._pk_instance:
-
-            class RelatedPropertySerializer(ApisBaseSerializer):
-                label = serializers.CharField(source="name_forward")
-
-                class Meta:
-                    model = Property
-                    fields = ["id", "label", "url"]
-
-        elif triple.obj.pk == self._pk_instance:
-
-            class RelatedPropertySerializer(ApisBaseSerializer):
-                label = serializers.CharField(source="name_reverse")
-
-                class Meta:
-                    model = Property
-                    fields = ["id", "label", "url"]
-
+        if triple.subj_id == self._pk_instance:
+            serializer = RelatedPropertyForwardSerializer
+        elif triple.obj_id == self._pk_instance:
+            serializer = RelatedPropertyReverseSerializer
         else:
             raise Exception(
                 "Did not find entity in triple where it is supposed to be. Something must be wrong with the code."
             )
-        return RelatedPropertySerializer(triple.prop, context=self.context).data
+        return serializer(triple.prop, context=self.context).data
 
     def add_related_entity(self, triple):
-        if triple.subj.pk == self._pk_instance:
+        if triple.subj_id == self._pk_instance:
             return EntitySerializer(triple.obj, context=self.context).data
-        elif triple.obj.pk == self._pk_instance:
+        elif triple.obj_id == self._pk_instance:
             return EntitySerializer(triple.subj, context=self.context).data
         else:
             raise Exception(
@@ -160,6 +159,50 @@ class RelatedTripleSerializer(ApisBaseSerializer):
             )
 
 
+def get_related_triples(instance):
+    """
+    Return the triples an instance is part of, either as subject or as
+    object. If the model of the instance defines a `get_triples` method,
+    that one is used instead.
+    The properties are fetched in the same query and the subjects and
+    objects are prefetched in bulk, using the subclass aware descriptors
+    of the `InheritanceForeignKey` fields.
+    """
+    if callable(getattr(instance, "get_triples", None)):
+        return instance.get_triples()
+    return (
+        Triple.objects.filter_for_user()
+        .filter(Q(subj_id=instance.pk) | Q(obj_id=instance.pk))
+        .select_related("prop")
+        .prefetch_related("subj", "obj")
+        .order_by("pk")
+    )
+
+
+def get_queryset_plan(model, exclude: list = []) -> tuple:
+    """
+    Derive the `select_related` and `prefetch_related` lookups for the
+    fields of a model that end up in the serialization.
+    Forward foreign keys are joined using `select_related`, except for
+    `InheritanceForeignKey` fields: joining those would only give us
+    instances of the parent class, so they are prefetched, which uses their
+    descriptors to fetch the subclass instances in bulk. Many to many
+    fields are prefetched as well.
+    """
+    select_related = []
+    prefetch_related = []
+    for field in model._meta.get_fields():
+        if field.name in exclude or field.auto_created or not field.concrete:
+            continue
+        if isinstance(field, InheritanceForeignKey):
+            prefetch_related.append(field.name)
+        elif field.many_to_many:
+            prefetch_related.append(field.name)
+        elif isinstance(field, ForeignKey) and not field.remote_field.parent_link:
+            select_related.append(field.name)
+    return select_related, prefetch_related
+
+
 def generic_serializer_creation_factory():
     lst_cont = caching.get_all_contenttype_classes()
     not_allowed_filter_fields = [
@@ -170,8 +213,6 @@ def generic_serializer_creation_factory():
         "metadata",
     ]
     for cont in lst_cont:
-        prefetch_rel = []
-        select_related = []
         test_search = getattr(settings, cont.__module__.split(".")[1].upper(), False)
         entity_str = str(cont.__name__).replace(" ", "")
         entity = cont
@@ -190,11 +231,7 @@ def generic_serializer_creation_factory():
         for x in exclude_lst:
             if x in entity_field_name_list:
                 exclude_lst_fin.append(x)
-        for f in entity._meta.get_fields():
-            if f.__class__.__name__ == "ManyToManyField":
-                prefetch_rel.append(f.name)
-            elif f.__class__.__name__ == "ForeignKey":
-                select_related.append(f.name)
+        select_related, prefetch_rel = get_queryset_plan(entity, exclude_lst_fin)
 
         class TemplateSerializer(GenericHyperlinkedModelSerializer):
 
@@ -270,13 +307,18 @@ def generic_serializer_creation_factory():
                     if hasattr(entity, "triple_set_from_subj") or hasattr(
                         entity, "triple_set_from_obj"
                     ):
-                        self.fields["relations"] = RelatedTripleSerializer(
-                            read_only=True,
-                            source="get_triples",
-                            many=True,
-                            pk_instance=entity.pk,
+                        self.fields["relations"] = serializers.SerializerMethodField(
+                            method_name="add_relations"
                         )
 
+            def add_relations(self, obj):
+                return RelatedTripleSerializer(
+                    get_related_triples(obj),
+                    many=True,
+                    pk_instance=obj.pk,
+                    context=self.context,
+                ).data
+
         TemplateSerializerRetrieve.__name__ = (
             TemplateSerializerRetrieve.__qualname__
         ) = f"{entity_str.title().replace(' ', '')}DetailSerializer"
@@ -336,7 +378,9 @@ def generic_serializer_creation_factory():
 
         filterset_dict["Meta"] = MetaFilter
 
-        class TemplateViewSet(ListViewObjectFilterMixin, viewsets.ModelViewSet):
+        class TemplateViewSet(
+            ListViewObjectFilterMixin, ValuesListMixin, viewsets.ModelViewSet
+        ):
 
             _select_related = select_related
             _prefetch_rel = prefetch_rel
@@ -350,6 +394,7 @@ def generic_serializer_creation_factory():
                 renderers.JSONRenderer,
                 renderers.BrowsableAPIRenderer,
                 NetJsonRenderer,
+                FastJSONRenderer,
             )
             _serializer_class = TemplateSerializer
             _serializer_class_retrieve = TemplateSerializerRetrieve
@@ -1,7 +1,11 @@
 import re
 
+from django.apps import apps
 from django.conf import settings
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
+from django.template import TemplateDoesNotExist
+from rest_framework import renderers
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.generics import GenericAPIView
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import FileUploadParser
@@ -11,10 +15,16 @@ from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from apis_core.apis_metainfo.models import Uri, RootObject
+from apis_core.apis_metainfo.resolvers import get_root_object, get_root_object_id_by_uri
 from .api_renderers import EntityToTEI
+from .models import AbstractEntity
+from .tei import tei_export, tei_templates
 from .serializers_generic import EntitySerializer
+from apis_core.generic.helpers import permission_fullname
 from apis_core.utils import caching
+from apis_core.utils.helpers import get_or_create_objects_from_uris
 from apis_core.utils.utils import get_python_safe_module_path
+from apis_core.utils.renderers.tei import TeiRenderer
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -36,14 +46,21 @@ class GetEntityGeneric(GenericAPIView):
         renderer_classes += rend_add
 
     def get_object(self, pk, request):
-        try:
-            return RootObject.objects_inheritance.get_subclass(pk=pk)
-        except RootObject.DoesNotExist:
-            uri2 = Uri.objects.filter(uri=request.build_absolute_uri())
-            if uri2.count() == 1:
-                return RootObject.objects_inheritance.get_subclass(pk=uri2[0].entity_id)
-            else:
-                raise Http404
+        """
+        Return the entity with the primary key `pk`. If there is none, the
+        url of the request may be an uri of an entity of another instance,
+        which was imported into this one.
+        """
+        entity = get_root_object(pk)
+        if entity is None:
+            root_object_id = get_root_object_id_by_uri(
+                request.build_absolute_uri(request.path)
+            )
+            if root_object_id is not None:
+                entity = get_root_object(root_object_id)
+        if entity is None:
+            raise Http404
+        return entity
 
     def get(self, request, pk):
         ent = self.get_object(pk, request)
@@ -59,6 +76,51 @@ class GetEntityGeneric(GenericAPIView):
         return Response(res.data)
 
 
+class TeiExport(APIView):
+    """
+    Stream the entities of one or more entity models as one TEI document.
+    The models are passed as `app_label.model` in the (comma separated)
+    `model` parameter, the optional `title` is used in the TEI header.
+    """
+
+    renderer_classes = (TeiRenderer,)
+
+    def handle_exception(self, exc):
+        # errors are not TEI documents, so we render them as JSON
+        self.request.accepted_renderer = renderers.JSONRenderer()
+        self.request.accepted_media_type = "application/json"
+        return super().handle_exception(exc)
+
+    def get(self, request, *args, **kwargs):
+        labels = request.query_params.get("model", "")
+        querysets = []
+        for label in [label.strip() for label in labels.split(",") if label.strip()]:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                raise ValidationError(f"`{label}` is not a model")
+            if not issubclass(model, AbstractEntity):
+                raise ValidationError(f"`{label}` is not an entity model")
+            querysets.append(model.objects.all())
+        if not querysets:
+            raise ValidationError("`model` has to list at least one model")
+        # the response is streamed, so errors have to be raised before
+        try:
+            templates = tei_templates([queryset.model for queryset in querysets])
+        except TemplateDoesNotExist as e:
+            raise ValidationError(f"There is no TEI template `{e}`")
+        document = tei_export(
+            querysets,
+            title=request.query_params.get("title", ""),
+            request=request,
+            templates=templates,
+        )
+        return StreamingHttpResponse(
+            (chunk.encode("utf-8") for chunk in document),
+            content_type="text/xml; charset=utf-8",
+        )
+
+
 class ResolveAbbreviations(APIView):
     parser_classes = (FileUploadParser,)
 
@@ -97,3 +159,33 @@ class GetOrCreateEntity(APIView):
             ),
         }
         return Response(res)
+
+
+class GetOrCreateEntities(APIView):
+    """
+    The batch version of `GetOrCreateEntity`: POST a `model` (as
+    `app_label.model`) and a list of `uris`. The uris that are already
+    known are resolved, the other ones are imported using the importer
+    of the model. The response maps the uris to the ids of the entities
+    (`results`) and lists the uris that failed (`errors`). The user
+    needs the permission to add entities of the model.
+    """
+
+    def post(self, request):
+        label = request.data.get("model", "")
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError):
+            raise ValidationError(f"`{label}` is not a model")
+        if not issubclass(model, AbstractEntity):
+            raise ValidationError(f"`{label}` is not an entity model")
+        if not request.user.has_perm(permission_fullname("add", model)):
+            raise PermissionDenied()
+        uris = request.data.get("uris")
+        if not isinstance(uris, list) or not all(isinstance(uri, str) for uri in uris):
+            raise ValidationError("`uris` has to be a list of uris")
+        max_uris = getattr(settings, "APIS_URI_RESOLVE_MAX_URIS", 1000)
+        if len(uris) > max_uris:
+            raise ValidationError(f"`uris` can not list more than {max_uris} uris")
+        ids, errors = get_or_create_objects_from_uris(uris, model)
+        return Response({"results": ids, "errors": errors})
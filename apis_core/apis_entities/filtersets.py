@@ -1,7 +1,8 @@
 import django_filters
 from django.db import models
 from apis_core.generic.filtersets import GenericFilterSet, GenericFilterSetForm
-from apis_core.utils.filtermethods import related_entity_name
+from django.db.models import Q
+from apis_core.utils.filtermethods import related_entity_name, related_to
 from apis_core.apis_relations.models import Property
 
 ABSTRACT_ENTITY_FILTERS_EXCLUDE = [
@@ -24,8 +25,7 @@ ABSTRACT_ENTITY_FILTERS_EXCLUDE = [
 
 def related_property(queryset, name, value):
     p = Property.objects.get(name_forward=value)
-    queryset = queryset.filter(triple_set_from_subj__prop=p).distinct()
-    return queryset
+    return related_to(queryset, objects=Q(prop=p))
 
 
 class AbstractEntityFilterSetForm(GenericFilterSetForm):
@@ -0,0 +1,48 @@
+import sys
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from apis_core.apis_entities.tei import tei_export
+
+
+class Command(BaseCommand):
+    help = "Export the entities of one or more models as one TEI document."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="+",
+            help="The models to export, as `app_label.model`.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Path of the file to write the TEI to. Defaults to stdout.",
+        )
+        parser.add_argument(
+            "--title", default="", help="The title used in the TEI header."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of entities fetched and rendered at once.",
+        )
+
+    def handle(self, *args, **options):
+        querysets = []
+        for label in options["models"]:
+            try:
+                querysets.append(apps.get_model(label).objects.all())
+            except (LookupError, ValueError):
+                raise CommandError(f"{label} is not a model")
+        document = tei_export(
+            querysets, title=options["title"], batch_size=options["batch_size"]
+        )
+        output = open(options["output"], "w") if options["output"] else sys.stdout
+        try:
+            for chunk in document:
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -5,10 +5,13 @@ from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
+from django.db.models import Q
 from django.db.models.query import QuerySet
 
 from apis_core.utils import caching
 from apis_core.apis_metainfo.models import RootObject
+from apis_core.apis_relations import adjacency
 from apis_core.apis_relations.models import TempTriple
 from apis_core.apis_entities import signals
 
@@ -150,6 +153,7 @@ class AbstractEntity(RootObject):
         # TODO: check if these imports can be put to top of module without
         #  causing circular import issues.
         from apis_core.apis_metainfo.models import Uri
+        from apis_core.apis_metainfo.resolvers import uri_cache
 
         e_a = type(self).__name__
         self_model_class = ContentType.objects.get(model__iexact=e_a).model_class()
@@ -178,8 +182,16 @@ class AbstractEntity(RootObject):
                         if s not in sl:
                             getattr(self, f.name).add(s)
             Uri.objects.filter(root_object=ent).update(root_object=self)
-            TempTriple.objects.filter(obj__id=ent.id).update(obj=self)
-            TempTriple.objects.filter(subj__id=ent.id).update(subj=self)
+            # `update` does not send the signals that clear the uri cache
+            uri_cache.clear()
+            # `update` does not set the `modified` timestamps
+            TempTriple.objects.filter(obj__id=ent.id).update(
+                obj=self, modified=timezone.now()
+            )
+            TempTriple.objects.filter(subj__id=ent.id).update(
+                subj=self, modified=timezone.now()
+            )
+        adjacency.sync(TempTriple.objects.filter(Q(subj=self) | Q(obj=self)))
 
         for ent in entities:
             self.merge_fields(ent)
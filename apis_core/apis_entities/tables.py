@@ -1,4 +1,5 @@
 from apis_core.generic.helpers import permission_fullname
+from apis_core.generic.permissions import get_permission_snapshot
 from apis_core.generic.tables import GenericTable, ActionColumn
 
 
@@ -19,5 +20,6 @@ class AbstractEntityTable(GenericTable):
     def before_render(self, request):
         super().before_render(request)
         if model := getattr(self.Meta, "model"):
-            if not request.user.has_perm(permission_fullname("create", model)):
+            permissions = get_permission_snapshot(request)
+            if not permissions.has_perm(permission_fullname("create", model)):
                 self.columns.hide("noduplicate")
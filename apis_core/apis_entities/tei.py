@@ -0,0 +1,125 @@
+"""
+Bulk export of entities as one TEI document.
+
+Every entity is rendered using the template `<app_label>/tei/<Model>.xml`
+(falling back to `apis_entities/tei/<Model>.xml`) and the entities of one
+model are wrapped in the matching TEI list element (i.e. `listPerson`).
+The templates are compiled once, the entities are fetched in batches with
+their many to many fields and uris prefetched, and the document is yielded
+batch by batch, so the memory used does not depend on the number of
+entities.
+"""
+
+from django.db.models import ManyToManyField
+
+from apis_core.utils.renderers.tei import get_template, select_template
+
+DOCUMENT_TEMPLATE = "apis_entities/tei/tei.xml"
+# a marker, that is rendered into the document template in place of
+# the entities and is used to split the document into its head and tail
+ENTITIES_MARKER = "<!-- apis entities -->"
+
+TEI_LISTS = {
+    "person": "listPerson",
+    "place": "listPlace",
+    "institution": "listOrg",
+    "org": "listOrg",
+    "event": "listEvent",
+    "work": "listBibl",
+}
+
+
+def tei_list_element(model) -> tuple:
+    """
+    Return the opening and closing tag of the list element for `model`.
+    """
+    name = model._meta.model_name
+    if name in TEI_LISTS:
+        return f"<{TEI_LISTS[name]}>", f"</{TEI_LISTS[name]}>"
+    return f'<list type="{name}">', "</list>"
+
+
+def tei_template(model):
+    return select_template(
+        (
+            f"{model._meta.app_label}/tei/{model.__name__}.xml",
+            f"apis_entities/tei/{model.__name__}.xml",
+        )
+    )
+
+
+def tei_templates(models: list) -> dict:
+    """
+    Compile the document template (keyed by None) and the templates of
+    `models`. Raises `TemplateDoesNotExist` if one of them is missing,
+    which lets callers check the templates before they start streaming
+    a document and then pass them to `tei_export`.
+    """
+    templates = {model: tei_template(model) for model in models}
+    templates[None] = get_template(DOCUMENT_TEMPLATE)
+    return templates
+
+
+def tei_prefetch_lookups(model) -> list:
+    """
+    The lookups prefetched for every batch: the many to many fields
+    and the uris of the entities.
+    """
+    lookups = [
+        field.name
+        for field in model._meta.get_fields()
+        if isinstance(field, ManyToManyField)
+    ]
+    if hasattr(model, "uri_set"):
+        lookups.append("uri_set")
+    return lookups
+
+
+def tei_batches(queryset, batch_size: int = 500):
+    """
+    Yield the objects of `queryset` in lists of at most `batch_size`
+    objects. The batches are fetched using keyset pagination on the
+    primary key and the prefetch lookups are run per batch.
+    """
+    queryset = queryset.order_by("pk")
+    last = None
+    while True:
+        batch = queryset if last is None else queryset.filter(pk__gt=last)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1].pk
+
+
+def tei_export(
+    querysets: list,
+    title: str = "",
+    batch_size: int = 500,
+    request=None,
+    templates: dict = None,
+):
+    """
+    Render the entities of the `querysets` into one TEI document. This is
+    a generator yielding the document in pieces of one batch each. The
+    `templates` default to the `tei_templates` of the models.
+    """
+    if templates is None:
+        templates = tei_templates([queryset.model for queryset in querysets])
+    document = templates[None].render(
+        {"title": title, "ent_type": ENTITIES_MARKER}, request=request
+    )
+    head, tail = document.split(ENTITIES_MARKER, 1)
+    yield head
+    for queryset in querysets:
+        model = queryset.model
+        template = templates[model]
+        queryset = queryset.prefetch_related(*tei_prefetch_lookups(model))
+        start, end = tei_list_element(model)
+        yield start
+        for batch in tei_batches(queryset, batch_size):
+            yield "".join(
+                template.render({"object": obj}, request=request) for obj in batch
+            )
+        yield end
+    yield tail
@@ -1,8 +1,11 @@
-from django.contrib.auth.models import User
-from django.test import TestCase
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase, override_settings
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from apis_core.apis_metainfo.models import Uri
+from tests.entities.models import Person
+
 
 class GetTestCase(TestCase):
     @classmethod
@@ -13,3 +16,44 @@ class GetTestCase(TestCase):
         client = APIClient()
         client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
         cls.c = client
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class GetOrCreateEntitiesTestCase(TestCase):
+    url = "/apis/entities/getorcreateentities/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="lauren", password="pas_1234$")
+        self.user.user_permissions.add(Permission.objects.get(codename="add_person"))
+        self.client.force_login(self.user)
+
+    def test_get_or_create_entities(self):
+        person = Person.objects.create(name="Lauren")
+        Uri.objects.create(uri="https://example.org/entity/lauren", root_object=person)
+        data = {
+            "model": "entities.person",
+            "uris": ["https://example.org/entity/lauren", "lauren"],
+        }
+        response = self.client.post(self.url, data, content_type="application/json")
+        self.assertEqual(
+            response.json(),
+            {
+                "results": {"https://example.org/entity/lauren": person.pk},
+                "errors": {"lauren": "Not an http(s) uri"},
+            },
+        )
+        data["model"] = "apis_relations.nomodel"
+        response = self.client.post(self.url, data, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_not_an_entity(self):
+        data = {"model": "auth.user", "uris": ["https://example.org/entity/lauren"]}
+        response = self.client.post(self.url, data, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_permission(self):
+        self.user.user_permissions.clear()
+        self.client.force_login(User.objects.get(pk=self.user.pk))
+        data = {"model": "entities.person", "uris": []}
+        response = self.client.post(self.url, data, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
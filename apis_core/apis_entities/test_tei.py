@@ -0,0 +1,91 @@
+import copy
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apis_core.apis_metainfo.models import Uri
+from apis_core.apis_relations.models import Property
+from apis_core.apis_entities.tei import tei_export
+from tests.entities.models import Person
+
+TEMPLATES = copy.deepcopy(settings.TEMPLATES)
+TEMPLATES[0]["APP_DIRS"] = False
+# the tests do not need the context processors
+TEMPLATES[0]["OPTIONS"]["context_processors"] = []
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.locmem.Loader",
+        {
+            "apis_relations/tei/Property.xml": (
+                '<item xml:id="property__{{ object.id }}">{{ object.name_forward }}'
+                "{% for uri in object.uri_set.all %}<idno>{{ uri }}</idno>{% endfor %}"
+                "</item>"
+            ),
+            "entities/tei/Person.xml": (
+                '<person xml:id="person__{{ object.id }}">'
+                "<persName>{{ object.name }}</persName></person>"
+            ),
+        },
+    ),
+    "django.template.loaders.app_directories.Loader",
+]
+
+NS = {"tei": "http://www.tei-c.org/ns/1.0"}
+
+
+@override_settings(TEMPLATES=TEMPLATES, ROOT_URLCONF="tests.urls")
+class TeiExportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.props = [Property.objects.create(name_forward=f"p{i}") for i in range(5)]
+        Uri.objects.create(uri="https://example.org/p0", root_object=cls.props[0])
+        cls.user = User.objects.create_superuser("apis", "apis@example.org", "apis")
+
+    def test_export(self):
+        document = tei_export([Property.objects.all()], title="Props", batch_size=2)
+        # the document head comes before any query is run
+        with self.assertNumQueries(0):
+            head = next(document)
+        # three batches with the entities, their many to many
+        # fields and uris and a last empty batch
+        with self.assertNumQueries(3 * 4 + 1):
+            root = ElementTree.fromstring(head + "".join(document))
+        self.assertEqual(root.find("tei:teiHeader//tei:title", NS).text, "Props")
+        items = root.findall(
+            "tei:text/tei:body/tei:list[@type='property']/tei:item", NS
+        )
+        self.assertEqual([item.text for item in items], [f"p{i}" for i in range(5)])
+        self.assertEqual(items[0].find("tei:idno", NS).text, "https://example.org/p0")
+
+    def test_endpoint(self):
+        Person.objects.create(name="Ada")
+        Person.objects.create(name="Grace")
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get("/apis/api/tei", {"model": "entities.person"})
+        self.assertEqual(response.status_code, 200)
+        root = ElementTree.fromstring(b"".join(response.streaming_content))
+        names = root.findall(".//tei:listPerson/tei:person/tei:persName", NS)
+        self.assertEqual([name.text for name in names], ["Ada", "Grace"])
+
+        response = client.get("/apis/api/tei", {"model": "apis_relations.nothing"})
+        self.assertEqual(response.status_code, 400)
+        # only entity models can be exported
+        for label in ["apis_relations.property", "auth.user"]:
+            response = client.get("/apis/api/tei", {"model": label})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("is not an entity model", response.json()[0])
+
+    def test_endpoint_missing_template(self):
+        # missing templates are reported before the response is streamed
+        templates = copy.deepcopy(TEMPLATES)
+        templates[0]["OPTIONS"]["loaders"] = templates[0]["OPTIONS"]["loaders"][:1]
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with override_settings(TEMPLATES=templates):
+            response = client.get("/apis/api/tei", {"model": "entities.person"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("There is no TEI template", response.json()[0])
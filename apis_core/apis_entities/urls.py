@@ -8,7 +8,7 @@ from .autocomplete3 import (
 )
 
 # from .views import ReversionCompareView TODO: add again when import is fixed
-from .api_views import GetOrCreateEntity
+from .api_views import GetOrCreateEntities, GetOrCreateEntity
 from apis_core.apis_entities.models import AbstractEntity
 from apis_core.generic.views import List, Create, Delete, Detail
 from apis_core.apis_entities.views import (
@@ -96,4 +96,9 @@ urlpatterns = [
         GetOrCreateEntity.as_view(),
         name="GetOrCreateEntity",
     ),
+    path(
+        "getorcreateentities/",
+        GetOrCreateEntities.as_view(),
+        name="GetOrCreateEntities",
+    ),
 ]
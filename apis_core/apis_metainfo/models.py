@@ -1,11 +1,22 @@
+import threading
+import weakref
+from collections import defaultdict
+
 import reversion
+from crum import get_current_user
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.core import serializers
+from django.db import models, transaction
 from django.db.models.fields.related import ForeignKey, ManyToManyField
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from django.forms import model_to_dict
 from model_utils.managers import InheritanceManager
+from reversion.models import Revision, Version
+from reversion.signals import post_revision_commit
 from apis_core.utils.normalize import clean_uri
 from django.core.exceptions import ValidationError, ImproperlyConfigured
 from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
@@ -111,12 +122,84 @@ class Collection(GenericModel, models.Model):
         super().save(*args, **kwargs)
 
 
+def get_concrete_instances(model, pks, using=None) -> dict:
+    """
+    Return a dict mapping the primary keys `pks` of `model` (RootObject or
+    one of its subclasses) to instances of their concrete subclasses.
+    The contenttypes are read from the `self_contenttype` column first,
+    then the objects are fetched using one query per contenttype, that only
+    touches the tables of the concrete model - instead of joining all the
+    subclass tables using `select_subclasses`. Primary keys that do not
+    exist are missing from the result.
+    """
+    manager = model._base_manager.db_manager(using)
+    pks = {pk for pk in pks if pk is not None}
+    grouped = defaultdict(list)
+    for pk, contenttype_id in manager.filter(pk__in=pks).values_list(
+        "pk", "self_contenttype_id"
+    ):
+        grouped[contenttype_id].append(pk)
+    instances = {}
+    for contenttype_id, group in grouped.items():
+        if contenttype_id is None:
+            # objects that were never saved using `RootObject.save`
+            queryset = model.objects_inheritance.db_manager(using).select_subclasses()
+        else:
+            contenttype = ContentType.objects.db_manager(using).get_for_id(
+                contenttype_id
+            )
+            queryset = contenttype.model_class()._base_manager.db_manager(using)
+        instances.update((obj.pk, obj) for obj in queryset.filter(pk__in=group))
+    return instances
+
+
 class InheritanceForwardManyToOneDescriptor(ForwardManyToOneDescriptor):
+    """
+    A forward foreign key descriptor that returns the instances of the
+    concrete subclasses of the related model, using `get_concrete_instances`.
+    Prefetching (`prefetch_related`) the field fetches the related objects
+    grouped by their contenttype, with one query per concrete model.
+    """
+
     def get_queryset(self, **hints):
         return self.field.remote_field.model.objects_inheritance.db_manager(
             hints=hints
         ).select_subclasses()
 
+    def get_object(self, instance):
+        pk = getattr(instance, self.field.attname)
+        related_model = self.field.remote_field.model
+        obj = get_concrete_instances(related_model, [pk], instance._state.db).get(pk)
+        if obj is None:
+            raise related_model.DoesNotExist(
+                f"{related_model._meta.object_name} matching query does not exist."
+            )
+        return obj
+
+    def get_prefetch_querysets(self, instances, querysets=None):
+        if querysets:
+            # custom `Prefetch` querysets are used as they are
+            return super().get_prefetch_querysets(instances, querysets)
+        related = get_concrete_instances(
+            self.field.remote_field.model,
+            [getattr(instance, self.field.attname) for instance in instances],
+            instances[0]._state.db,
+        )
+        return (
+            list(related.values()),
+            self.field.get_foreign_related_value,
+            self.field.get_local_related_value,
+            True,
+            self.field.cache_name,
+            False,
+        )
+
+    def get_prefetch_queryset(self, instances, queryset=None):
+        # Django < 5.0
+        if queryset is not None:
+            return super().get_prefetch_queryset(instances, queryset)
+        return self.get_prefetch_querysets(instances)
+
 
 class InheritanceForeignKey(models.ForeignKey):
     forward_related_accessor_class = InheritanceForwardManyToOneDescriptor
@@ -191,3 +274,99 @@ class Uri(GenericModel, models.Model):
                     )
             except Exception as e:
                 raise ValidationError(f"{e}: {self.uri}")
+
+
+class DeletedVersions:
+    """
+    The versions of the objects deleted in a transaction. They are stored
+    when the transaction is committed, in a revision of their own (or in
+    the active revision, see `add_deletions_to_revision`), so a delete
+    operation - including its cascades and all the rows of a
+    `QuerySet.delete()` - creates one revision.
+    """
+
+    # the pending versions of every database of the current thread. The
+    # callbacks of the transaction hold the only strong references to them,
+    # so if Django drops the callbacks on rollback, the versions are gone
+    _pending = threading.local()
+
+    def __init__(self, using):
+        self.using = using
+        self.versions = []
+        self.user = get_current_user()
+
+    @classmethod
+    def pending(cls) -> weakref.WeakValueDictionary:
+        if not hasattr(cls._pending, "versions"):
+            cls._pending.versions = weakref.WeakValueDictionary()
+        return cls._pending.versions
+
+    @classmethod
+    def find(cls, using):
+        return cls.pending().get(using)
+
+    @classmethod
+    def add(cls, using, version):
+        deletions = cls.find(using)
+        if deletions is not None:
+            deletions.versions.append(version)
+        else:
+            deletions = cls(using)
+            deletions.versions.append(version)
+            cls.pending()[using] = deletions
+            # outside of a transaction this saves the version right away
+            transaction.on_commit(deletions, using=using)
+
+    def save(self, revision):
+        for version in self.versions:
+            version.revision = revision
+        Version.objects.using(self.using).bulk_create(self.versions)
+        self.versions = []
+
+    def __call__(self):
+        if self.pending().get(self.using) is self:
+            del self.pending()[self.using]
+        if self.versions:
+            user = self.user
+            revision = Revision.objects.using(self.using).create(
+                date_created=timezone.now(),
+                user=user if getattr(user, "is_authenticated", False) else None,
+                comment="Deleted",
+            )
+            self.save(revision)
+
+
+@receiver(post_delete, dispatch_uid="add_deletion_to_revision")
+def add_deletion_to_revision(sender, instance, using, **kwargs):
+    """
+    django-reversion only stores versions of objects that still exist in
+    the database, so deletions do not show up in the revision history.
+    If `APIS_DELETION_REVISIONS` is set, we store the last state of deleted
+    objects, which allows the delta datadump to emit tombstones for them.
+    """
+    if not getattr(settings, "APIS_DELETION_REVISIONS", False):
+        return
+    if reversion.is_registered(sender):
+        DeletedVersions.add(
+            using,
+            Version(
+                object_id=str(instance.pk),
+                content_type=ContentType.objects.db_manager(using).get_for_model(
+                    sender
+                ),
+                db=using,
+                format="json",
+                serialized_data=serializers.serialize("json", [instance]),
+                object_repr=str(instance),
+            ),
+        )
+
+
+@receiver(post_revision_commit, dispatch_uid="add_deletions_to_revision")
+def add_deletions_to_revision(sender, revision, **kwargs):
+    """
+    Add the objects deleted within an active revision to that revision.
+    """
+    deletions = DeletedVersions.find(revision._state.db)
+    if deletions is not None:
+        deletions.save(revision)
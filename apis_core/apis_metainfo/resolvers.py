@@ -0,0 +1,127 @@
+"""
+Resolve primary keys and uris to instances of the concrete RootObject
+subclasses.
+
+`RootObject.objects_inheritance.get_subclass` joins the tables of all the
+subclasses of `RootObject`, which gets slow with big ontologies. As every
+`RootObject` stores its contenttype in `self_contenttype`, we read that
+first and then query only the table of the concrete model (see
+`apis_core.apis_metainfo.models.get_concrete_instances`).
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apis_core.apis_metainfo.models import RootObject, Uri, get_concrete_instances
+from apis_core.utils.normalize import clean_uris
+
+
+def get_root_object(pk):
+    """
+    Return the instance of the concrete subclass of the RootObject with
+    the primary key `pk` or None if there is no such object.
+    """
+    return get_concrete_instances(RootObject, [pk]).get(pk)
+
+
+class UriCache:
+    """
+    A cache mapping uris to the ids and contenttype ids of their root
+    objects, stored in the Django cache for `APIS_URI_CACHE_TIMEOUT`
+    seconds, so it is shared by all the processes. Only uris that were
+    found are cached. The cache keys contain a version, which is changed
+    whenever an `Uri` is saved or deleted or when the cache is cleared,
+    which invalidates all the cached uris.
+    """
+
+    version_key = "apis_uri_cache_version"
+
+    @property
+    def timeout(self) -> int:
+        return getattr(settings, "APIS_URI_CACHE_TIMEOUT", 300)
+
+    def _keys(self, uris) -> dict:
+        version = cache.get(self.version_key, 0)
+        return {
+            f"apis_uri:{version}:{hashlib.md5(uri.encode()).hexdigest()}": uri
+            for uri in uris
+        }
+
+    def get_many(self, uris) -> dict:
+        if not self.timeout:
+            return {}
+        keys = self._keys(uris)
+        return {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+    def set_many(self, resolved: dict):
+        if not self.timeout or not resolved:
+            return
+        keys = self._keys(resolved)
+        cache.set_many({key: resolved[uri] for key, uri in keys.items()}, self.timeout)
+
+    def clear(self):
+        cache.set(self.version_key, time.time_ns(), None)
+
+
+uri_cache = UriCache()
+
+# the number of uris per `uri__in` query, this stays below the
+# limit of query parameters of SQLite
+RESOLVE_BATCH_SIZE = 500
+
+
+def _lookup(uris: list) -> dict:
+    return {
+        uri: (root_object_id, contenttype_id)
+        for uri, root_object_id, contenttype_id in Uri.objects.filter(
+            uri__in=uris
+        ).values_list("uri", "root_object_id", "root_object__self_contenttype_id")
+    }
+
+
+def resolve_uri(uri: str):
+    """
+    Return a (root_object_id, contenttype_id) tuple for the root object
+    the (normalized) `uri` belongs to or None if the uri is not known.
+    The lookup uses the unique index of the uri column, joins only the
+    `RootObject` table and the uris that were found are cached.
+    """
+    return resolve_uris([uri])[uri]
+
+
+def resolve_uris(uris: list) -> dict:
+    """
+    Resolve multiple uris at once. Returns a dict mapping each of the
+    passed `uris` to a (root_object_id, contenttype_id) tuple or to None
+    if the uri is not known. Uris that are not cached are looked up
+    using one query per `RESOLVE_BATCH_SIZE` uris.
+    """
+    cleaned = clean_uris(uris)
+    resolved = uri_cache.get_many(set(cleaned.values()))
+    missing = [uri for uri in set(cleaned.values()) if uri not in resolved]
+    for start in range(0, len(missing), RESOLVE_BATCH_SIZE):
+        batch = missing[start : start + RESOLVE_BATCH_SIZE]
+        found = _lookup(batch)
+        uri_cache.set_many(found)
+        resolved.update(found)
+    return {uri: resolved.get(cleaned_uri) for uri, cleaned_uri in cleaned.items()}
+
+
+def get_root_object_id_by_uri(uri: str):
+    """
+    Return the id of the root object the (normalized) `uri` belongs to or
+    None if the uri is not known.
+    """
+    resolved = resolve_uri(uri)
+    return resolved[0] if resolved else None
+
+
+@receiver(post_save, sender=Uri, dispatch_uid="clear_uri_cache_on_save")
+@receiver(post_delete, sender=Uri, dispatch_uid="clear_uri_cache_on_delete")
+def clear_uri_cache(sender, **kwargs):
+    uri_cache.clear()
@@ -0,0 +1,178 @@
+from unittest import mock
+
+from django.http import Http404
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from apis_core.apis_entities.api_views import GetEntityGeneric
+from apis_core.apis_relations.models import Property
+from apis_core.utils import normalize
+from .models import RootObject, Uri, get_concrete_instances
+from .resolvers import (
+    get_root_object,
+    get_root_object_id_by_uri,
+    resolve_uri,
+    resolve_uris,
+    uri_cache,
+)
+
+
+class ResolversTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prop = Property.objects.create(name_forward="knows")
+        cls.uri = Uri.objects.create(
+            uri="https://example.org/entity/1", root_object=cls.prop
+        )
+
+    def setUp(self):
+        uri_cache.clear()
+
+    def test_get_root_object(self):
+        with self.assertNumQueries(2):
+            obj = get_root_object(self.prop.pk)
+        self.assertIsInstance(obj, Property)
+        self.assertEqual(obj.name_forward, "knows")
+        self.assertIsNone(get_root_object(self.prop.pk + 1000))
+
+    def test_get_root_object_id_by_uri(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_root_object_id_by_uri("https://example.org/entity/1"), self.prop.pk
+            )
+        with self.assertNumQueries(0):
+            get_root_object_id_by_uri("https://example.org/entity/1")
+        self.assertIsNone(get_root_object_id_by_uri("https://example.org/entity/2"))
+
+        # uris that were not found are not cached
+        Uri.objects.bulk_create(
+            [Uri(uri="https://example.org/entity/3", root_object=self.prop)]
+        )
+        self.assertEqual(
+            get_root_object_id_by_uri("https://example.org/entity/3"), self.prop.pk
+        )
+
+        # saving an uri invalidates the cache
+        Uri.objects.create(uri="https://example.org/entity/2", root_object=self.prop)
+        self.assertEqual(
+            get_root_object_id_by_uri("https://example.org/entity/2"), self.prop.pk
+        )
+
+    def test_resolve_uris(self):
+        contenttype_id = self.prop.self_contenttype_id
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                resolve_uri("https://example.org/entity/1"),
+                (self.prop.pk, contenttype_id),
+            )
+        Uri.objects.create(uri="https://example.org/entity/2", root_object=self.prop)
+        resolve_uri("https://example.org/entity/1")
+        with self.assertNumQueries(1):
+            resolved = resolve_uris(
+                [
+                    "https://example.org/entity/1",
+                    "https://example.org/entity/2",
+                    "https://example.org/entity/3",
+                ]
+            )
+        self.assertEqual(
+            resolved,
+            {
+                "https://example.org/entity/1": (self.prop.pk, contenttype_id),
+                "https://example.org/entity/2": (self.prop.pk, contenttype_id),
+                "https://example.org/entity/3": None,
+            },
+        )
+        with self.assertNumQueries(0):
+            resolve_uris(["https://example.org/entity/2"])
+        with self.assertNumQueries(1):
+            resolve_uris(["https://example.org/entity/3"])
+
+        # the rules of the uri normalization are read once
+        with mock.patch.object(normalize, "dict_from_toml_directory") as read:
+            resolve_uri("https://example.org/entity/1")
+            read.assert_not_called()
+
+    @override_settings(ROOT_URLCONF="tests.urls")
+    def test_uri_to_object(self):
+        url = "/apis/api/metainfo/uritoobject/"
+        response = self.client.get(
+            url, {"uri": "https://example.org/entity/1", "format": "json"}
+        )
+        self.assertRedirects(
+            response,
+            f"/apis/api/relations/property/{self.prop.pk}/?format=json",
+            fetch_redirect_response=False,
+        )
+        response = self.client.get(url, {"uri": "https://example.org/entity/2"})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(
+            url + "batch/",
+            {"uris": ["https://example.org/entity/1", "https://example.org/entity/2"]},
+            content_type="application/json",
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "https://example.org/entity/1": {
+                    "id": self.prop.pk,
+                    "type": "apis_relations.property",
+                    "url": f"http://testserver/apis/api/relations/property/{self.prop.pk}/",
+                },
+                "https://example.org/entity/2": None,
+            },
+        )
+        response = self.client.post(
+            url + "batch/", {"uris": []}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_entity_generic(self):
+        view = GetEntityGeneric()
+        request = APIRequestFactory().get(f"/entity/{self.prop.pk}/")
+        self.assertEqual(view.get_object(self.prop.pk, request), self.prop)
+
+        # the url of an imported entity, that is stored as uri
+        Uri.objects.create(uri="http://testserver/entity/999/", root_object=self.prop)
+        request = APIRequestFactory().get("/entity/999/?format=json")
+        self.assertEqual(view.get_object(999, request), self.prop)
+
+        request = APIRequestFactory().get("/entity/998/")
+        with self.assertRaises(Http404):
+            view.get_object(998, request)
+
+
+class InheritanceForeignKeyTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.props = [Property.objects.create(name_forward=f"p{i}") for i in range(3)]
+        for i, prop in enumerate(cls.props):
+            Uri.objects.create(uri=f"https://example.org/{i}", root_object=prop)
+        # a root object that is not an instance of a subclass
+        cls.root = RootObject.objects.create(deprecated_name="root")
+        Uri.objects.create(uri="https://example.org/root", root_object=cls.root)
+
+    def test_descriptor(self):
+        uri = Uri.objects.get(uri="https://example.org/0")
+        # the contenttype and the concrete instance
+        with self.assertNumQueries(2):
+            self.assertIsInstance(uri.root_object, Property)
+        self.assertEqual(uri.root_object, self.props[0])
+
+    def test_prefetch(self):
+        # the uris, the contenttypes of the root objects and one
+        # query per contenttype
+        with self.assertNumQueries(4):
+            uris = list(Uri.objects.order_by("pk").prefetch_related("root_object"))
+            objects = [uri.root_object for uri in uris]
+        self.assertEqual(objects, self.props + [self.root])
+        self.assertEqual(
+            [type(obj) for obj in objects], [Property, Property, Property, RootObject]
+        )
+
+    def test_get_concrete_instances(self):
+        pks = [prop.pk for prop in self.props] + [self.root.pk, 0]
+        instances = get_concrete_instances(RootObject, pks)
+        self.assertEqual(set(instances), set(pks) - {0})
+        self.assertIsInstance(instances[self.props[1].pk], Property)
@@ -1,10 +1,24 @@
-from rest_framework import viewsets
-from rest_framework.response import Response
-from apis_core.apis_metainfo.models import Uri
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
-from django.shortcuts import get_object_or_404
-from django.http import HttpResponseRedirect, QueryDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from apis_core.apis_metainfo.resolvers import resolve_uri, resolve_uris
+from apis_core.generic.serializers import URL_TEMPLATE_PK
+
+
+class UriBatchSerializer(serializers.Serializer):
+    uris = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=getattr(settings, "APIS_URI_RESOLVE_MAX_URIS", 1000),
+    )
 
 
 class UriToObjectViewSet(viewsets.ViewSet):
@@ -14,6 +28,10 @@ class UriToObjectViewSet(viewsets.ViewSet):
     parameter to resolve the uri.
     """
 
+    def get_detail_url(self, root_object_id, contenttype_id):
+        model = ContentType.objects.get_for_id(contenttype_id).model
+        return reverse(f"apis:apis_core:{model}-detail", args=[root_object_id])
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -27,10 +45,42 @@ class UriToObjectViewSet(viewsets.ViewSet):
         params = request.query_params.dict()
         uri = params.pop("uri", None)
         if uri:
-            u = get_object_or_404(Uri, uri=request.query_params.get("uri"))
-            model = u.root_object.self_contenttype.model
-            r = reverse(f"apis:apis_core:{model}-detail", args=[u.root_object.id])
+            resolved = resolve_uri(uri)
+            if resolved is None:
+                raise Http404
+            r = self.get_detail_url(*resolved)
             if params:
-                r += "?" + QueryDict.from_keys(params).urlencode()
+                r += "?" + urlencode(params)
             return HttpResponseRedirect(r)
         return Response()
+
+    @extend_schema(
+        request=UriBatchSerializer,
+        responses={200: OpenApiTypes.OBJECT},
+        description="Resolve multiple URIs in one request. Pass a list of `uris`, the response maps every uri to the `id`, the `type` and the API `url` of the object it belongs to, or to `null` if the uri is not known.",
+    )
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        serializer = UriBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # the urls are reversed once per contenttype
+        url_templates = {}
+        results = {}
+        for uri, resolved in resolve_uris(serializer.validated_data["uris"]).items():
+            if resolved is None:
+                results[uri] = None
+                continue
+            root_object_id, contenttype_id = resolved
+            if contenttype_id not in url_templates:
+                url = self.get_detail_url(URL_TEMPLATE_PK, contenttype_id)
+                url_templates[contenttype_id] = (
+                    ContentType.objects.get_for_id(contenttype_id),
+                    url.rsplit(str(URL_TEMPLATE_PK), 1),
+                )
+            contenttype, (prefix, suffix) = url_templates[contenttype_id]
+            results[uri] = {
+                "id": root_object_id,
+                "type": f"{contenttype.app_label}.{contenttype.model}",
+                "url": request.build_absolute_uri(f"{prefix}{root_object_id}{suffix}"),
+            }
+        return Response(results)
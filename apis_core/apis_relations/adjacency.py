@@ -0,0 +1,122 @@
+"""
+Maintain the optional adjacency table of the relations.
+
+The `Adjacency` model stores every triple twice, once for each of its
+sides, so the relations of an entity can be read using one indexed lookup
+instead of joining the triples on their subject and their object. The
+table is used if the `APIS_ADJACENCY` setting is set. It is kept in sync
+by the signals of the triples (see `apis_core.apis_relations.signals`);
+code that changes triples in bulk (i.e. using `QuerySet.update` or
+`bulk_create`) has to call `sync` for the changed triples. The whole table
+can be rebuilt using the `apisrebuildadjacency` management command.
+"""
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import QuerySet
+
+from apis_core.apis_relations.models import Adjacency, Triple
+
+CHUNK_SIZE = 2000
+
+FIELDS = [
+    "pk",
+    "subj_id",
+    "obj_id",
+    "prop_id",
+    "subj__self_contenttype_id",
+    "obj__self_contenttype_id",
+    "temptriple__start_date",
+    "temptriple__end_date",
+]
+
+
+def enabled() -> bool:
+    return getattr(settings, "APIS_ADJACENCY", False)
+
+
+def _adjacencies(triples):
+    for (
+        pk,
+        subj,
+        obj,
+        prop,
+        subj_contenttype,
+        obj_contenttype,
+        start_date,
+        end_date,
+    ) in triples.values_list(*FIELDS).iterator(chunk_size=CHUNK_SIZE):
+        if subj is None or obj is None or prop is None:
+            continue
+        dates = {"start_date": start_date, "end_date": end_date}
+        yield Adjacency(
+            triple_id=pk,
+            entity_id=subj,
+            other_id=obj,
+            other_contenttype_id=obj_contenttype,
+            prop_id=prop,
+            direction=Adjacency.FORWARD,
+            **dates,
+        )
+        yield Adjacency(
+            triple_id=pk,
+            entity_id=obj,
+            other_id=subj,
+            other_contenttype_id=subj_contenttype,
+            prop_id=prop,
+            direction=Adjacency.REVERSE,
+            **dates,
+        )
+
+
+def _insert(triples, using: str):
+    chunk = []
+    for adjacency in _adjacencies(triples):
+        chunk.append(adjacency)
+        if len(chunk) == CHUNK_SIZE:
+            Adjacency.objects.using(using).bulk_create(chunk)
+            chunk = []
+    Adjacency.objects.using(using).bulk_create(chunk)
+
+
+def _triple_ids(triples) -> list:
+    if isinstance(triples, QuerySet):
+        return list(triples.values_list("pk", flat=True))
+    return list(triples)
+
+
+def sync(triples, using: str = None):
+    """
+    Update the adjacencies of `triples`, which is a queryset of triples
+    (or of a subclass) or a list of triple ids. Triples that do not exist
+    anymore are removed from the table.
+    """
+    if not enabled():
+        return
+    using = using or router.db_for_write(Adjacency)
+    ids = _triple_ids(triples)
+    with transaction.atomic(using=using):
+        Adjacency.objects.using(using).filter(triple_id__in=ids).delete()
+        _insert(Triple.objects.using(using).filter(pk__in=ids), using)
+
+
+def delete(triples, using: str = None):
+    """
+    Remove the adjacencies of `triples` (see `sync`).
+    """
+    if not enabled():
+        return
+    using = using or router.db_for_write(Adjacency)
+    Adjacency.objects.using(using).filter(triple_id__in=_triple_ids(triples)).delete()
+
+
+def rebuild(using: str = None) -> int:
+    """
+    Rebuild the adjacency table from all the triples and return the
+    number of rows. This also works if the table is not enabled.
+    """
+    using = using or router.db_for_write(Adjacency)
+    with transaction.atomic(using=using):
+        Adjacency.objects.using(using).all().delete()
+        _insert(Triple.objects.using(using).order_by("pk"), using)
+    return Adjacency.objects.using(using).count()
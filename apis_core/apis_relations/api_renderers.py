@@ -0,0 +1,31 @@
+from rest_framework import renderers
+
+
+class GraphRenderer(renderers.BaseRenderer):
+    """
+    Base class of the graph export renderers. The graph export view
+    streams the output of the respective writer in
+    `apis_core.apis_relations.graph` itself, so the renderers are only used
+    for the content negotiation; if data is passed, it is expected to be
+    an iterable of strings.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return "".join(data).encode(self.charset)
+
+
+class NetJsonGraphRenderer(GraphRenderer):
+    media_type = "application/json"
+    format = "netjson"
+
+
+class GraphMLRenderer(GraphRenderer):
+    media_type = "application/graphml+xml"
+    format = "graphml"
+
+
+class GexfRenderer(GraphRenderer):
+    media_type = "application/gexf+xml"
+    format = "gexf"
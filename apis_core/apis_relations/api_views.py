@@ -0,0 +1,195 @@
+from django.apps import apps
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from rest_framework import renderers
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apis_core.apis_metainfo.models import RootObject
+
+from .api_renderers import NetJsonGraphRenderer, GraphMLRenderer, GexfRenderer
+from .graph import WRITERS, graph_triples
+from .snapshot import get_snapshot
+from .traversal import k_hop, shortest_path
+
+
+class GraphFilterMixin:
+    """
+    Parse the parameters filtering the relations of a graph
+    * `property`: property ids (comma separated)
+    * `entity_class`: models as `app_label.model` (comma separated), both
+      the subject and the object have to be instances of one of them
+    * `start` and `end`: ISO dates, only relations overlapping the range
+      are used
+    * `valid_at`: an ISO date, only relations valid at the date are used
+    * `certain`: if set to `true`, the relations have to certainly overlap
+      the range or be valid at the date, otherwise relations with fuzzy
+      dates that possibly do are used as well
+    """
+
+    def get_list_param(self, name):
+        value = self.request.query_params.get(name, "")
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValidationError(f"`{name}` has to be an ISO date")
+        return date
+
+    def get_int_param(self, name, default: int, maximum: int):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except ValueError:
+            value = -1
+        if not 0 <= value <= maximum:
+            raise ValidationError(f"`{name}` has to be a number up to {maximum}")
+        return value
+
+    def get_triples(self):
+        properties = self.get_list_param("property")
+        if not all(prop.isdigit() for prop in properties):
+            raise ValidationError("`property` has to be a list of property ids")
+        entity_classes = []
+        for label in self.get_list_param("entity_class"):
+            try:
+                entity_classes.append(apps.get_model(label))
+            except (LookupError, ValueError):
+                raise ValidationError(f"`{label}` is not a model")
+        start, end = self.get_date_param("start"), self.get_date_param("end")
+        valid_at = self.get_date_param("valid_at")
+        if valid_at is not None:
+            if start is not None or end is not None:
+                raise ValidationError("`valid_at` can not be used with a range")
+            start = end = valid_at
+        return graph_triples(
+            properties=[int(prop) for prop in properties],
+            entity_classes=entity_classes,
+            start=start,
+            end=end,
+            certain=self.request.query_params.get("certain") == "true",
+        )
+
+    def get_entity_id(self, pk):
+        if not RootObject.objects.filter(pk=pk).exists():
+            raise NotFound(f"There is no entity with the id {pk}")
+        return pk
+
+
+class GraphExport(GraphFilterMixin, APIView):
+    """
+    Stream the relations as a network graph. The output format is chosen
+    using the `format` parameter (`netjson`, `graphml` or `gexf`) or the
+    `Accept` header. The graph can be filtered using the parameters of
+    the `GraphFilterMixin`.
+    """
+
+    renderer_classes = (NetJsonGraphRenderer, GraphMLRenderer, GexfRenderer)
+
+    def handle_exception(self, exc):
+        # errors are not graphs, so we render them as JSON
+        self.request.accepted_renderer = renderers.JSONRenderer()
+        self.request.accepted_media_type = "application/json"
+        return super().handle_exception(exc)
+
+    def get(self, request, *args, **kwargs):
+        triples = self.get_triples()
+        renderer = request.accepted_renderer
+        writer = WRITERS[renderer.format]
+        return StreamingHttpResponse(
+            (chunk.encode(renderer.charset) for chunk in writer(triples)),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+
+
+class GraphNeighbourhood(GraphFilterMixin, APIView):
+    """
+    Return the subgraph of the entities that are at most `depth` relations
+    away from the entity `pk`. The parameters `max_nodes` and `fan_out`
+    limit the number of nodes and the number of relations that are
+    followed per node, the relations can be filtered using the parameters
+    of the `GraphFilterMixin`.
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        max_depth = getattr(settings, "APIS_GRAPH_TRAVERSAL_MAX_DEPTH", 3)
+        max_nodes = getattr(settings, "APIS_GRAPH_TRAVERSAL_MAX_NODES", 1000)
+        fan_out = None
+        if "fan_out" in request.query_params:
+            fan_out = self.get_int_param("fan_out", None, max_nodes)
+        subgraph = k_hop(
+            self.get_entity_id(pk),
+            depth=self.get_int_param("depth", 1, max_depth),
+            triples=self.get_triples(),
+            max_nodes=self.get_int_param("max_nodes", max_nodes, max_nodes),
+            fan_out=fan_out,
+        )
+        return Response(subgraph.as_dict())
+
+
+class GraphPath(GraphFilterMixin, APIView):
+    """
+    Return the subgraph of a shortest path of at most `max_depth` relations
+    between the entities `source` and `target`. The relations can be
+    filtered using the parameters of the `GraphFilterMixin`.
+    """
+
+    def get(self, request, source, target, *args, **kwargs):
+        max_depth = getattr(settings, "APIS_GRAPH_PATH_MAX_DEPTH", 6)
+        subgraph = shortest_path(
+            self.get_entity_id(source),
+            self.get_entity_id(target),
+            triples=self.get_triples(),
+            max_depth=self.get_int_param("max_depth", max_depth, max_depth),
+        )
+        if subgraph is None:
+            raise NotFound("There is no path between the entities")
+        return Response(subgraph.as_dict())
+
+
+class GraphSnapshotView(GraphFilterMixin, APIView):
+    """
+    Return the degree and the connected component of the entity `pk`
+    from the graph snapshot (see `apis_core.apis_relations.snapshot`).
+    If a `depth` is passed, the neighbourhood of the entity is returned
+    too, optionally only following the relations with the properties
+    passed in the `property` parameter.
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        snapshot = get_snapshot()
+        if snapshot is None:
+            raise NotFound("There is no graph snapshot")
+        if snapshot.position(pk) is None:
+            raise NotFound(f"There is no entity with the id {pk} in the snapshot")
+        data = {
+            "id": pk,
+            "created": snapshot.created,
+            "degree": snapshot.degree(pk),
+            "component": snapshot.component(pk),
+            "component_size": snapshot.component_size(pk),
+        }
+        if "depth" in request.query_params:
+            properties = self.get_list_param("property")
+            if not all(prop.isdigit() for prop in properties):
+                raise ValidationError("`property` has to be a list of property ids")
+            max_depth = getattr(settings, "APIS_GRAPH_TRAVERSAL_MAX_DEPTH", 3)
+            neighbourhood = snapshot.k_hop(
+                pk,
+                depth=self.get_int_param("depth", 1, max_depth),
+                props=[int(prop) for prop in properties] or None,
+            )
+            data["neighbourhood"] = [
+                {"id": node, "distance": distance}
+                for node, distance in neighbourhood.items()
+            ]
+        return Response(data)
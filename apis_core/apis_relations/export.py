@@ -0,0 +1,221 @@
+"""
+Export the relations as a table.
+
+The list of the relations renders every row using the instances of the
+subjects and the objects, which is too slow for exporting all of them. The
+export reads the relations using one `values_list` query, that joins the
+subjects, the objects, the properties and the dates of the temporal triples.
+The labels of the subjects and the objects are the only values that need
+the instances of the concrete models, they are read per chunk of rows
+using one query per concrete model, so the number of queries grows with
+the number of chunks and not with the number of relations.
+
+The writers yield the output chunk by chunk, so the export does not have to
+be held in memory and can be passed to a `StreamingHttpResponse`. The
+relations can be written as CSV or as an Arrow IPC stream, a columnar
+format that can be read by pandas, polars and most other data frame
+libraries - the latter needs the `pyarrow` package.
+"""
+
+import csv
+import io
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+
+from apis_core.apis_metainfo.models import RootObject, get_concrete_instances
+from apis_core.apis_relations.models import TempTriple
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+CHUNK_SIZE = 2000
+
+COLUMNS = [
+    "id",
+    "subj_id",
+    "subj_label",
+    "subj_type",
+    "prop_id",
+    "prop",
+    "obj_id",
+    "obj_label",
+    "obj_type",
+    "start_date",
+    "end_date",
+    "start_date_written",
+    "end_date_written",
+]
+
+FIELDS = [
+    "pk",
+    "subj_id",
+    "subj__self_contenttype_id",
+    "prop_id",
+    "prop__name_forward",
+    "obj_id",
+    "obj__self_contenttype_id",
+]
+
+DATE_FIELDS = [
+    "start_date",
+    "end_date",
+    "start_date_written",
+    "end_date_written",
+]
+
+
+def get_fields(model) -> list:
+    """
+    Return the lookups of the values of the relations of `model`. The
+    dates are fields of the temporal triples, other triples read them
+    from their temporal triple, if they have one.
+    """
+    if issubclass(model, TempTriple):
+        return FIELDS + DATE_FIELDS
+    return FIELDS + [f"temptriple__{field}" for field in DATE_FIELDS]
+
+
+def _chunks(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _type(contenttype_id):
+    if contenttype_id is None:
+        return None
+    contenttype = ContentType.objects.get_for_id(contenttype_id)
+    return f"{contenttype.app_label}.{contenttype.model}"
+
+
+def _labels(chunk, using) -> dict:
+    """
+    Return the labels of the subjects and the objects of a chunk of rows,
+    using the contenttypes of the rows to query only the tables of the
+    concrete models.
+    """
+    grouped = defaultdict(set)
+    for row in chunk:
+        grouped[row[2]].add(row[1])
+        grouped[row[6]].add(row[5])
+    instances = {}
+    for contenttype_id, pks in grouped.items():
+        if contenttype_id is None:
+            instances.update(get_concrete_instances(RootObject, pks, using=using))
+        else:
+            model = ContentType.objects.get_for_id(contenttype_id).model_class()
+            queryset = model._base_manager.db_manager(using).filter(pk__in=pks)
+            instances.update((instance.pk, instance) for instance in queryset)
+    return {pk: str(instance) for pk, instance in instances.items()}
+
+
+def export_rows(triples, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the rows of the `triples` in chunks of `chunk_size` rows,
+    every row being a tuple of the values of the `COLUMNS`.
+    """
+    rows = triples.order_by("pk").values_list(*get_fields(triples.model))
+    for chunk in _chunks(rows.iterator(chunk_size=chunk_size), chunk_size):
+        labels = _labels(chunk, triples.db)
+        yield [
+            (
+                pk,
+                subj,
+                labels.get(subj),
+                _type(subj_type),
+                prop,
+                prop_label,
+                obj,
+                labels.get(obj),
+                _type(obj_type),
+                *dates,
+            )
+            for pk, subj, subj_type, prop, prop_label, obj, obj_type, *dates in chunk
+        ]
+
+
+def csv_export(triples):
+    """
+    Write the relations as CSV, with a header row.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in export_rows(triples):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _Sink:
+    """
+    A file like object collecting the bytes written by pyarrow, so they
+    can be yielded after every batch.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def pop(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def arrow_schema():
+    columns = dict.fromkeys(COLUMNS, pyarrow.string())
+    for column in ["id", "subj_id", "prop_id", "obj_id"]:
+        columns[column] = pyarrow.int64()
+    for column in ["start_date", "end_date"]:
+        columns[column] = pyarrow.date32()
+    return pyarrow.schema(list(columns.items()))
+
+
+def arrow_export(triples):
+    """
+    Write the relations as an Arrow IPC stream, one record batch per
+    chunk of rows.
+    """
+    if pyarrow is None:
+        raise ImportError("The Arrow export needs the `pyarrow` package")
+    schema = arrow_schema()
+    sink = _Sink()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for chunk in export_rows(triples):
+            columns = [
+                pyarrow.array(values, type=field.type)
+                for values, field in zip(zip(*chunk), schema)
+            ]
+            writer.write_batch(pyarrow.record_batch(columns, schema=schema))
+            yield sink.pop()
+    yield sink.pop()
+
+
+# the writers by format, with their content types and file extensions
+WRITERS = {
+    "csv": (csv_export, "text/csv; charset=utf-8", "csv"),
+    "arrow": (arrow_export, "application/vnd.apache.arrow.stream", "arrows"),
+}
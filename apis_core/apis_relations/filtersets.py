@@ -1,7 +1,15 @@
 from apis_core.generic.filtersets import GenericFilterSet, GenericFilterSetForm
-from django_filters import CharFilter, ModelMultipleChoiceFilter
+from django_filters import (
+    BooleanFilter,
+    CharFilter,
+    DateFilter,
+    DateFromToRangeFilter,
+    ModelMultipleChoiceFilter,
+)
 from django.contrib.contenttypes.models import ContentType
 from apis_core.apis_relations.models import Property
+from apis_core.apis_relations.temporal import overlapping_triples
+from apis_core.utils.filtermethods import root_objects_by_name
 from django.db.models import Q
 
 PROPERTY_EXCLUDES = [
@@ -42,12 +50,19 @@ class TripleFilterSet(GenericFilterSet):
         ),
         method="class_in",
     )
+    valid_at = DateFilter(label="Valid at", method="valid_at_filter")
+    period = DateFromToRangeFilter(label="Overlapping", method="period_filter")
+    certain = BooleanFilter(
+        label="Certain dates",
+        method="certain_filter",
+        help_text="Only use relations that are certainly valid, not the ones whose fuzzy dates only possibly are",
+    )
 
     def subj_icontains(self, queryset, name, value):
-        return queryset.filter(subj__name__icontains=value)
+        return queryset.filter(subj__in=root_objects_by_name("__icontains", value))
 
     def obj_icontains(self, queryset, name, value):
-        return queryset.filter(obj__name__icontains=value)
+        return queryset.filter(obj__in=root_objects_by_name("__icontains", value))
 
     def class_in(self, queryset, name, value):
         # value is the list of contenttypes
@@ -55,3 +70,19 @@ class TripleFilterSet(GenericFilterSet):
             name, _ = name.split("_")
             return queryset.filter(Q(**{f"{name}__self_contenttype__in": value}))
         return queryset
+
+    def certain_dates(self):
+        return bool(self.form.cleaned_data.get("certain"))
+
+    def valid_at_filter(self, queryset, name, value):
+        return overlapping_triples(queryset, value, value, self.certain_dates())
+
+    def period_filter(self, queryset, name, value):
+        # the range consists of datetimes at the start and the end of the days
+        start = value.start.date() if value.start else None
+        end = value.stop.date() if value.stop else None
+        return overlapping_triples(queryset, start, end, self.certain_dates())
+
+    def certain_filter(self, queryset, name, value):
+        # used by the other temporal filters
+        return queryset
@@ -0,0 +1,208 @@
+"""
+Export the relations as a network graph.
+
+The graph is streamed directly from the database: the nodes are read in
+batches, with one query per concrete model of the nodes, the edges are read
+using `values_list`, so no `Triple` instances are created. The writers
+yield the output piece by piece, so the export does not have to be held in
+memory and can be passed to a `StreamingHttpResponse`.
+"""
+
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from apis_core.apis_metainfo.models import RootObject, get_concrete_instances
+from apis_core.apis_relations.models import Property, Triple
+from apis_core.apis_relations.temporal import overlapping_triples
+
+CHUNK_SIZE = 2000
+# the number of nodes whose instances are fetched at once, this stays
+# below the limit of query parameters of SQLite
+NODE_BATCH_SIZE = 500
+
+
+def _batches(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def graph_triples(
+    properties: list = None,
+    entity_classes: list = None,
+    start=None,
+    end=None,
+    queryset=None,
+    certain: bool = False,
+):
+    """
+    Return the triples that make up the graph, filtered by
+    * `properties`: a list of property ids
+    * `entity_classes`: a list of model classes, both the subject and
+      the object of a triple have to be an instance of one of them
+    * `start` and `end`: dates, only triples that possibly (or `certain`ly)
+      overlap the range are kept (see `apis_core.apis_relations.temporal`).
+      Triples that are not temporal triples are treated as unbounded.
+    `queryset` defaults to all the triples the current user can see.
+    """
+    if queryset is None:
+        queryset = Triple.objects.filter_for_user()
+    if properties:
+        queryset = queryset.filter(prop_id__in=properties)
+    if entity_classes:
+        contenttypes = ContentType.objects.get_for_models(*entity_classes).values()
+        queryset = queryset.filter(
+            subj__self_contenttype__in=contenttypes,
+            obj__self_contenttype__in=contenttypes,
+        )
+    if start is not None or end is not None:
+        queryset = overlapping_triples(queryset, start, end, certain)
+    return queryset
+
+
+def graph_nodes(triples):
+    """
+    Yield a (id, label, type) tuple for every subject and object of
+    the `triples`. Every node is yielded once. The nodes are read in
+    batches using `get_concrete_instances`, which only queries the
+    tables of the concrete models of the nodes of a batch.
+    """
+    pks = (
+        RootObject.objects.using(triples.db)
+        .filter(
+            Q(pk__in=triples.values("subj_id")) | Q(pk__in=triples.values("obj_id"))
+        )
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    for batch in _batches(pks.iterator(chunk_size=CHUNK_SIZE), NODE_BATCH_SIZE):
+        instances = get_concrete_instances(RootObject, batch, using=triples.db)
+        for pk in batch:
+            if node := instances.get(pk):
+                yield node.pk, str(node), node._meta.model_name
+
+
+def graph_edges(triples):
+    """
+    Yield a (id, source, target, label, start_date, end_date) tuple
+    for every triple, the label being the name of the property.
+    """
+    labels = dict(Property.objects.values_list("pk", "name_forward"))
+    edges = triples.order_by("pk").values_list(
+        "pk",
+        "subj_id",
+        "obj_id",
+        "prop_id",
+        "temptriple__start_date",
+        "temptriple__end_date",
+    )
+    for pk, subj, obj, prop, start_date, end_date in edges.iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        yield pk, subj, obj, labels.get(prop), start_date, end_date
+
+
+def _isoformat(date):
+    return date.isoformat() if date is not None else None
+
+
+def netjson(triples):
+    """
+    Write the graph as a NetJSON `NetworkGraph`.
+    """
+    yield '{"type": "NetworkGraph", "protocol": "static", "version": null, '
+    yield '"metric": null, "nodes": ['
+    separator = ""
+    for pk, label, type in graph_nodes(triples):
+        node = {"id": str(pk), "label": label, "properties": {"type": type}}
+        yield separator + json.dumps(node)
+        separator = ", "
+    yield '], "links": ['
+    separator = ""
+    for pk, source, target, label, start_date, end_date in graph_edges(triples):
+        link = {
+            "source": str(source),
+            "target": str(target),
+            "cost": 1,
+            "properties": {
+                "id": pk,
+                "label": label,
+                "start_date": _isoformat(start_date),
+                "end_date": _isoformat(end_date),
+            },
+        }
+        yield separator + json.dumps(link)
+        separator = ", "
+    yield "]}"
+
+
+def _data(key, value):
+    if value is None:
+        return ""
+    return f'<data key="{key}">{escape(str(value))}</data>'
+
+
+def graphml(triples):
+    """
+    Write the graph as GraphML.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+    yield '<key id="label" for="all" attr.name="label" attr.type="string"/>\n'
+    yield '<key id="type" for="node" attr.name="type" attr.type="string"/>\n'
+    yield '<key id="start_date" for="edge" attr.name="start_date" attr.type="string"/>\n'
+    yield '<key id="end_date" for="edge" attr.name="end_date" attr.type="string"/>\n'
+    yield '<graph edgedefault="directed">\n'
+    for pk, label, type in graph_nodes(triples):
+        yield f'<node id="n{pk}">{_data("label", label)}{_data("type", type)}</node>\n'
+    for pk, source, target, label, start_date, end_date in graph_edges(triples):
+        yield (
+            f'<edge id="e{pk}" source="n{source}" target="n{target}">'
+            f'{_data("label", label)}{_data("start_date", _isoformat(start_date))}'
+            f'{_data("end_date", _isoformat(end_date))}</edge>\n'
+        )
+    yield "</graph>\n</graphml>\n"
+
+
+def gexf(triples):
+    """
+    Write the graph as GEXF. The dates of the triples are written as
+    the `start` and `end` of the edges.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<gexf xmlns="http://gexf.net/1.3" version="1.3">\n'
+    yield '<graph defaultedgetype="directed" mode="dynamic" timeformat="date">\n'
+    yield '<attributes class="node">'
+    yield '<attribute id="type" title="type" type="string"/></attributes>\n'
+    yield "<nodes>\n"
+    for pk, label, type in graph_nodes(triples):
+        yield (
+            f'<node id="{pk}" label={quoteattr(label)}><attvalues>'
+            f'<attvalue for="type" value={quoteattr(type)}/></attvalues></node>\n'
+        )
+    yield "</nodes>\n<edges>\n"
+    for pk, source, target, label, start_date, end_date in graph_edges(triples):
+        attributes = f'id="{pk}" source="{source}" target="{target}"'
+        if label is not None:
+            attributes += f" label={quoteattr(label)}"
+        if start_date is not None:
+            attributes += f' start="{start_date.isoformat()}"'
+        if end_date is not None:
+            attributes += f' end="{end_date.isoformat()}"'
+        yield f"<edge {attributes}/>\n"
+    yield "</edges>\n</graph>\n</gexf>\n"
+
+
+WRITERS = {
+    "netjson": netjson,
+    "graphml": graphml,
+    "gexf": gexf,
+}
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apis_core.apis_relations.snapshot import GraphSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a snapshot of the graph of the relations in compact arrays, "
+        "by default in the APIS_GRAPH_SNAPSHOT_DIRECTORY"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "directory",
+            nargs="?",
+            default=getattr(settings, "APIS_GRAPH_SNAPSHOT_DIRECTORY", None),
+            help="The directory of the snapshot.",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Only read the triples that changed since the snapshot was built.",
+        )
+        parser.add_argument(
+            "--database", default="default", help="The database to use."
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        if directory is None:
+            raise CommandError("Pass a directory or set APIS_GRAPH_SNAPSHOT_DIRECTORY")
+        if options["refresh"]:
+            try:
+                snapshot = GraphSnapshot(directory)
+            except FileNotFoundError:
+                raise CommandError(f"There is no snapshot in {directory}")
+            snapshot = snapshot.refresh(using=options["database"])
+        else:
+            snapshot = GraphSnapshot.build(directory, using=options["database"])
+        self.stdout.write(
+            f"Wrote a snapshot of {snapshot.meta['nodes']} nodes and "
+            f"{snapshot.meta['edges']} relations to {directory}"
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apis_core.apis_relations import adjacency
+
+
+class Command(BaseCommand):
+    help = "Rebuild the adjacency table of the relations from the triples"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", default="default", help="The database to use."
+        )
+
+    def handle(self, *args, **options):
+        rows = adjacency.rebuild(using=options["database"])
+        self.stdout.write(f"Rebuilt the adjacency table with {rows} rows")
+        if not adjacency.enabled():
+            self.stdout.write(
+                "The table is not used and not kept in sync, "
+                "unless the APIS_ADJACENCY setting is set"
+            )
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apis_metainfo", "0011_alter_rootobject_deprecated_name"),
+        ("apis_relations", "0005_alter_property_obj_class_alter_property_subj_class"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="triple",
+            index=models.Index(fields=["subj", "obj"], name="triple_subj_obj_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="triple",
+            index=models.Index(fields=["obj", "subj"], name="triple_obj_subj_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="triple",
+            index=models.Index(fields=["prop", "subj"], name="triple_prop_subj_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="triple",
+            index=models.Index(fields=["prop", "obj"], name="triple_prop_obj_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apis_relations", "0007_adjacency"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="triple",
+            name="modified",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:01
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apis_relations", "0008_triple_modified"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="temptriple",
+            index=models.Index(
+                django.db.models.functions.comparison.Coalesce(
+                    "start_start_date",
+                    "start_date",
+                    django.db.models.expressions.RawSQL(
+                        "'0001-01-01'", [], output_field=models.DateField()
+                    ),
+                ),
+                django.db.models.functions.comparison.Coalesce(
+                    "end_end_date",
+                    "end_date",
+                    django.db.models.expressions.RawSQL(
+                        "'9999-12-31'", [], output_field=models.DateField()
+                    ),
+                ),
+                name="temptriple_possible_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="temptriple",
+            index=models.Index(
+                django.db.models.functions.comparison.Coalesce(
+                    "start_end_date",
+                    "start_date",
+                    django.db.models.expressions.RawSQL(
+                        "'0001-01-01'", [], output_field=models.DateField()
+                    ),
+                ),
+                django.db.models.functions.comparison.Coalesce(
+                    "end_start_date",
+                    "end_date",
+                    django.db.models.expressions.RawSQL(
+                        "'9999-12-31'", [], output_field=models.DateField()
+                    ),
+                ),
+                name="temptriple_certain_idx",
+            ),
+        ),
+    ]
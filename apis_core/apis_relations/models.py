@@ -9,12 +9,12 @@ from django.db import models
 from django.db.models import Q
 from django.db.models.signals import m2m_changed
 from model_utils.managers import InheritanceManager
-from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
 from apis_core.generic.abc import GenericModel
 
-from apis_core.apis_metainfo.models import RootObject
+from apis_core.apis_metainfo.models import RootObject, InheritanceForeignKey
 from apis_core.utils import DateParser
 from apis_core.apis_metainfo import signals
+from apis_core.apis_relations import temporal
 
 
 def find_if_user_accepted():
@@ -208,15 +208,25 @@ class RelationPublishedQueryset(models.QuerySet):
         return qs.filter(query)
 
 
-class InheritanceForwardManyToOneDescriptor(ForwardManyToOneDescriptor):
-    def get_queryset(self, **hints):
-        return self.field.remote_field.model.objects_inheritance.db_manager(
-            hints=hints
-        ).select_subclasses()
+class TempTripleQueryset(RelationPublishedQueryset):
+    """
+    Query the temporal triples by their fuzzy dates, see
+    `apis_core.apis_relations.temporal`.
+    """
 
+    def valid_at(self, date, certain=False):
+        return temporal.valid_at(self, date, certain)
 
-class InheritanceForeignKey(models.ForeignKey):
-    forward_related_accessor_class = InheritanceForwardManyToOneDescriptor
+    def overlapping(self, start=None, end=None, certain=False):
+        return temporal.overlapping(self, start, end, certain)
+
+    def during(self, start=None, end=None, certain=False):
+        return temporal.during(self, start, end, certain)
+
+
+class TempTripleManager(BaseRelationManager.from_queryset(TempTripleQueryset)):
+    def get_queryset(self):
+        return TempTripleQueryset(self.model, using=self._db)
 
 
 class Triple(GenericModel, models.Model):
@@ -244,10 +254,22 @@ class Triple(GenericModel, models.Model):
         related_name="triple_set_from_prop",
         verbose_name="Property",
     )
+    # used to refresh the graph snapshots (see apis_core.apis_relations.snapshot)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = BaseRelationManager()
     objects_inheritance = InheritanceManager()
 
+    class Meta:
+        # covering indexes for the subqueries of the filters on related
+        # objects and properties (see `apis_core.utils.filtermethods`)
+        indexes = [
+            models.Index(fields=["subj", "obj"], name="triple_subj_obj_idx"),
+            models.Index(fields=["obj", "subj"], name="triple_obj_subj_idx"),
+            models.Index(fields=["prop", "subj"], name="triple_prop_subj_idx"),
+            models.Index(fields=["prop", "obj"], name="triple_prop_obj_idx"),
+        ]
+
     def __repr__(self):
         if self.subj is not None or self.obj is not None or self.prop is not None:
             return f"<{self.__class__.__name__}: subj: {self.subj}, prop: {self.prop}, obj: {self.obj}>"
@@ -354,6 +376,16 @@ class TempTriple(Triple):
     references = models.TextField(blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
 
+    objects = TempTripleManager()
+
+    class Meta:
+        # composite indexes on the bounds of the possible and the certain
+        # period of the triples (see `apis_core.apis_relations.temporal`)
+        indexes = [
+            models.Index(*temporal.period(), name="temptriple_possible_idx"),
+            models.Index(*temporal.period(certain=True), name="temptriple_certain_idx"),
+        ]
+
     def save(self, parse_dates=True, *args, **kwargs):
         """Adaption of the save() method of the class to automatically parse string-dates into date objects"""
 
@@ -390,3 +422,53 @@ class TempTriple(Triple):
         super().save(*args, **kwargs)
 
         return self
+
+
+class Adjacency(models.Model):
+    """
+    A denormalized copy of the triples: every triple is stored twice, once
+    from the point of view of its subject (`FORWARD`) and once from the
+    point of view of its object (`REVERSE`), together with the contenttype
+    of the other side and the dates of the triple. So all the relations of
+    an entity can be read using one indexed lookup on `entity`.
+    The table is optional (see `apis_core.apis_relations.adjacency`).
+    """
+
+    FORWARD = "forward"
+    REVERSE = "reverse"
+    DIRECTIONS = [(FORWARD, "Forward"), (REVERSE, "Reverse")]
+
+    # the rows are kept in sync by signals, so there are no database
+    # constraints that would slow down the deletion of the triples
+    triple = models.ForeignKey(
+        Triple, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    entity = models.ForeignKey(
+        RootObject, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    other = models.ForeignKey(
+        RootObject, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    other_contenttype = models.ForeignKey(
+        ContentType,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    prop = models.ForeignKey(
+        Property, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    direction = models.CharField(max_length=7, choices=DIRECTIONS)
+    start_date = models.DateField(blank=True, null=True)
+    end_date = models.DateField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["entity", "other_contenttype"], name="adjacency_entity_idx"
+            ),
+            models.Index(fields=["other", "entity"], name="adjacency_other_idx"),
+            models.Index(fields=["prop", "entity"], name="adjacency_prop_idx"),
+            models.Index(fields=["triple"], name="adjacency_triple_idx"),
+        ]
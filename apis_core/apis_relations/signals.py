@@ -1,6 +1,8 @@
-from apis_core.apis_relations.models import TempTriple
+from apis_core.apis_relations import adjacency
+from apis_core.apis_relations.models import TempTriple, Triple
 from apis_core.apis_metainfo.models import RootObject
 from apis_core.apis_metainfo.signals import post_duplicate
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 import logging
@@ -20,3 +22,16 @@ def copy_relations(sender, instance, duplicate, **kwargs):
             newrel = rel.duplicate()
             newrel.obj = duplicate
             newrel.save()
+
+
+@receiver(post_save, dispatch_uid="sync_adjacency_on_save")
+def sync_adjacency_on_save(sender, instance, raw, using, **kwargs):
+    # raw saves (i.e. `loaddata`) are followed by a rebuild of the table
+    if isinstance(instance, Triple) and not raw:
+        adjacency.sync([instance.pk], using=using)
+
+
+@receiver(post_delete, dispatch_uid="sync_adjacency_on_delete")
+def sync_adjacency_on_delete(sender, instance, using, **kwargs):
+    if isinstance(instance, Triple):
+        adjacency.delete([instance.pk], using=using)
@@ -0,0 +1,435 @@
+"""
+A snapshot of the graph of the relations in compact arrays.
+
+The snapshot stores the triples as arrays of 32 bit integers in a
+directory, one file per array:
+
+* `triples`, `subjects`, `objects` and `props`: the ids of the triples,
+  their subjects, objects and properties
+* `nodes` and `contenttypes`: the sorted ids of all the root objects and
+  their contenttype ids; the nodes are referred to by their position
+* `indptr`, `indices` and `edges`: the relations of the nodes in
+  compressed sparse row format, in both directions - the neighbours of
+  the node at position `i` are `indices[indptr[i]:indptr[i + 1]]`, the
+  positions of the triples in the triple arrays are in `edges`
+* `components` and `component_sizes`: the connected component of every
+  node, labelled by the position of its first node, and the sizes of the
+  components by label
+
+The files are memory mapped when the snapshot is loaded, as NumPy arrays
+if NumPy is installed, so queries like the degree of a node, its k-hop
+neighbourhood and its connected component only read the parts of the
+arrays they need. The snapshot is built using the `apisgraphsnapshot`
+management command and can be refreshed using the `modified` timestamps
+of the triples, which reads only the triples that changed since the
+snapshot was built and updates the arrays using NumPy.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import sys
+from array import array
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apis_core.apis_metainfo.models import RootObject
+from apis_core.apis_relations.models import Triple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CHUNK_SIZE = 10000
+
+META = "meta.json"
+
+EDGE_ARRAYS = ["triples", "subjects", "objects", "props"]
+NODE_ARRAYS = ["nodes", "contenttypes"]
+GRAPH_ARRAYS = ["indptr", "indices", "edges", "components", "component_sizes"]
+
+
+def _zeros(length: int) -> array:
+    return array("i", bytes(4 * length))
+
+
+def _edge_triples(triples):
+    # the triples that are part of the graph
+    return triples.exclude(subj=None).exclude(obj=None)
+
+
+def _read_edges(triples) -> dict:
+    edges = {name: array("i") for name in EDGE_ARRAYS}
+    rows = _edge_triples(triples).order_by("pk")
+    for pk, subj, obj, prop in rows.values_list(
+        "pk", "subj_id", "obj_id", "prop_id"
+    ).iterator(chunk_size=CHUNK_SIZE):
+        edges["triples"].append(pk)
+        edges["subjects"].append(subj)
+        edges["objects"].append(obj)
+        edges["props"].append(prop or 0)
+    return edges
+
+
+def _read_nodes(queryset) -> dict:
+    nodes = {name: array("i") for name in NODE_ARRAYS}
+    for pk, contenttype in (
+        queryset.order_by("pk")
+        .values_list("pk", "self_contenttype_id")
+        .iterator(chunk_size=CHUNK_SIZE)
+    ):
+        nodes["nodes"].append(pk)
+        nodes["contenttypes"].append(contenttype or 0)
+    return nodes
+
+
+def _build_graph(nodes: array, subjects: array, objects: array) -> dict:
+    """
+    Build the CSR arrays and the connected components of the graph.
+    Relations to nodes that are not part of `nodes` are left out.
+    """
+    count = len(nodes)
+    positions = {node: position for position, node in enumerate(nodes)}
+    pairs = []
+    for edge, (subj, obj) in enumerate(zip(subjects, objects)):
+        if subj in positions and obj in positions:
+            pairs.append((edge, positions[subj], positions[obj]))
+
+    indptr = _zeros(count + 1)
+    for _, subj, obj in pairs:
+        indptr[subj + 1] += 1
+        indptr[obj + 1] += 1
+    for position in range(count):
+        indptr[position + 1] += indptr[position]
+    indices = _zeros(indptr[count])
+    edges = _zeros(indptr[count])
+    fill = array("i", indptr[:count])
+    for edge, subj, obj in pairs:
+        for node, neighbour in ((subj, obj), (obj, subj)):
+            indices[fill[node]] = neighbour
+            edges[fill[node]] = edge
+            fill[node] += 1
+
+    # union find, the root of a component is its first node
+    parent = array("i", range(count))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for _, subj, obj in pairs:
+        subj, obj = find(subj), find(obj)
+        if subj != obj:
+            parent[max(subj, obj)] = min(subj, obj)
+    components = array("i", (find(node) for node in range(count)))
+    component_sizes = _zeros(count)
+    for component in components:
+        component_sizes[component] += 1
+
+    return {
+        "indptr": indptr,
+        "indices": indices,
+        "edges": edges,
+        "components": components,
+        "component_sizes": component_sizes,
+    }
+
+
+def _build_graph_numpy(nodes, subjects, objects) -> dict:
+    """
+    Build the same arrays as `_build_graph` using NumPy. The connected
+    components are labelled using min label propagation with pointer
+    jumping, so every node ends up with the position of the first node of
+    its component.
+    """
+    count = len(nodes)
+    nodes = numpy.asarray(nodes, dtype=numpy.int32)
+    subjects = numpy.asarray(subjects, dtype=numpy.int32)
+    objects = numpy.asarray(objects, dtype=numpy.int32)
+    edges = numpy.arange(len(subjects), dtype=numpy.int32)
+    subj = numpy.searchsorted(nodes, subjects).clip(max=max(count - 1, 0))
+    obj = numpy.searchsorted(nodes, objects).clip(max=max(count - 1, 0))
+    if count:
+        known = (nodes[subj] == subjects) & (nodes[obj] == objects)
+        edges, subj, obj = edges[known], subj[known], obj[known]
+    else:
+        edges, subj, obj = edges[:0], subj[:0], obj[:0]
+
+    # every relation is stored in both directions, in the order of the
+    # relations, like `_build_graph` does
+    sources = numpy.column_stack([subj, obj]).ravel()
+    targets = numpy.column_stack([obj, subj]).ravel()
+    order = numpy.argsort(sources, kind="stable")
+    indptr = numpy.zeros(count + 1, dtype=numpy.int32)
+    numpy.cumsum(numpy.bincount(sources, minlength=count), out=indptr[1:])
+
+    components = numpy.arange(count, dtype=numpy.int32)
+    while True:
+        labels = components.copy()
+        numpy.minimum.at(labels, subj, components[obj])
+        numpy.minimum.at(labels, obj, components[subj])
+        labels = labels[labels]
+        if numpy.array_equal(labels, components):
+            break
+        components = labels
+    component_sizes = numpy.bincount(components, minlength=count)
+
+    return {
+        "indptr": indptr,
+        "indices": targets[order].astype(numpy.int32),
+        "edges": numpy.repeat(edges, 2)[order].astype(numpy.int32),
+        "components": components,
+        "component_sizes": component_sizes.astype(numpy.int32),
+    }
+
+
+def _replace(path: Path, write):
+    # the files of a loaded snapshot are memory mapped, so they are
+    # replaced instead of overwritten
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as fh:
+        write(fh)
+    os.replace(temporary, path)
+
+
+def _write(directory: Path, arrays: dict, created):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, values in arrays.items():
+        _replace(directory / f"{name}.i32", values.tofile)
+    meta = {
+        "created": created.isoformat(),
+        "nodes": len(arrays["nodes"]),
+        "edges": len(arrays["triples"]),
+        "byteorder": sys.byteorder,
+    }
+    _replace(directory / META, lambda fh: fh.write(json.dumps(meta).encode()))
+
+
+def _map(path: Path):
+    """
+    Memory map a file of 32 bit integers, as NumPy array if NumPy is
+    installed, otherwise as memoryview.
+    """
+    if path.stat().st_size == 0:
+        return numpy.zeros(0, dtype=numpy.int32) if numpy else array("i")
+    if numpy is not None:
+        return numpy.memmap(path, dtype=numpy.int32, mode="r")
+    with open(path, "rb") as fh:
+        return memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)).cast("i")
+
+
+class GraphSnapshot:
+    """
+    A snapshot of the graph of the relations, loaded from `directory`.
+    The queries take and return the ids of the root objects.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / META).read_text())
+        if self.meta["byteorder"] != sys.byteorder:
+            raise ValueError("The snapshot was built with another byte order")
+        self.created = parse_datetime(self.meta["created"])
+        for name in EDGE_ARRAYS + NODE_ARRAYS + GRAPH_ARRAYS:
+            setattr(self, name, _map(self.directory / f"{name}.i32"))
+
+    @classmethod
+    def build(cls, directory, using: str = None) -> "GraphSnapshot":
+        """
+        Build a snapshot of all the triples and root objects and write
+        it to `directory`.
+        """
+        created = timezone.now()
+        arrays = _read_edges(Triple.objects.using(using))
+        arrays.update(_read_nodes(RootObject.objects.using(using)))
+        build_graph = _build_graph if numpy is None else _build_graph_numpy
+        arrays.update(
+            build_graph(arrays["nodes"], arrays["subjects"], arrays["objects"])
+        )
+        _write(Path(directory), arrays, created)
+        return cls(directory)
+
+    def refresh(self, using: str = None) -> "GraphSnapshot":
+        """
+        Update the snapshot with the triples that were changed or created
+        and the root objects that were created since it was built, write
+        it to its directory and return the new snapshot. Only the triples
+        changed since the snapshot was built are read, the ids of all the
+        triples are only read if the number of triples shows that some were
+        deleted. Root objects that were deleted stay part of the snapshot
+        (without relations) until it is built again. The refresh needs
+        NumPy, without it the snapshot is built again.
+        """
+        if numpy is None:
+            return self.build(self.directory, using)
+        created = timezone.now()
+        triples = Triple.objects.using(using)
+        changed_triples = triples.filter(modified__gte=self.created)
+        changed = _read_edges(changed_triples)
+        changed_ids = numpy.fromiter(
+            changed_triples.values_list("pk", flat=True), dtype=numpy.int32
+        )
+        keep = ~numpy.isin(self.triples, changed_ids)
+        kept = keep.sum() + len(changed["triples"])
+        if _edge_triples(triples).count() != kept:
+            # some triples were deleted
+            existing = numpy.fromiter(
+                triples.values_list("pk", flat=True).iterator(CHUNK_SIZE),
+                dtype=numpy.int32,
+            )
+            keep &= numpy.isin(self.triples, existing)
+        arrays = {
+            name: numpy.concatenate(
+                [getattr(self, name)[keep], numpy.asarray(changed[name], "int32")]
+            )
+            for name in EDGE_ARRAYS
+        }
+
+        last = int(self.nodes[-1]) if len(self.nodes) else 0
+        new = _read_nodes(RootObject.objects.using(using).filter(pk__gt=last))
+        for name in NODE_ARRAYS:
+            arrays[name] = numpy.concatenate(
+                [getattr(self, name), numpy.asarray(new[name], "int32")]
+            )
+        arrays.update(
+            _build_graph_numpy(arrays["nodes"], arrays["subjects"], arrays["objects"])
+        )
+        _write(self.directory, arrays, created)
+        return self.__class__(self.directory)
+
+    def position(self, node: int):
+        """
+        Return the position of the node with the id `node` or None if
+        it is not part of the snapshot.
+        """
+        if numpy is not None:
+            position = int(numpy.searchsorted(self.nodes, node))
+        else:
+            position = bisect.bisect_left(self.nodes, node)
+        if position < len(self.nodes) and self.nodes[position] == node:
+            return position
+        return None
+
+    def _neighbour_positions(self, position: int) -> list:
+        return self.indices[self.indptr[position] : self.indptr[position + 1]].tolist()
+
+    def degree(self, node: int) -> int:
+        """
+        Return the number of relations of the node (relations of a node
+        to itself count twice).
+        """
+        position = self.position(node)
+        if position is None:
+            return 0
+        return int(self.indptr[position + 1] - self.indptr[position])
+
+    def neighbours(self, node: int, props: list = None) -> list:
+        """
+        Return (id, property id, triple id) tuples for the relations of
+        the node, optionally only the ones with one of the properties
+        `props`.
+        """
+        position = self.position(node)
+        if position is None:
+            return []
+        start, end = self.indptr[position], self.indptr[position + 1]
+        neighbours = []
+        for neighbour, edge in zip(
+            self.indices[start:end].tolist(), self.edges[start:end].tolist()
+        ):
+            prop = int(self.props[edge])
+            if props is None or prop in props:
+                neighbours.append(
+                    (int(self.nodes[neighbour]), prop, int(self.triples[edge]))
+                )
+        return neighbours
+
+    def k_hop(self, node: int, depth: int = 1, props: list = None) -> dict:
+        """
+        Return a dict mapping the ids of the nodes that are at most `depth`
+        relations away from the node to their distance, optionally only
+        following relations with one of the properties `props`.
+        """
+        start = self.position(node)
+        if start is None:
+            return {}
+        distances = {start: 0}
+        frontier = [start]
+        for distance in range(1, depth + 1):
+            next_frontier = []
+            for position in frontier:
+                first, last = self.indptr[position], self.indptr[position + 1]
+                neighbours = self.indices[first:last].tolist()
+                if props is not None:
+                    edges = self.edges[first:last].tolist()
+                    neighbours = [
+                        neighbour
+                        for neighbour, edge in zip(neighbours, edges)
+                        if self.props[edge] in props
+                    ]
+                for neighbour in neighbours:
+                    if neighbour not in distances:
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return {
+            int(self.nodes[position]): distance
+            for position, distance in distances.items()
+        }
+
+    def component(self, node: int):
+        """
+        Return the id of the first node of the connected component of the
+        node, which identifies the component, or None.
+        """
+        position = self.position(node)
+        if position is None:
+            return None
+        return int(self.nodes[self.components[position]])
+
+    def component_size(self, node: int) -> int:
+        position = self.position(node)
+        if position is None:
+            return 0
+        return int(self.component_sizes[self.components[position]])
+
+    def component_members(self, node: int) -> list:
+        """
+        Return the ids of the nodes of the connected component of the node.
+        """
+        position = self.position(node)
+        if position is None:
+            return []
+        label = self.components[position]
+        if numpy is not None:
+            return self.nodes[self.components == label].tolist()
+        return [
+            self.nodes[member]
+            for member, component in enumerate(self.components)
+            if component == label
+        ]
+
+
+_snapshot = None
+
+
+def get_snapshot():
+    """
+    Return the snapshot in the `APIS_GRAPH_SNAPSHOT_DIRECTORY` or None if
+    there is no snapshot. The snapshot is loaded again when it changed.
+    """
+    global _snapshot
+    directory = getattr(settings, "APIS_GRAPH_SNAPSHOT_DIRECTORY", None)
+    if directory is None or not (Path(directory) / META).exists():
+        return None
+    modified = (Path(directory) / META).stat().st_mtime_ns
+    if _snapshot is None or _snapshot[0] != Path(directory) or _snapshot[1] != modified:
+        _snapshot = (Path(directory), modified, GraphSnapshot(directory))
+    return _snapshot[2]
@@ -0,0 +1,120 @@
+"""
+Query the temporal triples by their dates.
+
+The dates of a `TempTriple` are fuzzy: a written date like "1900" is parsed
+into the `start_date` 1900-07-02 and the range from `start_start_date`
+1900-01-01 to `start_end_date` 1900-12-31, while exact dates only set the
+`start_date` (see `apis_core.utils.DateParser`). So a triple has two
+periods:
+
+* the *possible* period, from the earliest possible start to the latest
+  possible end (`start_start_date` and `end_end_date`)
+* the *certain* period, from the latest possible start to the earliest
+  possible end (`start_end_date` and `end_start_date`)
+
+both falling back to `start_date` and `end_date` for exact dates. Missing
+dates are unbounded, they are replaced by `date.min` and `date.max`, so the
+bounds of a period are never NULL and every query compares both bounds of
+one of the periods with plain range conditions. The `TempTriple.Meta.indexes`
+contain a composite index on the expressions of the bounds of each period,
+which is used by the queries. The functions take a queryset of temporal
+triples, they are also available as methods of the `TempTriple` querysets
+(i.e. `TempTriple.objects.valid_at(date)`). Querysets of other triples are
+filtered using a subquery (see `overlapping_triples`), as a join of the
+temporal triples can not use the indexes.
+"""
+
+import datetime
+
+from django.apps import apps
+from django.db.models import DateField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+MIN_DATE = datetime.date.min
+MAX_DATE = datetime.date.max
+
+
+def _literal(date):
+    # the dates are part of the SQL instead of being passed as parameters,
+    # otherwise the expressions of the queries do not match the expressions
+    # of the indexes
+    return RawSQL(f"'{date.isoformat()}'", [], output_field=DateField())
+
+
+def period(certain: bool = False) -> tuple:
+    """
+    Return the expressions of the lower and the upper bound of the
+    possible or the `certain` period of the temporal triples.
+    """
+    start, end = ("start_end", "end_start") if certain else ("start_start", "end_end")
+    return (
+        Coalesce(
+            f"{start}_date",
+            "start_date",
+            _literal(MIN_DATE),
+        ),
+        Coalesce(
+            f"{end}_date",
+            "end_date",
+            _literal(MAX_DATE),
+        ),
+    )
+
+
+def overlapping(queryset, start=None, end=None, certain=False):
+    """
+    Filter the triples whose possible (or `certain`) period overlaps the
+    range from `start` to `end`. A missing `start` or `end` leaves the
+    range open on that side. Triples without dates are unbounded and
+    overlap every range.
+    """
+    lower, upper = period(certain)
+    queryset = queryset.alias(_period_lower=lower, _period_upper=upper)
+    if end is not None:
+        queryset = queryset.filter(_period_lower__lte=end)
+    if start is not None:
+        queryset = queryset.filter(_period_upper__gte=start)
+    return queryset
+
+
+def valid_at(queryset, date, certain=False):
+    """
+    Filter the triples that were possibly (or `certain`ly) valid at `date`.
+    """
+    return overlapping(queryset, date, date, certain)
+
+
+def during(queryset, start=None, end=None, certain=False):
+    """
+    Filter the triples that lie within the range from `start` to `end`,
+    possibly or - if `certain` is set - certainly. A missing `start` or
+    `end` leaves the range open on that side, triples without a start or
+    an end date are unbounded and do not lie within ranges that are
+    bounded on that side.
+    """
+    # a triple certainly lies within the range if its possible period
+    # does and possibly lies within the range if its certain period does
+    lower, upper = period(not certain)
+    queryset = queryset.alias(_period_lower=lower, _period_upper=upper)
+    if start is not None:
+        queryset = queryset.filter(_period_lower__gte=start)
+    if end is not None:
+        queryset = queryset.filter(_period_upper__lte=end)
+    return queryset
+
+
+def overlapping_triples(queryset, start=None, end=None, certain=False):
+    """
+    Like `overlapping`, but for a queryset of triples of any kind. Triples
+    that are not temporal triples are treated as unbounded. The temporal
+    triples are filtered using a subquery, which uses the indexes.
+    """
+    temptriple = apps.get_model("apis_relations", "TempTriple")
+    if issubclass(queryset.model, temptriple):
+        return overlapping(queryset, start, end, certain)
+    temptriples = temptriple.objects.all()
+    return queryset.filter(
+        Q(pk__in=overlapping(temptriples, start, end, certain).values("pk"))
+        | ~Q(pk__in=temptriples.values("pk"))
+    )
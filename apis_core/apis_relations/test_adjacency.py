@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apis_core.apis_relations import adjacency
+from apis_core.apis_relations.models import Adjacency, Property, TempTriple
+from apis_core.utils.filtermethods import related_property_name, related_to
+
+
+@override_settings(APIS_ADJACENCY=True)
+class AdjacencyTestCase(TestCase):
+    def setUp(self):
+        contenttype = ContentType.objects.get_for_model(Property)
+        self.knows = Property.objects.create(name_forward="knows")
+        self.knows.subj_class.add(contenttype)
+        self.knows.obj_class.add(contenttype)
+        self.a, self.b, self.c = [
+            Property.objects.create(name_forward=f"node {i}") for i in range(3)
+        ]
+        self.triple = TempTriple.objects.create(
+            subj=self.a, obj=self.b, prop=self.knows, start_date_written="1900"
+        )
+
+    def rows(self):
+        return set(
+            Adjacency.objects.values_list(
+                "triple_id", "entity_id", "other_id", "direction", "start_date"
+            )
+        )
+
+    def test_signals(self):
+        self.triple.refresh_from_db()
+        start_date = self.triple.start_date
+        self.assertEqual(
+            self.rows(),
+            {
+                (self.triple.pk, self.a.pk, self.b.pk, "forward", start_date),
+                (self.triple.pk, self.b.pk, self.a.pk, "reverse", start_date),
+            },
+        )
+        adjacent = Adjacency.objects.get(entity=self.a)
+        self.assertEqual(
+            adjacent.other_contenttype, ContentType.objects.get_for_model(Property)
+        )
+
+        self.triple.obj = self.c
+        self.triple.save()
+        self.assertEqual(
+            {(entity, other) for _, entity, other, _, _ in self.rows()},
+            {(self.a.pk, self.c.pk), (self.c.pk, self.a.pk)},
+        )
+
+        self.c.delete()
+        self.assertEqual(self.rows(), set())
+
+    def test_sync(self):
+        TempTriple.objects.filter(pk=self.triple.pk).update(obj=self.c)
+        adjacency.sync(TempTriple.objects.filter(pk=self.triple.pk))
+        self.assertEqual(
+            {(entity, other) for _, entity, other, _, _ in self.rows()},
+            {(self.a.pk, self.c.pk), (self.c.pk, self.a.pk)},
+        )
+
+    def test_rebuild(self):
+        Adjacency.objects.all().delete()
+        out = StringIO()
+        call_command("apisrebuildadjacency", stdout=out)
+        self.assertIn("2 rows", out.getvalue())
+        self.assertEqual(len(self.rows()), 2)
+
+    def test_related_to(self):
+        queryset = Property.objects.all()
+        a = Property.objects.filter(pk=self.a.pk).values("pk")
+        self.assertCountEqual(related_to(queryset, subjects=a), [self.b])
+        self.assertCountEqual(related_to(queryset, objects=a), [])
+        self.assertCountEqual(related_to(queryset, subjects=a, objects=a), [self.b])
+        with self.assertNumQueries(1):
+            results = list(related_property_name(queryset, "related", "knows"))
+        self.assertCountEqual(results, [self.a, self.b])
+
+    @override_settings(APIS_ADJACENCY=False)
+    def test_disabled(self):
+        Adjacency.objects.all().delete()
+        TempTriple.objects.create(subj=self.b, obj=self.c, prop=self.knows)
+        self.assertEqual(self.rows(), set())
@@ -0,0 +1,93 @@
+import csv
+import io
+import unittest
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+
+from apis_core.apis_relations import export
+from apis_core.apis_relations.models import Property, TempTriple, Triple
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class ExportTestCase(TestCase):
+    url = "/apis/relations/triple/export/"
+
+    @classmethod
+    def setUpTestData(cls):
+        contenttype = ContentType.objects.get_for_model(Property)
+        cls.knows = Property.objects.create(name_forward="knows")
+        cls.knows.subj_class.add(contenttype)
+        cls.knows.obj_class.add(contenttype)
+        cls.nodes = [
+            Property.objects.create(name_forward=f"node {i}") for i in range(3)
+        ]
+        a, b, c = cls.nodes
+        TempTriple.objects.create(
+            subj=a, obj=b, prop=cls.knows, start_date_written="1900"
+        )
+        Triple.objects.create(subj=b, obj=c, prop=cls.knows)
+        cls.user = User.objects.create_superuser("apis", "apis@example.org", "apis")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_rows(self):
+        with self.assertNumQueries(3):
+            chunks = list(export.export_rows(Triple.objects.all(), chunk_size=1))
+        self.assertEqual(len(chunks), 2)
+        row = chunks[0][0]
+        self.assertEqual(len(row), len(export.COLUMNS))
+        self.assertEqual(
+            row[1:9],
+            (
+                self.nodes[0].pk,
+                "node 0",
+                "apis_relations.property",
+                self.knows.pk,
+                "knows",
+                self.nodes[1].pk,
+                "node 1",
+                "apis_relations.property",
+            ),
+        )
+        self.assertEqual(row[11], "1900")
+        self.assertEqual(chunks[1][0][9:], (None, None, None, None))
+
+    def test_rows_temptriples(self):
+        chunks = list(export.export_rows(TempTriple.objects.all()))
+        self.assertEqual(len(chunks[0]), 1)
+        row = chunks[0][0]
+        self.assertEqual(row[1:3], (self.nodes[0].pk, "node 0"))
+        self.assertEqual(row[11], "1900")
+
+    def test_csv(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row["subj_label"] for row in rows], ["node 0", "node 1"])
+        self.assertEqual(rows[0]["start_date"], "1900-07-02")
+
+    def test_filters(self):
+        response = self.client.get(self.url, {"valid_at": "1899-01-01"})
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row["obj_label"] for row in rows], ["node 2"])
+
+    def test_formats(self):
+        response = self.client.get(self.url, {"format": "xlsx"})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get("/apis/relations/property/export/")
+        self.assertEqual(response.status_code, 404)
+
+    @unittest.skipIf(export.pyarrow is None, "pyarrow is not installed")
+    def test_arrow(self):
+        response = self.client.get(self.url, {"format": "arrow"})
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content)
+        table = export.pyarrow.ipc.open_stream(content).read_all()
+        self.assertEqual(table.column_names, export.COLUMNS)
+        self.assertEqual(table.column("obj_label").to_pylist(), ["node 1", "node 2"])
@@ -0,0 +1,100 @@
+import json
+from datetime import date
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apis_core.apis_relations.models import Property, TempTriple
+from apis_core.apis_relations.graph import graph_edges, graph_nodes, graph_triples
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class GraphExportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        contenttype = ContentType.objects.get_for_model(Property)
+        cls.knows = Property.objects.create(name_forward="knows")
+        cls.likes = Property.objects.create(name_forward="likes")
+        for prop in [cls.knows, cls.likes]:
+            prop.subj_class.add(contenttype)
+            prop.obj_class.add(contenttype)
+        cls.nodes = [
+            Property.objects.create(name_forward=f"node {i}") for i in range(4)
+        ]
+        a, b, c, d = cls.nodes
+        TempTriple.objects.create(
+            subj=a,
+            obj=b,
+            prop=cls.knows,
+            start_date_written="1900",
+            end_date_written="1910",
+        )
+        TempTriple.objects.create(
+            subj=b, obj=c, prop=cls.knows, start_date_written="1920"
+        )
+        TempTriple.objects.create(subj=c, obj=a, prop=cls.likes)
+        cls.user = User.objects.create_superuser("apis", "apis@example.org", "apis")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, params):
+        response = self.client.get("/apis/api/graph", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_graph(self):
+        triples = graph_triples()
+        # the ids of the nodes, their contenttypes and one query per
+        # concrete model, which does not join the other subclass tables
+        with self.assertNumQueries(3):
+            nodes = list(graph_nodes(triples))
+        self.assertEqual(
+            [node[0] for node in nodes], [node.pk for node in self.nodes[:3]]
+        )
+        self.assertEqual({node[2] for node in nodes}, {"property"})
+        with self.assertNumQueries(2):
+            edges = list(graph_edges(triples))
+        self.assertEqual([edge[3] for edge in edges], ["knows", "knows", "likes"])
+        self.assertEqual(edges[0][4:], (date(1900, 7, 2), date(1910, 7, 2)))
+
+    def test_filters(self):
+        triples = graph_triples(properties=[self.knows.pk])
+        self.assertEqual(triples.count(), 2)
+        triples = graph_triples(start=date(1911, 1, 1))
+        self.assertEqual(triples.count(), 2)
+        triples = graph_triples(start=date(1911, 1, 1), end=date(1915, 1, 1))
+        self.assertEqual(triples.count(), 1)
+        triples = graph_triples(entity_classes=[User])
+        self.assertEqual(triples.count(), 0)
+
+    def test_netjson(self):
+        graph = json.loads(self.get({"format": "netjson", "property": self.knows.pk}))
+        self.assertEqual(graph["type"], "NetworkGraph")
+        self.assertEqual(len(graph["nodes"]), 3)
+        self.assertEqual(len(graph["links"]), 2)
+        self.assertEqual(graph["links"][0]["properties"]["start_date"], "1900-07-02")
+
+    def test_graphml(self):
+        root = ElementTree.fromstring(self.get({"format": "graphml"}))
+        ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+        self.assertEqual(len(root.findall("g:graph/g:node", ns)), 3)
+        self.assertEqual(len(root.findall("g:graph/g:edge", ns)), 3)
+
+    def test_gexf(self):
+        root = ElementTree.fromstring(
+            self.get({"format": "gexf", "entity_class": "apis_relations.property"})
+        )
+        ns = {"g": "http://gexf.net/1.3"}
+        self.assertEqual(len(root.findall("g:graph/g:nodes/g:node", ns)), 3)
+        edges = root.findall("g:graph/g:edges/g:edge", ns)
+        self.assertEqual(edges[0].get("start"), "1900-07-02")
+
+    def test_invalid_params(self):
+        response = self.client.get("/apis/api/graph", {"start": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("start", response.json()[0])
@@ -0,0 +1,107 @@
+import tempfile
+from io import StringIO
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apis_core.apis_relations.models import Property, TempTriple
+from apis_core.apis_relations.snapshot import GraphSnapshot, numpy
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class GraphSnapshotTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        contenttype = ContentType.objects.get_for_model(Property)
+        self.knows = Property.objects.create(name_forward="knows")
+        self.likes = Property.objects.create(name_forward="likes")
+        for prop in [self.knows, self.likes]:
+            prop.subj_class.add(contenttype)
+            prop.obj_class.add(contenttype)
+        # a - b - c, d - e
+        self.a, self.b, self.c, self.d, self.e = [
+            Property.objects.create(name_forward=f"node {i}") for i in range(5)
+        ]
+        self.ab = TempTriple.objects.create(subj=self.a, obj=self.b, prop=self.knows)
+        self.bc = TempTriple.objects.create(subj=self.b, obj=self.c, prop=self.likes)
+        TempTriple.objects.create(subj=self.d, obj=self.e, prop=self.knows)
+        self.snapshot = GraphSnapshot.build(self.directory.name)
+
+    def test_queries(self):
+        snapshot = self.snapshot
+        self.assertEqual(snapshot.meta["edges"], 3)
+        self.assertEqual(snapshot.degree(self.b.pk), 2)
+        self.assertEqual(snapshot.degree(self.knows.pk), 0)
+        self.assertEqual(snapshot.degree(0), 0)
+        self.assertCountEqual(
+            snapshot.neighbours(self.b.pk),
+            [
+                (self.a.pk, self.knows.pk, self.ab.pk),
+                (self.c.pk, self.likes.pk, self.bc.pk),
+            ],
+        )
+        self.assertEqual(
+            snapshot.k_hop(self.a.pk, depth=2),
+            {self.a.pk: 0, self.b.pk: 1, self.c.pk: 2},
+        )
+        self.assertEqual(
+            snapshot.k_hop(self.a.pk, depth=2, props=[self.knows.pk]),
+            {self.a.pk: 0, self.b.pk: 1},
+        )
+        self.assertEqual(snapshot.component(self.c.pk), self.a.pk)
+        self.assertEqual(snapshot.component_size(self.c.pk), 3)
+        self.assertEqual(snapshot.component(self.e.pk), self.d.pk)
+        self.assertCountEqual(
+            snapshot.component_members(self.e.pk), [self.d.pk, self.e.pk]
+        )
+        self.assertEqual(snapshot.component_size(self.knows.pk), 1)
+
+    def test_refresh(self):
+        self.bc.delete()
+        TempTriple.objects.create(subj=self.c, obj=self.d, prop=self.knows)
+        f = Property.objects.create(name_forward="node f")
+        TempTriple.objects.create(subj=self.e, obj=f, prop=self.likes)
+        snapshot = self.snapshot.refresh()
+        self.assertEqual(snapshot.meta["edges"], 4)
+        self.assertEqual(snapshot.degree(self.b.pk), 1)
+        self.assertEqual(snapshot.component(f.pk), self.c.pk)
+        self.assertEqual(snapshot.component_size(self.c.pk), 4)
+        self.assertEqual(snapshot.component_size(self.a.pk), 2)
+        # the old snapshot is still readable
+        self.assertEqual(self.snapshot.degree(self.b.pk), 2)
+
+    @skipIf(numpy is None, "the refresh needs numpy")
+    def test_refresh_changes(self):
+        TempTriple.objects.create(subj=self.c, obj=self.d, prop=self.knows)
+        # the changed triples, their ids, the number of triples and the
+        # new root objects, without reading the ids of all the triples
+        with self.assertNumQueries(4):
+            snapshot = self.snapshot.refresh()
+        self.assertEqual(snapshot.meta["edges"], 4)
+        self.assertEqual(snapshot.component_size(self.e.pk), 5)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("apisgraphsnapshot", self.directory.name, "--refresh", stdout=out)
+        self.assertIn("3 relations", out.getvalue())
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("apis"))
+        url = f"/apis/api/graph/snapshot/{self.a.pk}"
+        self.assertEqual(client.get(url).status_code, 404)
+        with self.settings(APIS_GRAPH_SNAPSHOT_DIRECTORY=self.directory.name):
+            response = client.get(url, {"depth": 2, "property": self.knows.pk})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["degree"], 1)
+        self.assertEqual(data["component_size"], 3)
+        self.assertEqual(
+            data["neighbourhood"],
+            [{"id": self.a.pk, "distance": 0}, {"id": self.b.pk, "distance": 1}],
+        )
@@ -0,0 +1,130 @@
+import json
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apis_core.apis_relations.filtersets import TripleFilterSet
+from apis_core.apis_relations.models import Property, TempTriple, Triple
+from apis_core.apis_relations.temporal import overlapping_triples
+from apis_core.generic.filtersets import filterset_factory
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class TemporalTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        contenttype = ContentType.objects.get_for_model(Property)
+        cls.prop = Property.objects.create(name_forward="knows")
+        cls.prop.subj_class.add(contenttype)
+        cls.prop.obj_class.add(contenttype)
+        a, b = [Property.objects.create(name_forward=f"node {i}") for i in range(2)]
+        # possibly from 1900-01-01 to 1910-12-31,
+        # certainly from 1900-12-31 to 1910-01-01
+        cls.fuzzy = TempTriple.objects.create(
+            subj=a,
+            obj=b,
+            prop=cls.prop,
+            start_date_written="1900",
+            end_date_written="1910",
+        )
+        cls.open = TempTriple.objects.create(
+            subj=a, obj=b, prop=cls.prop, start_date_written="1920-05-01"
+        )
+        cls.undated = TempTriple.objects.create(subj=a, obj=b, prop=cls.prop)
+        cls.triple = Triple.objects.create(subj=b, obj=a, prop=cls.prop)
+        cls.user = User.objects.create_superuser("apis", "apis@example.org", "apis")
+
+    def assertTriples(self, queryset, triples):
+        self.assertEqual(
+            set(queryset.values_list("pk", flat=True)),
+            {triple.pk for triple in triples},
+        )
+
+    def test_valid_at(self):
+        triples = TempTriple.objects.all()
+        self.assertTriples(
+            triples.valid_at(date(1900, 3, 1)), [self.fuzzy, self.undated]
+        )
+        self.assertTriples(
+            triples.valid_at(date(1900, 3, 1), certain=True), [self.undated]
+        )
+        self.assertTriples(
+            triples.valid_at(date(1905, 1, 1), certain=True),
+            [self.fuzzy, self.undated],
+        )
+        self.assertTriples(
+            triples.valid_at(date(1920, 5, 1)), [self.open, self.undated]
+        )
+        self.assertTriples(triples.valid_at(date(1920, 4, 30)), [self.undated])
+
+    def test_overlapping(self):
+        triples = TempTriple.objects.all()
+        self.assertTriples(
+            triples.overlapping(date(1910, 6, 1), date(1915, 1, 1)),
+            [self.fuzzy, self.undated],
+        )
+        self.assertTriples(
+            triples.overlapping(date(1910, 6, 1), date(1915, 1, 1), certain=True),
+            [self.undated],
+        )
+        self.assertTriples(
+            triples.overlapping(start=date(1950, 1, 1)), [self.open, self.undated]
+        )
+        self.assertTriples(triples.overlapping(end=date(1899, 1, 1)), [self.undated])
+
+    def test_during(self):
+        triples = TempTriple.objects.all()
+        self.assertTriples(
+            triples.during(date(1900, 6, 1), date(1911, 1, 1)), [self.fuzzy]
+        )
+        self.assertTriples(
+            triples.during(date(1900, 6, 1), date(1911, 1, 1), certain=True), []
+        )
+        self.assertTriples(
+            triples.during(date(1899, 1, 1), date(1911, 1, 1), certain=True),
+            [self.fuzzy],
+        )
+        self.assertTriples(triples.during(start=date(1915, 1, 1)), [self.open])
+
+    def test_indexes(self):
+        plan = TempTriple.objects.valid_at(date(1900, 1, 1)).explain()
+        self.assertIn("temptriple_possible_idx", plan)
+        plan = TempTriple.objects.valid_at(date(1900, 1, 1), certain=True).explain()
+        self.assertIn("temptriple_certain_idx", plan)
+
+    def test_overlapping_triples(self):
+        triples = overlapping_triples(Triple.objects.all(), date(1930, 1, 1))
+        self.assertTriples(triples, [self.open, self.undated, self.triple])
+
+    def test_filterset(self):
+        triple_filterset = filterset_factory(Triple, TripleFilterSet)
+        temptriple_filterset = filterset_factory(TempTriple, TripleFilterSet)
+        data = {"valid_at": "1900-03-01"}
+        filterset = triple_filterset(data, queryset=Triple.objects.all())
+        self.assertTriples(filterset.qs, [self.fuzzy, self.undated, self.triple])
+        data["certain"] = "true"
+        filterset = temptriple_filterset(data, queryset=TempTriple.objects.all())
+        self.assertTriples(filterset.qs, [self.undated])
+        data = {"period_after": "1912-01-01", "period_before": "1921-01-01"}
+        filterset = temptriple_filterset(data, queryset=TempTriple.objects.all())
+        self.assertTriples(filterset.qs, [self.open, self.undated])
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(
+            "/apis/api/graph",
+            {"format": "netjson", "valid_at": "1900-03-01", "certain": "true"},
+        )
+        graph = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(
+            {link["properties"]["id"] for link in graph["links"]},
+            {self.undated.pk, self.triple.pk},
+        )
+        response = client.get(
+            "/apis/api/graph", {"valid_at": "1900-03-01", "start": "1900-01-01"}
+        )
+        self.assertEqual(response.status_code, 400)
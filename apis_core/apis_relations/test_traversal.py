@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apis_core.apis_relations.graph import graph_triples
+from apis_core.apis_relations.models import Property, TempTriple
+from apis_core.apis_relations.traversal import k_hop, shortest_path
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class TraversalTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        contenttype = ContentType.objects.get_for_model(Property)
+        cls.knows = Property.objects.create(name_forward="knows")
+        cls.likes = Property.objects.create(name_forward="likes")
+        for prop in [cls.knows, cls.likes]:
+            prop.subj_class.add(contenttype)
+            prop.obj_class.add(contenttype)
+        # a - b - c - d, a - e, f is not connected
+        cls.a, cls.b, cls.c, cls.d, cls.e, cls.f = [
+            Property.objects.create(name_forward=f"node {i}") for i in range(6)
+        ]
+        TempTriple.objects.create(
+            subj=cls.a, obj=cls.b, prop=cls.knows, start_date_written="1900"
+        )
+        TempTriple.objects.create(
+            subj=cls.c, obj=cls.b, prop=cls.knows, start_date_written="1950"
+        )
+        TempTriple.objects.create(subj=cls.c, obj=cls.d, prop=cls.likes)
+        TempTriple.objects.create(subj=cls.a, obj=cls.e, prop=cls.likes)
+        cls.user = User.objects.create_superuser("apis", "apis@example.org", "apis")
+
+    def test_k_hop(self):
+        subgraph = k_hop(self.a.pk, depth=2)
+        self.assertEqual(
+            subgraph.nodes, {self.a.pk: 0, self.b.pk: 1, self.e.pk: 1, self.c.pk: 2}
+        )
+        self.assertEqual(len(subgraph.edges), 3)
+        self.assertFalse(subgraph.truncated)
+
+    def test_k_hop_queries(self):
+        # one query per step, independent of the number of nodes
+        with self.assertNumQueries(3):
+            k_hop(self.a.pk, depth=3)
+
+    def test_k_hop_filters(self):
+        triples = graph_triples(properties=[self.knows.pk])
+        subgraph = k_hop(self.a.pk, depth=3, triples=triples)
+        self.assertEqual(set(subgraph.nodes), {self.a.pk, self.b.pk, self.c.pk})
+        triples = graph_triples(end="1920-01-01")
+        subgraph = k_hop(self.b.pk, depth=1, triples=triples)
+        self.assertEqual(set(subgraph.nodes), {self.a.pk, self.b.pk})
+
+    def test_k_hop_limits(self):
+        subgraph = k_hop(self.a.pk, depth=2, fan_out=1)
+        self.assertTrue(subgraph.truncated)
+        self.assertEqual(len(subgraph.nodes), 3)
+        subgraph = k_hop(self.a.pk, depth=3, max_nodes=2)
+        self.assertTrue(subgraph.truncated)
+        self.assertEqual(len(subgraph.nodes), 2)
+
+    def test_shortest_path(self):
+        subgraph = shortest_path(self.e.pk, self.d.pk)
+        self.assertEqual(
+            subgraph.nodes,
+            {self.e.pk: 0, self.a.pk: 1, self.b.pk: 2, self.c.pk: 3, self.d.pk: 4},
+        )
+        self.assertEqual(len(subgraph.edges), 4)
+        self.assertIsNone(shortest_path(self.e.pk, self.d.pk, max_depth=3))
+        self.assertIsNone(shortest_path(self.a.pk, self.f.pk))
+        self.assertEqual(shortest_path(self.a.pk, self.a.pk).nodes, {self.a.pk: 0})
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = f"/apis/api/graph/neighbourhood/{self.a.pk}"
+        response = client.get(url, {"depth": 2, "property": self.knows.pk})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            {node["id"] for node in data["nodes"]}, {self.a.pk, self.b.pk, self.c.pk}
+        )
+        self.assertEqual({edge["label"] for edge in data["edges"]}, {"knows"})
+        node = next(node for node in data["nodes"] if node["id"] == self.b.pk)
+        self.assertEqual(node["type"], "apis_relations.property")
+
+        self.assertEqual(client.get(url, {"depth": 100}).status_code, 400)
+        response = client.get("/apis/api/graph/neighbourhood/0")
+        self.assertEqual(response.status_code, 404)
+
+        response = client.get(f"/apis/api/graph/path/{self.e.pk}/{self.d.pk}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["edges"]), 4)
+        response = client.get(f"/apis/api/graph/path/{self.a.pk}/{self.f.pk}")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,222 @@
+"""
+Traverse the graph of the relations.
+
+The relations are traversed breadth first in both directions. Every step
+expands the whole frontier using one query per `BATCH_SIZE` nodes, that
+reads the edges of the triples using `values_list` - so the number of
+queries grows with the depth of the traversal and not with the number of
+nodes. The triples that are traversed can be filtered the same way as the
+graph export (see `apis_core.apis_relations.graph.graph_triples`), the
+size of the results is limited by the depth, the number of nodes and the
+number of edges that are followed per node (the fan-out).
+"""
+
+from collections import Counter
+
+from django.db.models import Q
+
+from apis_core.apis_metainfo.models import RootObject, get_concrete_instances
+from apis_core.apis_relations.graph import graph_triples
+from apis_core.apis_relations.models import Property
+
+# the number of nodes per frontier query, this stays below the limit
+# of query parameters of SQLite
+BATCH_SIZE = 500
+
+EDGE_FIELDS = [
+    "pk",
+    "subj_id",
+    "obj_id",
+    "prop_id",
+    "temptriple__start_date",
+    "temptriple__end_date",
+]
+
+
+class Subgraph:
+    """
+    The result of a traversal: `nodes` maps the ids of the nodes to their
+    distance from the start, `edges` maps the ids of the triples to
+    (id, subj_id, obj_id, prop_id, start_date, end_date) tuples.
+    `truncated` is set if a limit stopped the traversal.
+    """
+
+    def __init__(self, nodes=None, edges=None, truncated=False):
+        self.nodes = nodes or {}
+        self.edges = edges or {}
+        self.truncated = truncated
+
+    def as_dict(self) -> dict:
+        """
+        Return the subgraph as a dict of nodes and edges with their
+        labels, which can be serialized to JSON.
+        """
+        instances = get_concrete_instances(RootObject, self.nodes)
+        props = {edge[3] for edge in self.edges.values() if edge[3] is not None}
+        labels = dict(
+            Property.objects.filter(pk__in=props).values_list("pk", "name_forward")
+        )
+        nodes = []
+        for pk, distance in self.nodes.items():
+            instance = instances.get(pk)
+            nodes.append(
+                {
+                    "id": pk,
+                    "label": str(instance) if instance else None,
+                    "type": instance._meta.label_lower if instance else None,
+                    "distance": distance,
+                }
+            )
+        edges = []
+        for pk, source, target, prop, start_date, end_date in self.edges.values():
+            edges.append(
+                {
+                    "id": pk,
+                    "source": source,
+                    "target": target,
+                    "property": prop,
+                    "label": labels.get(prop),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                }
+            )
+        return {"nodes": nodes, "edges": edges, "truncated": self.truncated}
+
+
+def frontier_edges(triples, nodes):
+    """
+    Yield the edges of the `triples` that have one of the `nodes` as
+    subject or object, using one query per `BATCH_SIZE` nodes.
+    """
+    nodes = list(nodes)
+    for start in range(0, len(nodes), BATCH_SIZE):
+        batch = nodes[start : start + BATCH_SIZE]
+        yield from (
+            triples.filter(Q(subj_id__in=batch) | Q(obj_id__in=batch))
+            .order_by("pk")
+            .values_list(*EDGE_FIELDS)
+        )
+
+
+def _neighbours(edge, frontier):
+    """
+    Yield (node, neighbour) tuples for the sides of the `edge` that
+    are part of the `frontier`.
+    """
+    _, subj, obj = edge[:3]
+    if subj in frontier:
+        yield subj, obj
+    if obj in frontier and obj != subj:
+        yield obj, subj
+
+
+def k_hop(
+    entity_id: int,
+    depth: int = 1,
+    triples=None,
+    max_nodes: int = 1000,
+    fan_out: int = None,
+) -> Subgraph:
+    """
+    Return the subgraph of the nodes that are at most `depth` relations
+    away from the entity `entity_id`, together with the relations between
+    them that were traversed. At most `max_nodes` nodes are returned and
+    at most `fan_out` relations to new nodes are followed per node.
+    `triples` defaults to all the triples the current user can see (see
+    `graph_triples`).
+    """
+    if triples is None:
+        triples = graph_triples()
+    subgraph = Subgraph(nodes={entity_id: 0})
+    frontier = {entity_id}
+    for distance in range(1, depth + 1):
+        if not frontier:
+            break
+        degrees = Counter()
+        next_frontier = set()
+        for edge in frontier_edges(triples, frontier):
+            for node, neighbour in _neighbours(edge, frontier):
+                # relations to nodes that are already part of the
+                # subgraph are added, but do not count as followed
+                if neighbour not in subgraph.nodes:
+                    if fan_out is not None and degrees[node] >= fan_out:
+                        subgraph.truncated = True
+                        continue
+                    if len(subgraph.nodes) >= max_nodes:
+                        subgraph.truncated = True
+                        continue
+                    subgraph.nodes[neighbour] = distance
+                    next_frontier.add(neighbour)
+                    degrees[node] += 1
+                subgraph.edges[edge[0]] = edge
+        frontier = next_frontier
+    return subgraph
+
+
+def shortest_path(
+    source: int,
+    target: int,
+    triples=None,
+    max_depth: int = 6,
+    max_nodes: int = 100000,
+):
+    """
+    Return the subgraph of a shortest path of at most `max_depth`
+    relations between the entities `source` and `target` or None if
+    there is no such path. The search expands the smaller frontier of the
+    searches starting at the source and at the target, until they meet or
+    `max_nodes` nodes were visited. `triples` defaults to all the triples
+    the current user can see (see `graph_triples`).
+    """
+    if source == target:
+        return Subgraph(nodes={source: 0})
+    if triples is None:
+        triples = graph_triples()
+    # the nodes visited by each search, mapped to their distance
+    # and the edge and the node they were reached from
+    visited = [{source: (0, None, None)}, {target: (0, None, None)}]
+    frontiers = [{source}, {target}]
+    for _ in range(max_depth):
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other = visited[side], visited[1 - side]
+        frontier = frontiers[side]
+        next_frontier = set()
+        meetings = []
+        for edge in frontier_edges(triples, frontier):
+            for node, neighbour in _neighbours(edge, frontier):
+                if neighbour in own:
+                    continue
+                own[neighbour] = (own[node][0] + 1, edge, node)
+                next_frontier.add(neighbour)
+                if neighbour in other:
+                    meetings.append(neighbour)
+        if meetings:
+            meeting = min(meetings, key=lambda node: own[node][0] + other[node][0])
+            return _path(visited, meeting)
+        if not next_frontier or sum(map(len, visited)) >= max_nodes:
+            return None
+        frontiers[side] = next_frontier
+    return None
+
+
+def _path(visited, meeting) -> Subgraph:
+    """
+    Build the subgraph of the path through the `meeting` node by following
+    the edges the searches reached it from back to the source and the target.
+    """
+    steps = []
+    node = meeting
+    while visited[0][node][1] is not None:
+        _, edge, node = visited[0][node]
+        steps.insert(0, (node, edge))
+    nodes = [node for node, _ in steps] + [meeting]
+    edges = [edge for _, edge in steps]
+    node = meeting
+    while visited[1][node][1] is not None:
+        _, edge, node = visited[1][node]
+        nodes.append(node)
+        edges.append(edge)
+    return Subgraph(
+        nodes={node: distance for distance, node in enumerate(nodes)},
+        edges={edge[0]: edge for edge in edges},
+    )
@@ -17,6 +17,11 @@ urlpatterns = [
         views.GenericRelationView.as_view(),
         name="generic_relations_list",
     ),
+    re_path(
+        r"^(?P<entity>[a-z0-9_]+)/export/$",
+        views.GenericRelationExport.as_view(),
+        name="generic_relations_export",
+    ),
     re_path(
         r"^autocomplete/(?P<entity_self>[a-zA-Z0-9-_]+)/(?P<entity_other>[a-zA-Z0-9-_]+)/$",
         PropertyAutocomplete.as_view(),
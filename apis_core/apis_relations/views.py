@@ -1,13 +1,14 @@
 import json
 
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 
 from apis_core.apis_relations.forms import GenericTripleForm
 from apis_core.apis_entities.autocomplete3 import PropertyAutocomplete
 
 from apis_core.apis_relations.models import Property, TempTriple, Triple
+from apis_core.apis_relations import export
 
 from apis_core.utils import caching
 
@@ -24,6 +25,32 @@ class GenericRelationView(List):
         self.queryset = self.model.objects.all()
 
 
+class GenericRelationExport(GenericRelationView):
+    """
+    Stream the relations, filtered the same way as the list of the
+    relations, as CSV or as Arrow IPC stream (`format` parameter, `csv`
+    or `arrow`), see `apis_core.apis_relations.export`.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if not issubclass(self.model, Triple):
+            raise Http404("Only relations can be exported")
+        fmt = request.GET.get("format", "csv")
+        if fmt not in export.WRITERS or (fmt == "arrow" and export.pyarrow is None):
+            raise Http404(f"The format `{fmt}` is not available")
+        writer, content_type, extension = export.WRITERS[fmt]
+        filterset = self.get_filterset(self.get_filterset_class())
+        if not filterset.is_bound or filterset.is_valid() or not self.get_strict():
+            triples = filterset.qs
+        else:
+            triples = filterset.queryset.none()
+        response = StreamingHttpResponse(writer(triples), content_type=content_type)
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="relations.{extension}"'
+        return response
+
+
 # TODO RDF: After full conversion to ne ajax logic, remove this function
 @login_required
 def get_form_ajax(request):
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apis_core.utils.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Compare optimized code paths of APIS with the regular ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+        parser.add_argument(
+            "--model",
+            default="apis_metainfo.rootobject",
+            help="The model to use, as `app_label.model`.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=100, help="The number of objects to use."
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Run every variant this many times and report the fastest run.",
+        )
+
+    def handle(self, *args, **options):
+        results = BENCHMARKS[options["benchmark"]](
+            options["model"], limit=options["limit"], repeat=options["repeat"]
+        )
+        baseline = results[0][1]
+        for label, seconds in results:
+            self.stdout.write(
+                f"{label:<20} {seconds * 1000:10.2f} ms {baseline / seconds:6.2f}x"
+            )
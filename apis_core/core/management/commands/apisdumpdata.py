@@ -1,6 +1,11 @@
-from django.core.management.base import BaseCommand
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
 
 from apis_core.utils.helpers import datadump_serializer
+from apis_core.utils.datadump import datadump_delta, datadump_shards
 
 
 class Command(BaseCommand):
@@ -13,6 +18,62 @@ class Command(BaseCommand):
             nargs="*",
             help=("Optional additional app_labels."),
         )
+        parser.add_argument(
+            "--shards",
+            metavar="DIRECTORY",
+            help=(
+                "Write a sharded datadump with a manifest to DIRECTORY "
+                "instead of printing the data. Load it using `apisloaddata`."
+            ),
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=0,
+            help=(
+                "Split models into shards of at most this many objects. "
+                "Defaults to 0, which means one shard per model."
+            ),
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of processes writing the shards in parallel.",
+        )
+        parser.add_argument(
+            "--since-revision",
+            type=int,
+            help=(
+                "Only dump objects changed or deleted after the revision with "
+                "this id. The output contains the revision id to use next time."
+            ),
+        )
+        parser.add_argument(
+            "--since",
+            help="Only dump objects changed or deleted after this ISO datetime.",
+        )
 
     def handle(self, *app_labels, **options):
+        if options["since_revision"] is not None or options["since"]:
+            since = None
+            if options["since"]:
+                since = parse_datetime(options["since"])
+                if since is None:
+                    raise CommandError("--since has to be an ISO datetime")
+            delta = datadump_delta(app_labels, options["since_revision"], since)
+            print(json.dumps(delta, cls=DjangoJSONEncoder))
+            return
+        if options["shards"]:
+            manifest = datadump_shards(
+                options["shards"],
+                app_labels,
+                shard_size=options["shard_size"],
+                processes=options["processes"],
+            )
+            count = sum(shard["count"] for shard in manifest["shards"])
+            self.stdout.write(
+                f"Wrote {count} objects in {len(manifest['shards'])} shards to {options['shards']}"
+            )
+            return
         print(datadump_serializer(app_labels, "json"))
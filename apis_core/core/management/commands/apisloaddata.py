@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apis_core.utils.datadump import load_shards
+
+
+class Command(BaseCommand):
+    help = "Load a sharded APIS datadump created by `apisdumpdata --shards`"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "directory",
+            help="The directory containing the shards and the manifest.",
+        )
+
+    def handle(self, *args, **options):
+        count = load_shards(options["directory"])
+        self.stdout.write(f"Loaded {count} objects from {options['directory']}")
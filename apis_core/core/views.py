@@ -3,8 +3,11 @@ import json
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from django.utils.dateparse import parse_datetime
 
 from apis_core.utils.helpers import datadump_serializer
+from apis_core.utils.datadump import datadump_delta
 
 
 class Dumpdata(APIView):
@@ -15,6 +18,12 @@ class Dumpdata(APIView):
     serialize the data using natural keys, then we use json.loads to so we can
     output it as an API reponse.
     so basically: serialize -> deserialize -> serialize
+
+    if a `since_revision` (a revision id) or a `since` (an ISO datetime)
+    parameter is passed, only the objects changed or deleted since then
+    are exported (see `apis_core.utils.datadump.datadump_delta`). The
+    `revision` in the response can be passed as `since_revision` to the
+    next request.
     """
 
     permission_classes = [IsAuthenticated]
@@ -24,4 +33,19 @@ class Dumpdata(APIView):
         app_labels = params.pop("app_labels", [])
         if app_labels:
             app_labels = app_labels.split(",")
+        since_revision = params.pop("since_revision", None)
+        since = params.pop("since", None)
+        if since_revision is not None or since is not None:
+            if since_revision is not None:
+                if not since_revision.isdigit():
+                    raise ValidationError("`since_revision` has to be a revision id")
+                since_revision = int(since_revision)
+            if since is not None:
+                try:
+                    since = parse_datetime(since)
+                except ValueError:
+                    since = None
+                if since is None:
+                    raise ValidationError("`since` has to be an ISO datetime")
+            return Response(datadump_delta(app_labels, since_revision, since))
         return Response(json.loads(datadump_serializer(app_labels, "json")))
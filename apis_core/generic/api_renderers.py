@@ -0,0 +1,27 @@
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    A JSON renderer for read only list endpoints. Viewsets using the
+    `ValuesListMixin` serialize the list results based on `QuerySet.values`
+    if this renderer is chosen (i.e. using `?format=fastjson`). If the
+    `orjson` package is installed, it is used to encode the data, otherwise
+    this falls back to the encoder of the default `JSONRenderer`.
+    """
+
+    format = "fastjson"
+    values = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data, default=JSONEncoder().default, option=orjson.OPT_NON_STR_KEYS
+        )
@@ -1,35 +1,70 @@
 from rest_framework import viewsets
-from .serializers import serializer_factory, GenericHyperlinkedModelSerializer
-from .helpers import module_paths, first_member_match
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .serializers import (
+    GenericHyperlinkedModelSerializer,
+    ValuesSerializer,
+)
+from .factories import cached_serializer_factory
+from .helpers import get_override
+from .pagination import GenericPagination
+from .api_renderers import FastJSONRenderer
 
 
-class ModelViewSet(viewsets.ModelViewSet):
+class ValuesListMixin:
+    """
+    Serialize the results of the list action using a `ValuesSerializer`,
+    if the accepted renderer asks for it (by setting its `values` attribute,
+    like the `FastJSONRenderer` does). If the serializer of the view can not
+    be handled by the `ValuesSerializer`, the list action falls back to the
+    regular serialization.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if getattr(request.accepted_renderer, "values", False):
+            serializer = ValuesSerializer(self.get_serializer())
+            if serializer.supported:
+                queryset = serializer.get_queryset(
+                    self.filter_queryset(self.get_queryset())
+                )
+                page = self.paginate_queryset(queryset)
+                if page is not None:
+                    return self.get_paginated_response(
+                        serializer.to_representation(page)
+                    )
+                return Response(serializer.to_representation(queryset))
+        return super().list(request, *args, **kwargs)
+
+
+class ModelViewSet(ValuesListMixin, viewsets.ModelViewSet):
     """
     API ViewSet for a generic model.
     The queryset is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
     The serializer class is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
+    The results are paginated using `GenericPagination`.
     """
 
+    pagination_class = GenericPagination
+    renderer_classes = tuple(api_settings.DEFAULT_RENDERER_CLASSES) + (
+        FastJSONRenderer,
+    )
+
     def dispatch(self, *args, **kwargs):
         self.model = kwargs.get("contenttype").model_class()
         return super().dispatch(*args, **kwargs)
 
     def get_queryset(self):
-        queryset_methods = module_paths(
-            self.model, path="querysets", suffix="ViewSetQueryset"
-        )
-        queryset = first_member_match(queryset_methods) or (lambda x: x)
+        queryset = get_override(self.model, "querysets", "ViewSetQueryset", lambda x: x)
         return queryset(self.model.objects.all())
 
     def get_serializer_class(self):
         renderer = self.request.accepted_renderer
-        serializer_class_modules = module_paths(
-            self.model, path="serializers", suffix="Serializer"
-        )
-        serializer_class = first_member_match(
-            serializer_class_modules,
+        serializer_class = get_override(
+            self.model,
+            "serializers",
+            "Serializer",
             getattr(renderer, "serializer", GenericHyperlinkedModelSerializer),
         )
-        return serializer_factory(self.model, serializer=serializer_class)
+        return cached_serializer_factory(self.model, serializer_class)
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class GenericConfig(AppConfig):
+    name = "apis_core.generic"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # look up the overrides now instead of in the first requests
+        if getattr(settings, "APIS_DISCOVER_OVERRIDES", True):
+            from .helpers import discover_overrides
+
+            discover_overrides()
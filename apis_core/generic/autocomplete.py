@@ -0,0 +1,130 @@
+"""
+Cache the results of the autocomplete views.
+
+The autocomplete views are queried on every keystroke, so their results are
+cached for a short time (`APIS_AUTOCOMPLETE_CACHE_TIMEOUT`). The cache stores
+the primary keys of the results of a query, if there are not more than
+`APIS_AUTOCOMPLETE_CACHE_MAX_RESULTS` of them. The results of a query that
+extends a cached query (i.e. "mozar" after "moza") are a subset of the cached
+results, so the search only has to look at the cached objects.
+
+The cache keys contain a version per model, which is changed whenever an
+instance of the model is saved or deleted, which invalidates all the cached
+results of the model (see `apis_core.generic.signals`). The cache keys also
+contain the permission scope of the user.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, When
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def _version_key(model) -> str:
+    return f"apis_autocomplete_version:{model._meta.label_lower}"
+
+
+def invalidate(model):
+    """
+    Invalidate the cached autocomplete results of `model` and its parents.
+    """
+    if not getattr(settings, "APIS_AUTOCOMPLETE_CACHE_TIMEOUT", 30):
+        return
+    for cls in [model] + model._meta.get_parent_list():
+        cache.set(_version_key(cls), time.time_ns(), None)
+
+
+def queryset_from_pks(model, pks: list):
+    """
+    Return a queryset of the instances of `model` with the primary
+    keys `pks`, in the order of the list.
+    """
+    if not pks:
+        return model.objects.none()
+    order = Case(
+        *[When(pk=pk, then=position) for position, pk in enumerate(pks)],
+        output_field=IntegerField(),
+    )
+    return model.objects.filter(pk__in=pks).order_by(order)
+
+
+class AutocompleteCache:
+    """
+    The autocomplete cache of one model for one user.
+    """
+
+    def __init__(self, model, user):
+        self.model = model
+        self.timeout = getattr(settings, "APIS_AUTOCOMPLETE_CACHE_TIMEOUT", 30)
+        self.max_results = getattr(settings, "APIS_AUTOCOMPLETE_CACHE_MAX_RESULTS", 500)
+        if self.enabled:
+            self.version = cache.get(_version_key(model), 0)
+            self.scope = self.get_scope(user)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.timeout)
+
+    def get_scope(self, user) -> str:
+        """
+        Users only share cached results if they have the same
+        permissions on the models of the app of the model.
+        """
+        if user.is_superuser:
+            return "superuser"
+        app_label = self.model._meta.app_label
+        permissions = sorted(
+            permission
+            for permission in user.get_all_permissions()
+            if permission.startswith(f"{app_label}.")
+        )
+        return hashlib.md5("|".join(permissions).encode()).hexdigest()
+
+    def key(self, query: str, kind: str = "pks") -> str:
+        query = hashlib.md5(query.encode()).hexdigest()
+        label = self.model._meta.label_lower
+        return f"apis_autocomplete:{kind}:{label}:{self.version}:{self.scope}:{query}"
+
+    def get(self, query: str, kind: str = "pks"):
+        return cache.get(self.key(query, kind))
+
+    def set(self, query: str, value, kind: str = "pks"):
+        cache.set(self.key(query, kind), value, self.timeout)
+
+    def get_prefix(self, query: str):
+        """
+        Return the cached primary keys of the longest prefix of `query`
+        or None if there are no cached results for any of its prefixes.
+        """
+        prefixes = {self.key(query[:end]): end for end in range(1, len(query))}
+        cached = cache.get_many(list(prefixes))
+        if cached:
+            return cached[max(cached, key=prefixes.get)]
+        return None
+
+    def search(self, query: str, search, narrow: bool = True):
+        """
+        Return a queryset of the results of `query`. `search` is a
+        function that filters a queryset by the query. If the results
+        are cached, they are used, otherwise the results are searched
+        in the results of the longest cached prefix of the query (if
+        `narrow` is set) or in all the instances of the model.
+        """
+        pks = self.get(query)
+        if pks is None:
+            queryset = self.model.objects.all()
+            prefix_pks = self.get_prefix(query) if narrow else None
+            if prefix_pks is not None:
+                queryset = queryset.filter(pk__in=prefix_pks)
+            queryset = search(queryset)
+            pks = list(queryset.values_list("pk", flat=True)[: self.max_results + 1])
+            if len(pks) > self.max_results:
+                return queryset
+            self.set(query, pks)
+        return queryset_from_pks(self.model, pks)
@@ -0,0 +1,70 @@
+"""
+Cache the classes the generic views create for the models.
+
+The generic views create their table, filterset, form and serializer
+classes using factories (`table_factory`, `filterset_factory`,
+`modelform_factory` and `serializer_factory`), which introspect the fields
+of the model. The classes only depend on the model, on the base class that
+is found using `first_member_match` and on a few options, so they are
+created once per combination of them and cached until the code is reloaded.
+The base classes are still looked up on every request, so overriding them
+works the same way as without the cache.
+"""
+
+import functools
+
+from django.forms import modelform_factory
+from django_tables2.columns import library
+from django_tables2.tables import table_factory
+
+from .filtersets import filterset_factory
+from .serializers import serializer_factory
+
+# the number of classes that are cached per factory, the columns of the
+# tables are chosen by the users, so the caches have to be bounded
+CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def cached_table_factory(model, table, columns: tuple = ()):
+    """
+    Return a table class for `model` based on `table`, with additional
+    columns for the fields of the model named in `columns`.
+    """
+    table_class = table_factory(model, table)
+    attrs = {
+        field.name: library.column_for_field(field, accessor=field.name)
+        for field in model._meta.fields
+        if field.name in columns
+    }
+    if attrs:
+        table_class = type(table_class)(table_class.__name__, (table_class,), attrs)
+    return table_class
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def cached_filterset_factory(model, filterset):
+    return filterset_factory(model, filterset)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def cached_modelform_factory(model, form):
+    return modelform_factory(model, form)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def cached_serializer_factory(model, serializer):
+    return serializer_factory(model, serializer=serializer)
+
+
+FACTORIES = [
+    cached_table_factory,
+    cached_filterset_factory,
+    cached_modelform_factory,
+    cached_serializer_factory,
+]
+
+
+def cache_clear():
+    for factory in FACTORIES:
+        factory.cache_clear()
@@ -1,6 +1,7 @@
 import functools
 import logging
 
+from django.apps import apps
 from django.db.models import CharField, TextField, Q, Model
 from django.contrib.auth import get_permission_codename
 from django.utils import module_loading
@@ -8,6 +9,22 @@ from django.utils import module_loading
 logger = logging.getLogger(__name__)
 
 
+def get_search_fields(model, fields_to_search=None) -> list:
+    """
+    Return the names of the fields of a model that are searched: all the
+    CharFields and TextFields or the fields listed in `fields_to_search`.
+    """
+    if isinstance(fields_to_search, list):
+        return [
+            field.name for field in model._meta.fields if field.name in fields_to_search
+        ]
+    return [
+        field.name
+        for field in model._meta.fields
+        if isinstance(field, (CharField, TextField))
+    ]
+
+
 def generate_search_filter(model, query, fields_to_search=None):
     """
     Generate a default search filter that searches for the `query`
@@ -17,17 +34,7 @@ def generate_search_filter(model, query, fields_to_search=None):
     fancier is needed.
     """
     query = query.split()
-
-    if isinstance(fields_to_search, list):
-        fields_to_search = [
-            field.name for field in model._meta.fields if field.name in fields_to_search
-        ]
-    else:
-        fields_to_search = [
-            field.name
-            for field in model._meta.fields
-            if isinstance(field, (CharField, TextField))
-        ]
+    fields_to_search = get_search_fields(model, fields_to_search)
 
     q = Q()
 
@@ -91,3 +98,59 @@ def first_member_match(dotted_path_list: tuple[str], fallback=None) -> object:
     else:
         logger.debug("Found nothing, returning fallback: %s", fallback)
     return result or fallback
+
+
+# the overrides the generic views and helpers look up for the models, as
+# (path, suffix) tuples - i.e. `("tables", "Table")` for the tables in
+# `<app>.tables.<Model>Table`
+OVERRIDES = [
+    ("tables", "Table"),
+    ("filtersets", "FilterSet"),
+    ("forms", "Form"),
+    ("forms", "ImportForm"),
+    ("serializers", "Serializer"),
+    ("querysets", "ListViewQueryset"),
+    ("querysets", "ViewSetQueryset"),
+    ("querysets", "AutocompleteQueryset"),
+    ("querysets", "ExternalAutocomplete"),
+    ("importers", "Importer"),
+]
+
+
+def get_override(model, path: str, suffix: str, fallback=None) -> object:
+    """
+    Return the override of `model` for `path` and `suffix` - i.e. the
+    first class found in `module_paths(model, path, suffix)` - or
+    `fallback`. The lookups are cached by `first_member_match`.
+    """
+    return first_member_match(module_paths(model, path, suffix), fallback)
+
+
+def discover_overrides(models: list = None) -> dict:
+    """
+    Look up all the `OVERRIDES` of the `models` (default: all the generic
+    models), which fills the caches of the lookups, and return a dict
+    mapping the models to dicts mapping the `path.suffix` of the overrides
+    to their dotted paths or None.
+    """
+    if models is None:
+        from apis_core.generic.abc import GenericModel
+
+        models = [
+            model for model in apps.get_models() if issubclass(model, GenericModel)
+        ]
+    report = {}
+    for model in models:
+        report[model] = {}
+        for path, suffix in OVERRIDES:
+            paths = module_paths(model, path, suffix)
+            override = first_member_match(paths)
+            report[model][f"{path}.{suffix}"] = next(
+                (
+                    dotted_path
+                    for dotted_path in paths
+                    if override and import_string(dotted_path) is override
+                ),
+                None,
+            )
+    return report
@@ -0,0 +1,48 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from apis_core.generic.helpers import OVERRIDES, discover_overrides
+
+
+class Command(BaseCommand):
+    help = (
+        "Look up the tables, filtersets, forms, serializers, querysets, "
+        "autocompletes and importers overriding the generic ones for the "
+        "given models, by default for all the generic models, and list them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models", nargs="*", help="The models to look up, as `app_label.model`."
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also list the lookups that did not find an override.",
+        )
+
+    def handle(self, *args, **options):
+        models = None
+        if options["models"]:
+            try:
+                models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        start = time.perf_counter()
+        report = discover_overrides(models)
+        duration = time.perf_counter() - start
+        found = 0
+        for model, overrides in report.items():
+            for kind, dotted_path in overrides.items():
+                if dotted_path is not None:
+                    found += 1
+                if dotted_path is not None or options["all"]:
+                    self.stdout.write(
+                        f"{model._meta.label_lower:<40} {kind:<32} {dotted_path or '-'}"
+                    )
+        self.stdout.write(
+            f"Found {found} overrides for {len(report)} models "
+            f"({len(report) * len(OVERRIDES)} lookups) in {duration * 1000:.0f} ms"
+        )
@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apis_core.apis_metainfo.models import RootObject
+from apis_core.generic.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the search index of the given models, by default of all "
+        "the subclasses of RootObject and the models in APIS_SEARCH_FIELDS"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models", nargs="*", help="The models to index, as `app_label.model`."
+        )
+        parser.add_argument(
+            "--database", default="default", help="The database to use."
+        )
+
+    def handle(self, *args, **options):
+        labels = options["models"]
+        if labels:
+            try:
+                models = [apps.get_model(label) for label in labels]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        else:
+            models = [
+                model
+                for model in apps.get_models()
+                if (issubclass(model, RootObject) and model is not RootObject)
+                or model._meta.label_lower
+                in getattr(settings, "APIS_SEARCH_FIELDS", {})
+            ]
+        backend = get_search_backend(options["database"])
+        for model in models:
+            if not backend.rebuild(model, using=options["database"]):
+                self.stdout.write(
+                    f"{backend.__class__.__name__} does not use a search index"
+                )
+                return
+            self.stdout.write(f"Rebuilt the search index of {model._meta.label}")
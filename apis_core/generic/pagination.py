@@ -0,0 +1,217 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from django_tables2 import paginators
+from rest_framework import pagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset, threshold: int = None, timeout: int = 0) -> int:
+    """
+    Return the number of rows of a queryset. For unfiltered querysets
+    on PostgreSQL the number is estimated using the query planner
+    statistics, if the estimate is bigger than `threshold` - counting the
+    exact number of rows of big tables takes a sequential scan.
+    The threshold defaults to the `APIS_ESTIMATE_COUNT_THRESHOLD` setting.
+    Other counts are cached for `timeout` seconds (see `cached_count`).
+    """
+    if threshold is None:
+        threshold = getattr(settings, "APIS_ESTIMATE_COUNT_THRESHOLD", 100000)
+    connection = connections[queryset.db]
+    query = queryset.query
+    if (
+        connection.vendor == "postgresql"
+        and not query.where
+        and not query.distinct
+        and query.low_mark == 0
+        and query.high_mark is None
+    ):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] > threshold:
+            return row[0]
+    return cached_count(queryset, threshold, timeout)
+
+
+def cached_count(queryset, threshold: int = None, timeout: int = None) -> int:
+    """
+    Return the number of rows of a queryset. Counts bigger than `threshold`
+    are cached for `timeout` seconds, using the SQL of the query as key -
+    so the counts of big tables are not exact, but they are not counted
+    again on every page of a list.
+    The threshold defaults to the `APIS_ESTIMATE_COUNT_THRESHOLD` setting,
+    the timeout to the `APIS_COUNT_CACHE_TIMEOUT` setting.
+    """
+    if threshold is None:
+        threshold = getattr(settings, "APIS_ESTIMATE_COUNT_THRESHOLD", 100000)
+    if timeout is None:
+        timeout = getattr(settings, "APIS_COUNT_CACHE_TIMEOUT", 60)
+    if not timeout:
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    query = hashlib.md5(repr((queryset.db, sql, params)).encode()).hexdigest()
+    key = f"apis_count:{queryset.model._meta.label_lower}:{query}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        if count > threshold:
+            cache.set(key, count, timeout)
+    return count
+
+
+def _queryset(object_list):
+    # the paginators of the tables get the rows of the table, which wrap
+    # the data of the table, which wraps the queryset
+    while not isinstance(object_list, QuerySet) and hasattr(object_list, "data"):
+        object_list = object_list.data
+    return object_list if isinstance(object_list, QuerySet) else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator for the list views, that estimates the number of results
+    of big querysets or uses a count cached for `APIS_COUNT_CACHE_TIMEOUT`
+    seconds (see `estimate_count`).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = _queryset(self.object_list)
+        if queryset is None:
+            return super().count
+        timeout = getattr(settings, "APIS_COUNT_CACHE_TIMEOUT", 60)
+        return estimate_count(queryset, timeout=timeout)
+
+
+class LazyPaginator(paginators.LazyPaginator):
+    """
+    A paginator for the list views, that does not count the results at
+    all. It checks if there is a next page by fetching one additional
+    row (see `django_tables2.paginators.LazyPaginator`), the `count` is
+    None.
+    """
+
+    count = None
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Cursor based pagination ordered by the primary key. The position is
+    encoded in the opaque `cursor` parameter, so getting the next page
+    is a simple indexed lookup instead of an OFFSET scan.
+    """
+
+    ordering = "pk"
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+
+class GenericPagination(pagination.LimitOffsetPagination):
+    """
+    The default pagination of the APIS API: a limit/offset pagination that
+    allows the clients to opt in to two cheaper modes:
+
+    * passing a `cursor` parameter (it can be empty for the first page)
+      switches to a `KeysetPagination`, ordered by the primary key, with
+      stable links to the next and the previous pages
+    * passing `count=false` skips counting the results; the existence of a
+      next page is then checked by fetching one additional row
+    Counts of unfiltered querysets are estimated (see `estimate_count`),
+    the other counts are exact, unless `APIS_API_COUNT_CACHE_TIMEOUT` is
+    set, then they are cached for that many seconds.
+    """
+
+    count_query_param = "count"
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            self.count = None
+            if self.use_count(request):
+                self.count = self.get_count(queryset)
+            results = self.keyset.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.keyset.display_page_controls
+            return results
+        if self.use_count(request):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = None
+        self.offset = self.get_offset(request)
+        results = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.display_page_controls = self.has_next or self.offset > 0
+        return results[: self.limit]
+
+    def use_count(self, request) -> bool:
+        value = request.query_params.get(self.count_query_param, "true")
+        return value.lower() not in ["false", "0", "no"]
+
+    def get_count(self, queryset):
+        timeout = getattr(settings, "APIS_API_COUNT_CACHE_TIMEOUT", 0)
+        return estimate_count(queryset, timeout=timeout)
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return Response(
+                {
+                    "next": self.keyset.get_next_link(),
+                    "previous": self.keyset.get_previous_link(),
+                    "count": self.count,
+                    "results": data,
+                }
+            )
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "count": self.count,
+                "limit": self.limit,
+                "offset": self.offset,
+                "results": data,
+            }
+        )
+
+    def get_html_context(self):
+        if self.keyset:
+            return self.keyset.get_html_context()
+        if self.count is None:
+            return {
+                "previous_url": self.get_previous_link(),
+                "next_url": self.get_next_link(),
+                "page_links": [],
+            }
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset:
+            return self.keyset.to_html()
+        return super().to_html()
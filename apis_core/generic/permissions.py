@@ -0,0 +1,104 @@
+"""
+Check the model permissions of a user once per request.
+
+The generic tables hide their action columns depending on the permissions
+of the user and the generic views check the permissions again, so a page
+with many tables - like the relation tables of an entity - asks for the
+same permissions over and over. The `PermissionSnapshot` of a request
+remembers the result of every permission check, it is created on first use
+and stored on the request (see `get_permission_snapshot`), so the tables
+and the views of a request share it.
+
+The permissions can also be cached across requests, for
+`APIS_PERMISSION_CACHE_TIMEOUT` seconds (off by default). The cache stores
+the set of all the permissions of a user (`User.get_all_permissions`), so it
+should only be used with authentication backends that grant permissions
+that way, like the `ModelBackend`. The cached permissions of a user are
+deleted when the user, its groups or its permissions change, the cached
+permissions of all users are invalidated by a version that is changed when
+groups or their permissions change (see `apis_core.generic.signals`).
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "apis_permissions_version"
+
+
+def _user_key(pk) -> str:
+    return f"apis_permissions:{pk}"
+
+
+def invalidate(user=None):
+    """
+    Invalidate the cached permissions of `user` or, without a user,
+    the cached permissions of all users.
+    """
+    if not getattr(settings, "APIS_PERMISSION_CACHE_TIMEOUT", 0):
+        return
+    if user is None:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+    else:
+        cache.delete(_user_key(user.pk))
+
+
+def cached_permissions(user):
+    """
+    Return the set of all the permissions of `user` from the cache,
+    reading them from the authentication backends on a cache miss.
+    """
+    timeout = getattr(settings, "APIS_PERMISSION_CACHE_TIMEOUT", 0)
+    key = _user_key(user.pk)
+    cached = cache.get_many([key, VERSION_KEY])
+    version = cached.get(VERSION_KEY, 0)
+    if key in cached and cached[key][0] == version:
+        return cached[key][1]
+    permissions = frozenset(user.get_all_permissions())
+    cache.set(key, (version, permissions), timeout)
+    return permissions
+
+
+class PermissionSnapshot:
+    """
+    The model permissions of a user, checked once per permission.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.checked = {}
+        self.permissions = None
+        if (
+            getattr(settings, "APIS_PERMISSION_CACHE_TIMEOUT", 0)
+            and user.is_authenticated
+            and user.is_active
+            and not user.is_superuser
+        ):
+            self.permissions = cached_permissions(user)
+
+    def has_perm(self, permission: str) -> bool:
+        if permission not in self.checked:
+            if self.permissions is not None:
+                self.checked[permission] = permission in self.permissions
+            else:
+                self.checked[permission] = self.user.has_perm(permission)
+        return self.checked[permission]
+
+    def has_perms(self, permissions) -> bool:
+        return all(self.has_perm(permission) for permission in permissions)
+
+    def __contains__(self, permission: str) -> bool:
+        return self.has_perm(permission)
+
+
+def get_permission_snapshot(request) -> PermissionSnapshot:
+    """
+    Return the permission snapshot of the user of the request,
+    creating it on first use.
+    """
+    snapshot = getattr(request, "_apis_permissions", None)
+    if snapshot is None or snapshot.user is not request.user:
+        snapshot = PermissionSnapshot(request.user)
+        request._apis_permissions = snapshot
+    return snapshot
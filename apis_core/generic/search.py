@@ -0,0 +1,301 @@
+"""
+Search backends for the autocomplete views.
+
+`generate_search_filter` ORs `icontains` lookups over all the text fields of
+a model, which can not use an index and leads to sequential scans of big
+tables. The backends in this module use the full text search of the
+database instead:
+
+* `PostgresSearchBackend` matches prefixes of the query tokens using the
+  PostgreSQL full text search and ranks the results. It is only used for
+  models with a matching index, which projects can add to their models
+  using `postgres_search_index`. Models without such an index are searched
+  using `generate_search_filter`, as a full text search without an index
+  would scan the whole table.
+* `SqliteSearchBackend` uses an FTS5 table per model, which has to be
+  created using the `apisrebuildsearchindex` management command and is kept
+  up to date by signals (see `apis_core.generic.signals`). Models without
+  such a table are searched using `generate_search_filter`.
+* `IcontainsSearchBackend` uses `generate_search_filter`.
+
+The backend is chosen based on the database vendor or set using the
+`APIS_SEARCH_BACKEND` setting. The fields that are searched can be set per
+model using the `APIS_SEARCH_FIELDS` setting and default to all the
+CharFields and TextFields of the model - for the `PostgresSearchBackend`
+only the ones of the table of the model, not the inherited ones.
+"""
+
+import functools
+import re
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from apis_core.generic.helpers import generate_search_filter, get_search_fields
+
+CHUNK_SIZE = 2000
+
+
+def tokenize(query: str) -> list:
+    """
+    Split a query into tokens, dropping everything but word characters.
+    """
+    return re.findall(r"\w+", query or "")
+
+
+class SearchBackend:
+    """
+    The base class of the search backends. `search` filters a queryset by
+    a query and orders the results by relevance, `update`, `delete` and
+    `rebuild` maintain the index of a backend, if it has one.
+    """
+
+    def get_fields(self, model) -> list:
+        fields = getattr(settings, "APIS_SEARCH_FIELDS", {})
+        return get_search_fields(model, fields.get(model._meta.label_lower))
+
+    def search(self, queryset, query: str):
+        raise NotImplementedError
+
+    def update(self, instance):
+        pass
+
+    def delete(self, instance):
+        pass
+
+    def rebuild(self, model, using: str = None) -> bool:
+        """
+        Rebuild the index of `model`. Returns False if the backend does
+        not use an index.
+        """
+        return False
+
+
+class IcontainsSearchBackend(SearchBackend):
+    def search(self, queryset, query: str):
+        fields = self.get_fields(queryset.model)
+        return queryset.filter(generate_search_filter(queryset.model, query, fields))
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Search using the PostgreSQL full text search with the `simple`
+    configuration, every token of the query is matched as prefix.
+    """
+
+    config = "simple"
+    fallback = IcontainsSearchBackend()
+
+    def get_fields(self, model) -> list:
+        """
+        An index only covers the columns of one table, so the fields
+        inherited from parent models are not searched by default.
+        """
+        fields = super().get_fields(model)
+        if model._meta.label_lower in getattr(settings, "APIS_SEARCH_FIELDS", {}):
+            return fields
+        local_fields = {field.name for field in model._meta.local_fields}
+        return [field for field in fields if field in local_fields]
+
+    def has_index(self, model, using: str) -> bool:
+        """
+        Check if there is a full text search index covering the searched
+        fields of `model` (see `postgres_search_index`).
+        """
+        columns = [
+            model._meta.get_field(field).column for field in self.get_fields(model)
+        ]
+        return any(
+            all(column in definition for column in columns)
+            for definition in _tsvector_indexes(using, model._meta.db_table)
+        )
+
+    def vector(self, fields):
+        from django.contrib.postgres.search import SearchVector
+
+        return SearchVector(*fields, config=self.config)
+
+    def search(self, queryset, query: str):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        if not self.has_index(queryset.model, queryset.db):
+            return self.fallback.search(queryset, query)
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        fields = self.get_fields(queryset.model)
+        query = SearchQuery(
+            " & ".join(f"{token}:*" for token in tokens),
+            search_type="raw",
+            config=self.config,
+        )
+        return (
+            queryset.annotate(search_vector=self.vector(fields))
+            .filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "pk")
+        )
+
+
+def postgres_search_index(fields: list, name: str):
+    """
+    Return a GIN index for the `Meta.indexes` of a model, which is used
+    by the `PostgresSearchBackend` if `fields` are the fields it searches.
+    """
+    from django.contrib.postgres.indexes import GinIndex
+
+    return GinIndex(PostgresSearchBackend().vector(fields), name=name)
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    Search using an FTS5 table per model, whose rowids are the primary
+    keys of the model instances. The tokens of the query are matched as
+    prefixes and the results are ranked using bm25.
+    """
+
+    fallback = IcontainsSearchBackend()
+
+    def table(self, model) -> str:
+        return f"{model._meta.db_table}_fts"
+
+    def has_index(self, model, using: str) -> bool:
+        return self.table(model) in _fts_tables(using)
+
+    def search(self, queryset, query: str):
+        model = queryset.model
+        if not self.has_index(model, queryset.db):
+            return self.fallback.search(queryset, query)
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        qn = connections[queryset.db].ops.quote_name
+        table = qn(self.table(model))
+        pk = f"{qn(model._meta.db_table)}.{qn(model._meta.pk.column)}"
+        match = " ".join(f'"{token}"*' for token in tokens)
+        # the index table is joined, so that the MATCH is evaluated once
+        # and the rank of the matches is available for the ordering
+        return queryset.extra(
+            tables=[self.table(model)],
+            where=[f"{table}.rowid = {pk}", f"{table} MATCH %s"],
+            params=[match],
+            order_by=[f"{self.table(model)}.rank", "pk"],
+        )
+
+    def update(self, instance):
+        model = instance._meta.concrete_model
+        using = instance._state.db or router.db_for_write(model)
+        if not self.has_index(model, using):
+            return
+        fields = self.get_fields(model)
+        row = [instance.pk] + [getattr(instance, field) or "" for field in fields]
+        with transaction.atomic(using=using):
+            self.delete(instance)
+            self._insert(model, [row], fields, using)
+
+    def delete(self, instance):
+        model = instance._meta.concrete_model
+        using = instance._state.db or router.db_for_write(model)
+        if not self.has_index(model, using):
+            return
+        table = connections[using].ops.quote_name(self.table(model))
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+
+    def _insert(self, model, rows: list, fields: list, using: str):
+        qn = connections[using].ops.quote_name
+        columns = ", ".join(["rowid"] + [qn(field) for field in fields])
+        placeholders = ", ".join(["%s"] * (len(fields) + 1))
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {qn(self.table(model))} ({columns}) VALUES ({placeholders})",
+                rows,
+            )
+
+    def rebuild(self, model, using: str = None) -> bool:
+        using = using or router.db_for_write(model)
+        fields = self.get_fields(model)
+        qn = connections[using].ops.quote_name
+        table = qn(self.table(model))
+        columns = ", ".join(qn(field) for field in fields)
+        rows = model._default_manager.using(using).values_list("pk", *fields)
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {table} USING fts5({columns}, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+            chunk = []
+            for row in rows.iterator(chunk_size=CHUNK_SIZE):
+                chunk.append([value if value is not None else "" for value in row])
+                if len(chunk) == CHUNK_SIZE:
+                    self._insert(model, chunk, fields, using)
+                    chunk = []
+            self._insert(model, chunk, fields, using)
+        _fts_tables.cache_clear()
+        return True
+
+
+@functools.lru_cache
+def _fts_tables(using: str) -> set:
+    return {
+        table
+        for table in connections[using].introspection.table_names()
+        if table.endswith("_fts")
+    }
+
+
+@functools.lru_cache
+def _tsvector_indexes(using: str, table: str) -> list:
+    """
+    Return the definitions of the GIN indexes on `tsvector` expressions
+    of the database table `table`.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        constraint["definition"]
+        for constraint in constraints.values()
+        if constraint.get("type") == "gin"
+        and "to_tsvector" in (constraint.get("definition") or "")
+    ]
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SqliteSearchBackend,
+}
+
+
+@functools.lru_cache
+def get_search_backend(using: str = "default") -> SearchBackend:
+    """
+    Return the search backend set in the `APIS_SEARCH_BACKEND` setting
+    or the one matching the vendor of the database `using`.
+    """
+    backend = getattr(settings, "APIS_SEARCH_BACKEND", None)
+    if backend is not None:
+        return import_string(backend)()
+    vendor = connections[using].vendor
+    return BACKENDS.get(vendor, IcontainsSearchBackend)()
+
+
+def search(queryset, query: str):
+    """
+    Filter the `queryset` by the `query` using the search backend of its
+    database and order it by relevance.
+    """
+    return get_search_backend(queryset.db).search(queryset, query)
+
+
+@receiver(setting_changed, dispatch_uid="clear_search_backend")
+def clear_search_backend(setting, **kwargs):
+    if setting in ["APIS_SEARCH_BACKEND", "APIS_SEARCH_FIELDS"]:
+        get_search_backend.cache_clear()
+        _tsvector_indexes.cache_clear()
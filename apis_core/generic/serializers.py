@@ -1,4 +1,9 @@
+from collections import defaultdict
+
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+from rest_framework import serializers
 from rest_framework.serializers import (
     HyperlinkedModelSerializer,
     HyperlinkedRelatedField,
@@ -40,7 +45,9 @@ def serializer_factory(
     model, serializer=GenericHyperlinkedModelSerializer, fields="__all__", **kwargs
 ):
     defaultmeta = type(str("Meta"), (object,), {"fields": fields})
-    meta = getattr(serializer, "Meta", defaultmeta)
+    # the Meta of the serializer is subclassed instead of being changed, it
+    # is shared by all the serializers created from the same serializer
+    meta = type(str("Meta"), (getattr(serializer, "Meta", defaultmeta),), {})
     meta.model = model
     serializer = type(
         str("%sModelSerializer" % model._meta.object_name),
@@ -48,3 +55,243 @@ def serializer_factory(
         {"Meta": meta},
     )
     return serializer
+
+
+# a primary key that is used to reverse the url templates of the
+# `ValuesSerializer`, it is replaced by the actual primary keys
+URL_TEMPLATE_PK = 2147483647
+
+
+class ValuesSerializer:
+    """
+    A read only serializer that creates the representation of a queryset
+    from `QuerySet.values` instead of model instances. It takes an instance
+    of a regular `ModelSerializer` and creates the same keys, but it skips
+    instantiating the models and the per row serializer machinery: the
+    urls of related objects are created from url templates, which are
+    reversed once per view and contenttype, many to many fields are
+    fetched using one query per field.
+    Only serializers consisting of plain model fields, primary key related
+    fields and hyperlinked fields can be handled, `supported` tells if the
+    serializer passed is one of those.
+    """
+
+    # fields whose representation is their database value
+    raw_fields = (
+        serializers.ReadOnlyField,
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.BooleanField,
+    )
+    # fields that are converted using their `to_representation` method
+    converted_fields = (
+        serializers.FloatField,
+        serializers.DecimalField,
+        serializers.DateField,
+        serializers.DateTimeField,
+        serializers.TimeField,
+        serializers.DurationField,
+        serializers.UUIDField,
+        serializers.ChoiceField,
+        serializers.JSONField,
+    )
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.model = serializer.Meta.model
+        self.request = serializer.context.get("request")
+        self.format = serializer.context.get("format")
+        self._url_templates = {}
+        self._contenttypes = {}
+        self.columns = []
+        self.values = set()
+        self.many = []
+        self.supported = self.request is not None
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            column = self._get_column(name, field)
+            if column is None:
+                self.supported = False
+                break
+            self.columns.append(column)
+
+    def _get_model_field(self, field):
+        if field.source == "*" or len(field.source_attrs) != 1:
+            return None
+        try:
+            return self.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+
+    def _get_link(self, field):
+        """
+        Return a function that creates the link of a related field from a
+        row, or None if the field can not be handled.
+        """
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return None
+            return lambda pk, contenttype_id: pk
+        if not isinstance(field, serializers.HyperlinkedRelatedField):
+            return None
+        if field.lookup_field != "pk" or type(field).get_url not in [
+            serializers.HyperlinkedRelatedField.get_url,
+            GenericHyperlinkedRelatedField.get_url,
+        ]:
+            return None
+        generic = isinstance(field, GenericHyperlinkedRelatedField)
+        format = self.format
+        if format and field.format and field.format != format:
+            format = field.format
+        view_name = field.view_name
+        lookup_url_kwarg = field.lookup_url_kwarg
+
+        def link(pk, contenttype_id):
+            return self.get_url(
+                view_name, lookup_url_kwarg, generic, contenttype_id, pk, format
+            )
+
+        return link
+
+    def _get_column(self, name, field):
+        """
+        Return a tuple describing how to get the value of a field:
+        (name, kind, value, contenttype value, function)
+        """
+        if isinstance(field, serializers.HyperlinkedIdentityField) or (
+            isinstance(field, GenericHyperlinkedIdentityField)
+        ):
+            link = self._get_link(field)
+            if link is None:
+                return None
+            contenttype_id = self.get_contenttype(self.model).pk
+            self.values.add("pk")
+            return (name, "identity", "pk", contenttype_id, link)
+        if isinstance(field, serializers.ManyRelatedField):
+            model_field = self._get_model_field(field)
+            if model_field is None or not model_field.many_to_many:
+                return None
+            if not model_field.concrete:
+                return None
+            link = self._get_link(field.child_relation)
+            if link is None:
+                return None
+            contenttype_id = self.get_contenttype(model_field.related_model).pk
+            self.values.add("pk")
+            self.many.append(model_field)
+            return (name, "many", model_field.name, contenttype_id, link)
+        if isinstance(field, serializers.RelatedField):
+            model_field = self._get_model_field(field)
+            if model_field is None or not model_field.many_to_one:
+                return None
+            link = self._get_link(field)
+            if link is None:
+                return None
+            related_model = model_field.related_model
+            contenttype = (None, self.get_contenttype(related_model).pk)
+            # subclass aware foreign keys (their descriptors override
+            # `get_queryset`) link to the subclass instances, whose
+            # contenttype is stored in the `self_contenttype` field
+            descriptor = model_field.forward_related_accessor_class
+            if (
+                descriptor.get_queryset is not ForwardManyToOneDescriptor.get_queryset
+                and any(
+                    f.name == "self_contenttype" for f in related_model._meta.fields
+                )
+            ):
+                contenttype = (f"{model_field.name}__self_contenttype", contenttype[1])
+                self.values.add(contenttype[0])
+            self.values.add(model_field.attname)
+            return (name, "related", model_field.attname, contenttype, link)
+        if isinstance(field, self.raw_fields + self.converted_fields):
+            model_field = self._get_model_field(field)
+            if model_field is None or model_field.is_relation:
+                return None
+            self.values.add(model_field.attname)
+            if isinstance(field, self.converted_fields):
+                return (
+                    name,
+                    "converted",
+                    model_field.attname,
+                    None,
+                    field.to_representation,
+                )
+            return (name, "raw", model_field.attname, None, None)
+        return None
+
+    def get_contenttype(self, model):
+        if model not in self._contenttypes:
+            self._contenttypes[model] = ContentType.objects.get_for_model(
+                model, for_concrete_model=True
+            )
+        return self._contenttypes[model]
+
+    def get_url(self, view_name, lookup_url_kwarg, generic, contenttype_id, pk, format):
+        key = (view_name, generic, contenttype_id, format)
+        if key not in self._url_templates:
+            if generic:
+                view_name = "apis_core:generic:genericmodelapi-detail"
+                contenttype = ContentType.objects.get_for_id(contenttype_id)
+                kwargs = {"contenttype": contenttype, "pk": URL_TEMPLATE_PK}
+            else:
+                kwargs = {lookup_url_kwarg: URL_TEMPLATE_PK}
+            url = reverse(view_name, kwargs=kwargs, request=self.request, format=format)
+            self._url_templates[key] = url.rsplit(str(URL_TEMPLATE_PK), 1)
+        prefix, suffix = self._url_templates[key]
+        return f"{prefix}{pk}{suffix}"
+
+    def get_queryset(self, queryset):
+        """
+        Turn a queryset into a `values` queryset with the values needed.
+        """
+        return queryset.prefetch_related(None).values(*sorted(self.values))
+
+    def get_many(self, rows: list) -> dict:
+        """
+        Fetch the many to many values of the `rows`, using one query per
+        field. Returns a dict of {field name: {pk: [related pks]}}.
+        """
+        pks = [row["pk"] for row in rows]
+        many = {}
+        for model_field in self.many:
+            related = defaultdict(list)
+            query_name = model_field.related_query_name()
+            values = model_field.related_model._default_manager.filter(
+                **{f"{query_name}__in": pks}
+            ).values_list(query_name, "pk")
+            for pk, related_pk in values:
+                related[pk].append(related_pk)
+            many[model_field.name] = related
+        return many
+
+    def to_representation(self, rows) -> list:
+        rows = list(rows)
+        many = self.get_many(rows) if self.many else {}
+        data = []
+        for row in rows:
+            item = {}
+            for name, kind, value, contenttype, function in self.columns:
+                if kind == "raw":
+                    item[name] = row[value]
+                elif kind == "converted":
+                    value = row[value]
+                    item[name] = None if value is None else function(value)
+                elif kind == "identity":
+                    item[name] = function(row[value], contenttype)
+                elif kind == "related":
+                    pk = row[value]
+                    if pk is None:
+                        item[name] = None
+                    else:
+                        contenttype_id = contenttype[1]
+                        if contenttype[0] is not None:
+                            contenttype_id = row[contenttype[0]] or contenttype_id
+                        item[name] = function(pk, contenttype_id)
+                elif kind == "many":
+                    item[name] = [
+                        function(pk, contenttype)
+                        for pk in many[value].get(row["pk"], [])
+                    ]
+            data.append(item)
+        return data
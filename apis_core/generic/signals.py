@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apis_core.generic import permissions
+from apis_core.generic.abc import GenericModel
+from apis_core.generic.autocomplete import invalidate
+from apis_core.generic.search import get_search_backend
+
+
+@receiver(post_save, dispatch_uid="update_search_index")
+def update_search_index(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        get_search_backend(using).update(instance)
+
+
+@receiver(post_delete, dispatch_uid="delete_from_search_index")
+def delete_from_search_index(sender, instance, using=None, **kwargs):
+    get_search_backend(using).delete(instance)
+
+
+@receiver(post_save, dispatch_uid="invalidate_autocomplete_cache_on_save")
+@receiver(post_delete, dispatch_uid="invalidate_autocomplete_cache_on_delete")
+def invalidate_autocomplete_cache(sender, raw=False, **kwargs):
+    # only the generic models have autocomplete views
+    if issubclass(sender, GenericModel) and not raw:
+        invalidate(sender)
+
+
+@receiver(
+    post_save,
+    sender=get_user_model(),
+    dispatch_uid="invalidate_user_permissions_on_save",
+)
+@receiver(
+    post_delete,
+    sender=get_user_model(),
+    dispatch_uid="invalidate_user_permissions_on_delete",
+)
+def invalidate_user_permissions(sender, instance, **kwargs):
+    permissions.invalidate(instance)
+
+
+@receiver(post_delete, sender=Group, dispatch_uid="invalidate_group_permissions")
+def invalidate_group_permissions(sender, **kwargs):
+    permissions.invalidate()
+
+
+@receiver(m2m_changed, dispatch_uid="invalidate_permissions_on_m2m_change")
+def invalidate_permissions_on_m2m_change(sender, instance, model, **kwargs):
+    """
+    Invalidate the cached permissions when the groups or the permissions
+    of a user or the permissions of a group change.
+    """
+    User = get_user_model()
+    user_relations = [
+        getattr(User, name).through
+        for name in ["groups", "user_permissions"]
+        if hasattr(User, name)
+    ]
+    if sender in user_relations:
+        if isinstance(instance, User):
+            permissions.invalidate(instance)
+        else:
+            permissions.invalidate()
+    elif sender is Group.permissions.through:
+        permissions.invalidate()
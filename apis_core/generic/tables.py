@@ -1,5 +1,6 @@
 import django_tables2 as tables
 from apis_core.generic.helpers import permission_fullname
+from apis_core.generic.permissions import get_permission_snapshot
 
 
 class CustomTemplateColumn(tables.TemplateColumn):
@@ -88,9 +89,10 @@ class GenericTable(tables.Table):
 
     def before_render(self, request):
         if model := getattr(self.Meta, "model"):
-            if not request.user.has_perm(permission_fullname("delete", model)):
+            permissions = get_permission_snapshot(request)
+            if not permissions.has_perm(permission_fullname("delete", model)):
                 self.columns.hide("delete")
-            if not request.user.has_perm(permission_fullname("change", model)):
+            if not permissions.has_perm(permission_fullname("change", model)):
                 self.columns.hide("edit")
-            if not request.user.has_perm(permission_fullname("view", model)):
+            if not permissions.has_perm(permission_fullname("view", model)):
                 self.columns.hide("view")
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apis_core.apis_relations.models import Property
+from apis_core.generic import search
+
+
+@override_settings(
+    ROOT_URLCONF="tests.urls",
+    APIS_SEARCH_BACKEND="apis_core.generic.search.IcontainsSearchBackend",
+    APIS_SEARCH_FIELDS={"apis_relations.property": ["name_forward"]},
+)
+class AutocompleteCacheTestCase(TestCase):
+    url = "/apis/apis_relations.property/autocomplete"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.knows = Property.objects.create(name_forward="knows")
+        cls.knowledge = Property.objects.create(name_forward="has knowledge of")
+        Property.objects.create(name_forward="likes")
+        cls.user = User.objects.create_superuser(username="admin", password="admin")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def autocomplete(self, q):
+        response = self.client.get(self.url, {"q": q})
+        results = response.json()["results"]
+        return sorted(
+            int(result["id"]) for result in results if "create_id" not in result
+        )
+
+    def test_cache(self):
+        expected = sorted([self.knows.pk, self.knowledge.pk])
+        with mock.patch(
+            "apis_core.generic.views.search", wraps=search.search
+        ) as search_mock:
+            self.assertEqual(self.autocomplete("Kno"), expected)
+            self.assertEqual(search_mock.call_count, 1)
+            # cached, the query is normalized
+            self.assertEqual(self.autocomplete(" kno "), expected)
+            self.assertEqual(search_mock.call_count, 1)
+            # narrowed down from the results of `kno`
+            self.assertEqual(self.autocomplete("knowl"), [self.knowledge.pk])
+            self.assertEqual(search_mock.call_count, 2)
+            narrowed = search_mock.call_args.args[0]
+            self.assertCountEqual(narrowed, [self.knows, self.knowledge])
+
+        # saving an instance invalidates the cache
+        knowing = Property.objects.create(name_forward="knowing")
+        self.assertEqual(self.autocomplete("kno"), sorted(expected + [knowing.pk]))
+
+    def test_invalidate_generic_models_only(self):
+        with mock.patch("apis_core.generic.signals.invalidate") as invalidate:
+            Group.objects.create(name="editors")
+            invalidate.assert_not_called()
+            Property.objects.create(name_forward="hates")
+            invalidate.assert_called_once_with(Property)
+
+    @override_settings(APIS_AUTOCOMPLETE_CACHE_MAX_RESULTS=1)
+    def test_cache_max_results(self):
+        with mock.patch(
+            "apis_core.generic.views.search", wraps=search.search
+        ) as search_mock:
+            self.autocomplete("kno")
+            calls = search_mock.call_count
+            # too many results to be cached
+            self.autocomplete("kno")
+            self.assertEqual(search_mock.call_count, 2 * calls)
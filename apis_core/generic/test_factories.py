@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+from apis_core.apis_relations.models import Property, Triple
+
+from .factories import (
+    cached_modelform_factory,
+    cached_serializer_factory,
+    cached_table_factory,
+)
+from .forms import GenericModelForm
+from .serializers import GenericHyperlinkedModelSerializer
+from .tables import GenericTable
+
+
+class FactoriesTestCase(TestCase):
+    def test_cached(self):
+        form = cached_modelform_factory(Property, GenericModelForm)
+        self.assertIs(form, cached_modelform_factory(Property, GenericModelForm))
+        self.assertIs(form._meta.model, Property)
+        self.assertIsNot(form, cached_modelform_factory(Triple, GenericModelForm))
+        table = cached_table_factory(Property, GenericTable)
+        self.assertIsNot(table, cached_table_factory(Property, GenericTable, ("id",)))
+
+    def test_serializer_meta(self):
+        # the serializers of different models do not share their Meta
+        class Serializer(GenericHyperlinkedModelSerializer):
+            class Meta:
+                fields = ["id"]
+
+        prop = cached_serializer_factory(Property, Serializer)
+        triple = cached_serializer_factory(Triple, Serializer)
+        self.assertIs(prop.Meta.model, Property)
+        self.assertIs(triple.Meta.model, Triple)
+        self.assertEqual(prop.Meta.fields, ["id"])
+        self.assertFalse(hasattr(Serializer.Meta, "model"))
@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apis_core.apis_relations.models import Property
+from apis_core.apis_relations.tables import PropertyTable
+
+from .pagination import EstimatedCountPaginator, GenericPagination, cached_count
+from .factories import cached_table_factory
+from .views import List
+
+
+class ListTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(30):
+            Property.objects.create(name_forward=f"property {i}")
+        cls.user = User.objects.create_superuser("apis", "apis@example.org", "apis")
+        cls.contenttype = ContentType.objects.get_for_model(Property)
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self, params=None):
+        # the response is not rendered, the table is paginated when the
+        # context is created
+        request = RequestFactory().get("/", params or {})
+        request.user = self.user
+        with CaptureQueriesContext(connection) as queries:
+            response = List.as_view()(request, contenttype=self.contenttype)
+        self.assertEqual(response.status_code, 200)
+        return response, [q["sql"] for q in queries if "COUNT(" in q["sql"]]
+
+    def test_table_class(self):
+        table = cached_table_factory(Property, PropertyTable, ("name_reverse",))
+        self.assertIs(
+            table, cached_table_factory(Property, PropertyTable, ("name_reverse",))
+        )
+        self.assertIn("name_reverse", table.base_columns)
+        self.assertNotIn(
+            "name_reverse", cached_table_factory(Property, PropertyTable).base_columns
+        )
+        response, _ = self.counts({"columns": ["name_reverse", "unknown"]})
+        self.assertIn("name_reverse", response.context_data["table"].columns.names())
+
+    @override_settings(APIS_ESTIMATE_COUNT_THRESHOLD=10)
+    def test_cached_count(self):
+        queryset = Property.objects.filter(name_forward__startswith="property")
+        self.assertEqual(cached_count(queryset), 30)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(queryset), 30)
+        with override_settings(APIS_COUNT_CACHE_TIMEOUT=0):
+            with self.assertNumQueries(1):
+                cached_count(queryset)
+
+        # the counts of the api are exact, unless the cache is enabled
+        with self.assertNumQueries(1):
+            self.assertEqual(GenericPagination().get_count(queryset), 30)
+        with override_settings(APIS_API_COUNT_CACHE_TIMEOUT=60):
+            with self.assertNumQueries(0):
+                GenericPagination().get_count(queryset)
+
+    @override_settings(
+        APIS_ESTIMATE_COUNT_THRESHOLD=10,
+        APIS_LIST_PAGINATOR="apis_core.generic.pagination.EstimatedCountPaginator",
+    )
+    def test_estimated_count_paginator(self):
+        response, counts = self.counts()
+        self.assertIsInstance(
+            response.context_data["table"].paginator, EstimatedCountPaginator
+        )
+        self.assertEqual(response.context_data["table"].paginator.count, 30)
+        self.assertEqual(len(counts), 1)
+        response, counts = self.counts({"page": 2})
+        self.assertEqual(counts, [])
+
+    @override_settings(APIS_LIST_PAGINATOR="apis_core.generic.pagination.LazyPaginator")
+    def test_lazy_paginator(self):
+        response, counts = self.counts()
+        self.assertEqual(counts, [])
+        self.assertEqual(response.context_data["table"].paginator.num_pages, 2)
+        response, counts = self.counts({"page": 2})
+        self.assertEqual(response.context_data["table"].paginator.num_pages, 2)
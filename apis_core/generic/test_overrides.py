@@ -0,0 +1,41 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from apis_core.apis_relations.filtersets import PropertyFilterSet
+from apis_core.apis_relations.models import Property
+from apis_core.apis_relations.tables import PropertyTable
+
+from .helpers import discover_overrides, get_override
+from .tables import GenericTable
+
+
+class OverridesTestCase(SimpleTestCase):
+    def test_discover(self):
+        report = discover_overrides([Property])
+        self.assertEqual(
+            report[Property]["tables.Table"],
+            "apis_core.apis_relations.tables.PropertyTable",
+        )
+        self.assertIsNone(report[Property]["importers.Importer"])
+        # the discovered overrides are not imported again
+        with mock.patch("django.utils.module_loading.import_string") as import_string:
+            self.assertIs(get_override(Property, "tables", "Table"), PropertyTable)
+            self.assertIs(
+                get_override(Property, "filtersets", "FilterSet"), PropertyFilterSet
+            )
+            self.assertIs(
+                get_override(Property, "importers", "Importer", GenericTable),
+                GenericTable,
+            )
+            import_string.assert_not_called()
+
+    def test_command(self):
+        out = StringIO()
+        call_command("apisoverrides", "apis_relations.property", stdout=out)
+        self.assertIn("apis_core.apis_relations.tables.PropertyTable", out.getvalue())
+        self.assertNotIn("importers.Importer", out.getvalue())
+        call_command("apisoverrides", "apis_relations.property", "--all", stdout=out)
+        self.assertIn("importers.Importer", out.getvalue())
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from apis_core.apis_relations.models import Property
+
+from .factories import cached_table_factory
+from .helpers import permission_fullname
+from .permissions import PermissionSnapshot, get_permission_snapshot
+from .tables import GenericTable
+from .views import List
+
+
+class PermissionSnapshotTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("user")
+        cls.user.user_permissions.add(Permission.objects.get(codename="view_property"))
+        cls.group = Group.objects.create(name="editors")
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get("/")
+        self.request.user = User.objects.get(pk=self.user.pk)
+
+    def test_shared_per_request(self):
+        table_class = cached_table_factory(Property, GenericTable)
+        with mock.patch.object(
+            self.request.user, "has_perm", wraps=self.request.user.has_perm
+        ) as has_perm:
+            for _ in range(3):
+                table = table_class([])
+                table.before_render(self.request)
+                self.assertEqual(
+                    [
+                        column.name
+                        for column in table.columns.iterall()
+                        if not column.visible
+                    ],
+                    ["edit", "delete"],
+                )
+            view = List()
+            view.setup(self.request)
+            view.model = Property
+            view.permission_action_required = "view"
+            self.assertTrue(view.has_permission())
+            self.assertEqual(has_perm.call_count, 3)
+        self.assertIs(
+            get_permission_snapshot(self.request), get_permission_snapshot(self.request)
+        )
+
+    @override_settings(APIS_PERMISSION_CACHE_TIMEOUT=60)
+    def test_cache(self):
+        view = permission_fullname("view", Property)
+        change = permission_fullname("change", Property)
+        self.assertTrue(PermissionSnapshot(self.request.user).has_perm(view))
+        with self.assertNumQueries(0):
+            snapshot = PermissionSnapshot(self.user)
+            self.assertTrue(snapshot.has_perm(view))
+            self.assertFalse(snapshot.has_perm(change))
+
+        # changes of the groups of the user and of their permissions
+        self.group.user_set.add(self.user)
+        self.group.permissions.add(Permission.objects.get(codename="change_property"))
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(PermissionSnapshot(user).has_perm(change))
+        self.user.user_permissions.clear()
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(PermissionSnapshot(user).has_perm(view))
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apis_core.apis_relations.models import Property
+from .search import (
+    IcontainsSearchBackend,
+    PostgresSearchBackend,
+    SqliteSearchBackend,
+    _fts_tables,
+    get_search_backend,
+    search,
+)
+
+
+@override_settings(
+    APIS_SEARCH_FIELDS={"apis_relations.property": ["name_forward", "name_reverse"]}
+)
+class SearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.knows = Property.objects.create(
+            name_forward="knows", name_reverse="is known by"
+        )
+        cls.knowledge = Property.objects.create(
+            name_forward="has knowledge of", name_reverse="known knowledge"
+        )
+        Property.objects.create(name_forward="likes", name_reverse="is liked by")
+
+    def tearDown(self):
+        # the index tables are removed by the rollback of the test
+        _fts_tables.cache_clear()
+
+    def test_backend(self):
+        self.assertIsInstance(get_search_backend(), SqliteSearchBackend)
+        with override_settings(
+            APIS_SEARCH_BACKEND="apis_core.generic.search.IcontainsSearchBackend"
+        ):
+            self.assertIsInstance(get_search_backend(), IcontainsSearchBackend)
+
+    def test_search_without_index(self):
+        results = search(Property.objects.all(), "now")
+        self.assertCountEqual(results, [self.knows, self.knowledge])
+
+    def test_postgres_search_without_index(self):
+        # models without a full text search index are searched using icontains
+        backend = PostgresSearchBackend()
+        self.assertFalse(backend.has_index(Property, "default"))
+        results = backend.search(Property.objects.all(), "now")
+        self.assertCountEqual(results, [self.knows, self.knowledge])
+
+    @override_settings(APIS_SEARCH_FIELDS={})
+    def test_postgres_default_fields(self):
+        # the inherited `deprecated_name` can not be part of the index
+        self.assertIn("deprecated_name", IcontainsSearchBackend().get_fields(Property))
+        self.assertEqual(
+            PostgresSearchBackend().get_fields(Property),
+            ["property_class_uri", "name_forward", "name_reverse"],
+        )
+
+    def test_search(self):
+        call_command(
+            "apisrebuildsearchindex", "apis_relations.property", stdout=StringIO()
+        )
+        queryset = Property.objects.all()
+        # only prefixes are matched, the best match comes first
+        self.assertQuerySetEqual(search(queryset, "now"), [])
+        self.assertQuerySetEqual(search(queryset, "know"), [self.knowledge, self.knows])
+        self.assertQuerySetEqual(search(queryset, "kno is"), [self.knows])
+        self.assertEqual(search(queryset, "").count(), 3)
+
+        # the index is updated on save and delete
+        self.knows.name_reverse = "knows"
+        self.knows.save()
+        self.assertQuerySetEqual(search(queryset, "kno is"), [])
+        self.knowledge.delete()
+        self.assertQuerySetEqual(search(queryset, "know"), [self.knows])
@@ -4,25 +4,30 @@ from django.views.generic import DetailView
 from django.views.generic.base import TemplateView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView, FormView
 from django.urls import reverse, reverse_lazy
-from django.forms import modelform_factory
 from django.template.loader import select_template
 from django.template.exceptions import TemplateDoesNotExist
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
 
 from django_filters.views import FilterView
 from django_tables2 import SingleTableMixin
-from django_tables2.tables import table_factory
-from django_tables2.columns import library
 from dal import autocomplete
 
 from .tables import GenericTable
-from .filtersets import filterset_factory, GenericFilterSet
+from .filtersets import GenericFilterSet
+from .factories import (
+    cached_filterset_factory,
+    cached_modelform_factory,
+    cached_table_factory,
+)
 from .forms import GenericModelForm, GenericImportForm
+from .autocomplete import AutocompleteCache, normalize_query
+from .search import search
+from .permissions import get_permission_snapshot
 from .helpers import (
     template_names_via_mro,
-    generate_search_filter,
     permission_fullname,
-    module_paths,
-    first_member_match,
+    get_override,
 )
 from apis_core.utils.helpers import create_object_from_uri
 
@@ -73,6 +78,12 @@ class GenericModelMixin:
             return [permission_fullname(self.permission_action_required, self.model)]
         return []
 
+    def has_permission(self):
+        # check the permissions using the snapshot that is shared with
+        # the tables of the request
+        permissions = get_permission_snapshot(self.request)
+        return permissions.has_perms(self.get_permission_required())
+
 
 class List(
     ListViewObjectFilterMixin,
@@ -86,45 +97,43 @@ class List(
     Access requires the `<model>_view` permission.
     It is based on django-filters FilterView and django-tables SingleTableMixin.
     The table class is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
     The filterset class is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
     The queryset is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
+    The table is paginated using the paginator set in the
+    `APIS_LIST_PAGINATOR` setting (see `apis_core.generic.pagination`).
     """
 
     template_name_suffix = "_list"
     permission_action_required = "view"
 
     def get_table_class(self):
-        table_modules = module_paths(self.model, path="tables", suffix="Table")
-        table_class = first_member_match(table_modules, GenericTable)
-        return table_factory(self.model, table_class)
-
-    def get_table_kwargs(self):
-        kwargs = super().get_table_kwargs()
+        table_class = get_override(self.model, "tables", "Table", GenericTable)
+        fields = {field.name for field in self.model._meta.fields}
         columns = self.request.GET.getlist("columns", [])
-        column_fields = [
-            field for field in self.model._meta.fields if field.name in columns
-        ]
-        kwargs["extra_columns"] = [
-            (field.name, library.column_for_field(field, accessor=field.name))
-            for field in column_fields
-        ]
-        return kwargs
+        columns = tuple(sorted(fields.intersection(columns)))
+        return cached_table_factory(self.model, table_class, columns)
+
+    def get_table_pagination(self, table):
+        paginate = super().get_table_pagination(table)
+        paginator = getattr(settings, "APIS_LIST_PAGINATOR", None)
+        if paginator is not None and paginate is not False:
+            paginate = {} if paginate is True else paginate
+            paginate["paginator_class"] = import_string(paginator)
+        return paginate
 
     def get_filterset_class(self):
-        filterset_modules = module_paths(
-            self.model, path="filtersets", suffix="FilterSet"
+        filterset_class = get_override(
+            self.model, "filtersets", "FilterSet", GenericFilterSet
         )
-        filterset_class = first_member_match(filterset_modules, GenericFilterSet)
-        return filterset_factory(self.model, filterset_class)
+        return cached_filterset_factory(self.model, filterset_class)
 
     def get_queryset(self):
-        queryset_methods = module_paths(
-            self.model, path="querysets", suffix="ListViewQueryset"
+        queryset = get_override(
+            self.model, "querysets", "ListViewQueryset", lambda x: x
         )
-        queryset = first_member_match(queryset_methods) or (lambda x: x)
         return self.filter_queryset(queryset(self.model.objects.all()))
 
 
@@ -142,16 +151,15 @@ class Create(GenericModelMixin, PermissionRequiredMixin, CreateView):
     Create view for a generic model.
     Access requires the `<model>_add` permission.
     The form class is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
     """
 
     template_name = "generic/generic_form.html"
     permission_action_required = "add"
 
     def get_form_class(self):
-        form_modules = module_paths(self.model, path="forms", suffix="Form")
-        form_class = first_member_match(form_modules, GenericModelForm)
-        return modelform_factory(self.model, form_class)
+        form_class = get_override(self.model, "forms", "Form", GenericModelForm)
+        return cached_modelform_factory(self.model, form_class)
 
     def get_success_url(self):
         return self.object.get_edit_url()
@@ -187,15 +195,14 @@ class Update(GenericModelMixin, PermissionRequiredMixin, UpdateView):
     Update view for a generic model.
     Access requires the `<model>_change` permission.
     The form class is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
     """
 
     permission_action_required = "change"
 
     def get_form_class(self):
-        form_modules = module_paths(self.model, path="forms", suffix="Form")
-        form_class = first_member_match(form_modules, GenericModelForm)
-        return modelform_factory(self.model, form_class)
+        form_class = get_override(self.model, "forms", "Form", GenericModelForm)
+        return cached_modelform_factory(self.model, form_class)
 
     def get_success_url(self):
         return self.object.get_edit_url()
@@ -208,7 +215,7 @@ class Autocomplete(
     Autocomplete view for a generic model.
     Access requires the `<model>_view` permission.
     The queryset is overridden by the first match from
-    the `first_member_match` helper.
+    the `get_override` helper.
     """
 
     permission_action_required = "view"
@@ -223,24 +230,43 @@ class Autocomplete(
         except TemplateDoesNotExist:
             self.template = None
 
+    @cached_property
+    def autocomplete_cache(self):
+        return AutocompleteCache(self.model, self.request.user)
+
     def get_queryset(self):
-        queryset_methods = module_paths(
-            self.model, path="querysets", suffix="AutocompleteQueryset"
-        )
-        queryset = first_member_match(queryset_methods)
+        queryset = get_override(self.model, "querysets", "AutocompleteQueryset")
+        cache = self.autocomplete_cache
         if queryset:
-            return queryset(self.model, self.q)
-        return self.model.objects.filter(generate_search_filter(self.model, self.q))
+            if not cache.enabled:
+                return queryset(self.model, self.q)
+            # custom querysets are not necessarily narrowed by longer queries
+            return cache.search(
+                normalize_query(self.q),
+                lambda _: queryset(self.model, self.q),
+                narrow=False,
+            )
+        if not cache.enabled:
+            return search(self.model.objects.all(), self.q)
+        return cache.search(
+            normalize_query(self.q), lambda queryset: search(queryset, self.q)
+        )
 
     def get_results(self, context):
         external_only = self.kwargs.get("external_only", False)
         results = [] if external_only else super().get_results(context)
-        queryset_methods = module_paths(
-            self.model, path="querysets", suffix="ExternalAutocomplete"
+        ExternalAutocomplete = get_override(
+            self.model, "querysets", "ExternalAutocomplete"
         )
-        ExternalAutocomplete = first_member_match(queryset_methods)
         if ExternalAutocomplete:
-            results.extend(ExternalAutocomplete().get_results(self.q))
+            cache = self.autocomplete_cache
+            query = normalize_query(self.q)
+            external = cache.get(query, kind="external") if cache.enabled else None
+            if external is None:
+                external = ExternalAutocomplete().get_results(self.q)
+                if cache.enabled:
+                    cache.set(query, external, kind="external")
+            results.extend(external)
         return results
 
     def create_object(self, value):
@@ -253,9 +279,8 @@ class Import(GenericModelMixin, PermissionRequiredMixin, FormView):
     permission_action_required = "create"
 
     def get_form_class(self):
-        form_modules = module_paths(self.model, paths="forms", suffix="ImportForm")
-        form_class = first_member_match(form_modules, GenericImportForm)
-        return modelform_factory(self.model, form_class)
+        form_class = get_override(self.model, "forms", "ImportForm", GenericImportForm)
+        return cached_modelform_factory(self.model, form_class)
 
     def form_valid(self, form):
         self.object = form.cleaned_data["url"]
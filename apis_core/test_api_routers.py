@@ -0,0 +1,110 @@
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apis_core.apis_relations.models import Property, TempTriple, Triple
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class GenericViewSetQueriesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        contenttype = ContentType.objects.get_for_model(Property)
+        cls.prop = Property.objects.create(name_forward="knows")
+        cls.prop.subj_class.add(contenttype)
+        cls.prop.obj_class.add(contenttype)
+        cls.entities = [
+            Property.objects.create(name_forward=f"entity {i}") for i in range(10)
+        ]
+        for subj, obj in zip(cls.entities, cls.entities[1:]):
+            TempTriple.objects.create(subj=subj, obj=obj, prop=cls.prop)
+        cls.user = User.objects.create_superuser("apis", "apis@example.org", "apis")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url):
+        return self.client.get(url, HTTP_ACCEPT="application/json")
+
+    def assertQueries(self, num, url):
+        # the first request fills the contenttype cache
+        self.get(url)
+        with self.assertNumQueries(num):
+            return self.get(url)
+
+    def test_triple_list(self):
+        # one query for the triples with their properties and for the
+        # subjects and the objects one query for their contenttypes and
+        # one query per contenttype (all of them are properties here)
+        response = self.assertQueries(5, "/apis/api/relations/triple/")
+        self.assertEqual(len(response.json()), 9)
+
+    def test_temptriple_list(self):
+        response = self.assertQueries(5, "/apis/api/relations/temptriple/")
+        self.assertEqual(len(response.json()), 9)
+
+    def test_detail_relations(self):
+        # the property, its two many to many fields and the triples
+        url = f"/apis/api/relations/property/{self.prop.pk}/"
+        response = self.assertQueries(4, url)
+        self.assertEqual(len(response.json()["relations"]), 0)
+
+        entity = self.entities[4]
+        # additionally the subjects and the objects of the triples
+        url = f"/apis/api/relations/property/{entity.pk}/"
+        response = self.assertQueries(8, url)
+        relations = response.json()["relations"]
+        self.assertEqual(len(relations), 2)
+        self.assertEqual(
+            {relation["related_entity"]["id"] for relation in relations},
+            {self.entities[3].pk, self.entities[5].pk},
+        )
+        self.assertEqual(
+            {relation["relation_type"]["label"] for relation in relations},
+            {"knows", "knows [REVERSE]"},
+        )
+
+    def test_pagination_without_count(self):
+        url = "/apis/api/relations/triple/?limit=4&count=false"
+        # only the page and its subjects and objects
+        response = self.assertQueries(5, url)
+        data = response.json()
+        self.assertIsNone(data["count"])
+        self.assertEqual(len(data["results"]), 4)
+        self.assertIn("offset=4", data["next"])
+
+        data = self.get(url + "&offset=8").json()
+        self.assertEqual(len(data["results"]), 1)
+        self.assertIsNone(data["next"])
+
+    def test_pagination_keyset(self):
+        url = "/apis/api/relations/triple/?cursor=&limit=4"
+        pks = []
+        while url:
+            data = self.get(url).json()
+            self.assertEqual(data["count"], 9)
+            pks.extend(triple["id"] for triple in data["results"])
+            url = data["next"]
+        self.assertEqual(pks, sorted(Triple.objects.values_list("pk", flat=True)))
+
+    def test_fastjson(self):
+        for url in [
+            "/apis/api/relations/triple/?limit=4",
+            "/apis/api/relations/property/",
+            "/apis/api/apis_relations.triple/?limit=4&count=false",
+            "/apis/api/apis_relations.property/?cursor=&limit=4",
+        ]:
+            with self.subTest(url=url):
+                separator = "&" if "?" in url else "?"
+                regular = self.get(f"{url}{separator}format=json")
+                fast = self.get(f"{url}{separator}format=fastjson")
+                self.assertEqual(
+                    fast.content.replace(b"fastjson", b"json"), regular.content
+                )
+
+    def test_fastjson_queries(self):
+        # the triples, the contenttypes of the subjects and objects
+        # are part of the same query
+        self.assertQueries(1, "/apis/api/relations/triple/?format=fastjson")
@@ -15,7 +15,13 @@ from apis_core.api_routers import views
 from apis_core.utils import caching
 from apis_core.apis_metainfo.viewsets import UriToObjectViewSet
 from apis_core.core.views import Dumpdata
-from apis_core.apis_entities.api_views import GetEntityGeneric
+from apis_core.apis_entities.api_views import GetEntityGeneric, TeiExport
+from apis_core.apis_relations.api_views import (
+    GraphExport,
+    GraphNeighbourhood,
+    GraphPath,
+    GraphSnapshotView,
+)
 
 from drf_spectacular.views import (
     SpectacularAPIView,
@@ -87,5 +93,22 @@ urlpatterns = [
         name="GetEntityGeneric",
     ),
     path("api/dumpdata", Dumpdata.as_view()),
+    path("api/graph", GraphExport.as_view(), name="graphexport"),
+    path(
+        "api/graph/neighbourhood/<int:pk>",
+        GraphNeighbourhood.as_view(),
+        name="graphneighbourhood",
+    ),
+    path(
+        "api/graph/path/<int:source>/<int:target>",
+        GraphPath.as_view(),
+        name="graphpath",
+    ),
+    path(
+        "api/graph/snapshot/<int:pk>",
+        GraphSnapshotView.as_view(),
+        name="graphsnapshot",
+    ),
+    path("api/tei", TeiExport.as_view(), name="teiexport"),
     path("", include("apis_core.generic.urls", namespace="generic")),
 ]
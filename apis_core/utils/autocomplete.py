@@ -1,10 +1,195 @@
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from django.conf import settings
+from django.core.cache import cache
 from django.template.loader import render_to_string
+from django.utils.functional import cached_property
 
 logger = logging.getLogger(__name__)
 
+# the adapters of all the ExternalAutocomplete classes share one
+# thread pool; it is not shut down, because requests that miss
+# their deadline are left running in the background
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "APIS_AUTOCOMPLETE_ADAPTER_WORKERS", 16),
+                thread_name_prefix="apis-autocomplete",
+            )
+    return _executor
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the `requests.Session` of the current process. It keeps the
+    connections to the external services alive and its connection pool
+    is big enough for all the threads querying the adapters.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            workers = getattr(settings, "APIS_AUTOCOMPLETE_ADAPTER_WORKERS", 16)
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=workers, pool_maxsize=workers
+            )
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session_pid = os.getpid()
+    return _session
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker for an autocomplete adapter: after
+    `failure_threshold` consecutive failures the circuit opens and the
+    adapter is not queried for `reset_timeout` seconds. After that one
+    request is let through; if it succeeds the circuit closes again.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # half open: let one request through and wait for its result
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+
+class AdapterMetrics:
+    """
+    Latency and error counts of an autocomplete adapter.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, failed: bool = False):
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_skipped(self):
+        with self._lock:
+            self.skipped += 1
+
+    def record_cache(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "skipped": self.skipped,
+                "mean_latency": self.total_latency / self.calls if self.calls else None,
+                "max_latency": self.max_latency,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "cache_hit_rate": (
+                    self.cache_hits / (self.cache_hits + self.cache_misses)
+                    if self.cache_hits + self.cache_misses
+                    else None
+                ),
+            }
+
+
+class _Outcome:
+    """
+    The outcome of one query of an adapter. The worker thread and the
+    caller waiting for it both try to claim it, only the first one
+    updates the circuit breaker, so a query that misses its deadline
+    is counted once, no matter how it ends in the background.
+    """
+
+    def __init__(self):
+        self.claimed = False
+        self._lock = threading.Lock()
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self.claimed:
+                return False
+            self.claimed = True
+            return True
+
+
+def _query_adapter(adapter, q, session, outcome):
+    start = time.perf_counter()
+    try:
+        results = adapter.get_results(q, session)
+    except Exception as e:
+        adapter.metrics.record(time.perf_counter() - start, failed=True)
+        if outcome.claim():
+            adapter.circuit_breaker.record_failure()
+        logger.warning("Autocomplete adapter %s failed: %s", adapter, e)
+        return []
+    adapter.metrics.record(time.perf_counter() - start)
+    if outcome.claim():
+        adapter.circuit_breaker.record_success()
+    return results
+
 
 class ExternalAutocomplete:
     """
@@ -14,19 +199,51 @@ class ExternalAutocomplete:
     returns a list of results usable by the autocomplete view.
     This base class implements this `get_results` method in a
     way that you can inherit from it and just define a list of
-    `adapters`. Those adapters are then used one by one to
-    add external autocomplete search results.
+    `adapters`. Those adapters are then queried in parallel to
+    add external autocomplete search results. The results of
+    adapters that do not answer within their `timeout` are left
+    out, adapters that fail repeatedly are skipped for a while.
     """
 
-    session = requests.Session()
+    # defaults to the session of the process, see `get_session`
+    session = None
     adapters = []
 
     def get_results(self, q):
-        results = []
+        start = time.monotonic()
+        session = self.session or get_session()
+        futures = []
         for adapter in self.adapters:
-            results.extend(adapter.get_results(q, self.session))
+            if adapter.circuit_breaker.allow():
+                outcome = _Outcome()
+                future = get_executor().submit(
+                    _query_adapter, adapter, q, session, outcome
+                )
+                futures.append((adapter, future, outcome))
+            else:
+                adapter.metrics.record_skipped()
+        results = []
+        for adapter, future, outcome in futures:
+            remaining = start + adapter.timeout - time.monotonic()
+            try:
+                results.extend(future.result(timeout=max(remaining, 0)))
+            except TimeoutError:
+                adapter.metrics.record_timeout()
+                if outcome.claim():
+                    adapter.circuit_breaker.record_failure()
+                logger.warning("Autocomplete adapter %s timed out", adapter)
         return results
 
+    def get_stats(self) -> dict:
+        """
+        Return the metrics and the circuit breaker state of the adapters.
+        """
+        return {
+            str(adapter): adapter.metrics.as_dict()
+            | {"circuit_open": adapter.circuit_breaker.is_open}
+            for adapter in self.adapters
+        }
+
 
 class ExternalAutocompleteAdapter:
     """
@@ -34,12 +251,71 @@ class ExternalAutocompleteAdapter:
     the methods used for templating the autocomplete results.
     You can pass a `template` name to initialization, which
     is then used to style the results.
+    The responses of the external services are cached for
+    `cache_timeout` seconds, if they are not bigger than
+    `cache_max_size` bytes.
     """
 
     template = None
+    # the defaults are read from the settings when the adapter is created
+    timeout = None
+    cache_timeout = None
+    cache_max_size = None
 
     def __init__(self, *args, **kwargs):
         self.template = kwargs.get("template", None)
+        if self.timeout is None:
+            self.timeout = getattr(settings, "APIS_AUTOCOMPLETE_ADAPTER_TIMEOUT", 3)
+        if self.cache_timeout is None:
+            self.cache_timeout = getattr(
+                settings, "APIS_AUTOCOMPLETE_ADAPTER_CACHE_TIMEOUT", 300
+            )
+        if self.cache_max_size is None:
+            self.cache_max_size = getattr(
+                settings, "APIS_AUTOCOMPLETE_ADAPTER_CACHE_MAX_SIZE", 100000
+            )
+        self.timeout = kwargs.get("timeout", self.timeout)
+        self.cache_timeout = kwargs.get("cache_timeout", self.cache_timeout)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    @cached_property
+    def circuit_breaker(self):
+        return CircuitBreaker()
+
+    @cached_property
+    def metrics(self):
+        return AdapterMetrics()
+
+    def cache_key(self, method, url, params=None, data=None) -> str:
+        request = json.dumps([method, url, params, data], sort_keys=True, default=str)
+        return f"apis_autocomplete_adapter:{hashlib.md5(request.encode()).hexdigest()}"
+
+    def request(self, method, url, session=None, params=None, data=None, headers=None):
+        """
+        Send a request to the external service and return the decoded
+        JSON response. The responses are cached using the (method, url,
+        params, data) of the request as key; the headers are not part of
+        the key, so they should not change the response.
+        """
+        key = None
+        if self.cache_timeout:
+            key = self.cache_key(method, url, params, data)
+            cached = cache.get(key)
+            self.metrics.record_cache(hit=cached is not None)
+            if cached is not None:
+                return cached
+        session = session or get_session()
+        res = session.request(
+            method, url, params=params, data=data, headers=headers, timeout=self.timeout
+        )
+        # failing requests raise, so they are counted as failures
+        res.raise_for_status()
+        result = res.json()
+        if key and len(res.content) <= self.cache_max_size:
+            cache.set(key, result, self.cache_timeout)
+        return result
 
     def default_template(self, result):
         return f'{result["label"]} <a href="{result["id"]}">{result["id"]}</a>'
@@ -86,27 +362,29 @@ class TypeSenseAutocompleteAdapter(ExternalAutocompleteAdapter):
         )
         return False
 
-    def get_results(self, q, session=requests.Session()):
+    def get_results(self, q, session=None):
         headers = {"X-TYPESENSE-API-KEY": self.token}
-        res = None
+        params = {"q": q, "query_by": ["description", "label"]}
+        data = None
         if self.token and self.server:
             match self.collections:
                 # if there is only on collection configured, we hit that collection directly
                 case str() as collection:
-                    url = f"{self.server}/collections/{collection}/documents/search?q={q}&query_by=description&query_by=label"
-                    res = session.get(url, headers=headers)
+                    url = f"{self.server}/collections/{collection}/documents/search"
+                    data = self.request("GET", url, session, params, headers=headers)
                 # if there are multiple collections configured, we use the `multi_search` endpoint
                 case list() as collectionlist:
-                    url = f"{self.server}/multi_search?q={q}&query_by=description&query_by=label"
-                    data = {"searches": []}
+                    url = f"{self.server}/multi_search"
+                    searches = {"searches": []}
                     for collection in collectionlist:
-                        data["searches"].append({"collection": collection})
-                    res = session.post(url, data=json.dumps(data), headers=headers)
+                        searches["searches"].append({"collection": collection})
+                    data = self.request(
+                        "POST", url, session, params, json.dumps(searches), headers
+                    )
                 case unknown:
                     logger.error("Don't know what to do with collection %s", unknown)
 
-            if res:
-                data = res.json()
+            if data is not None:
                 hits = data.get("hits", [])
                 for result in data.get("results", []):
                     hits.extend(result["hits"])
@@ -118,15 +396,17 @@ class LobidAutocompleteAdapter(ExternalAutocompleteAdapter):
     """
     This autocomplete adapters queries the lobid autocomplete apis.
     See https://lobid.org/gnd/api for details
-    You can pass a `lobid_params` dict which will then be use as GET
-    request parameters.
+    You can pass a `params` dict which will then be use as GET
+    request parameters and an `endpoint` to query another instance.
     """
 
     params = {}
+    endpoint = "https://lobid.org/gnd/search?"
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.params = kwargs.get("params", {})
+        self.endpoint = kwargs.get("endpoint", self.endpoint)
 
     def extract(self, res):
         return {
@@ -135,10 +415,9 @@ class LobidAutocompleteAdapter(ExternalAutocompleteAdapter):
             "selected_text": self.get_result_label(res),
         }
 
-    def get_results(self, q, session=requests.Session()):
-        endpoint = "https://lobid.org/gnd/search?"
-        self.params["q"] = q
-        res = session.get(endpoint, params=self.params)
-        if res:
-            return list(filter(bool, map(self.extract, res.json())))
-        return []
+    def get_results(self, q, session=None):
+        # the adapters are queried from multiple threads, so the
+        # query is added to a copy of the params
+        params = self.params | {"q": q}
+        data = self.request("GET", self.endpoint, session, params)
+        return list(filter(bool, map(self.extract, data)))
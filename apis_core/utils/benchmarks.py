@@ -0,0 +1,277 @@
+"""
+Benchmarks comparing optimized code paths with the regular ones. They are
+run using the `apisbenchmark` management command on the data of an APIS
+instance, every benchmark returns a list of (label, seconds) tuples.
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.forms import modelform_factory
+from django_tables2.export import TableExport
+from django_tables2.tables import table_factory
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apis_core.apis_metainfo.models import RootObject
+from apis_core.apis_metainfo.resolvers import get_root_object
+from apis_core.apis_relations import export
+from apis_core.apis_relations.models import Triple
+from apis_core.apis_relations.tables import TripleTable
+from apis_core.generic import factories
+from apis_core.generic.api_views import ModelViewSet
+from apis_core.generic.filtersets import GenericFilterSet, filterset_factory
+from apis_core.generic.forms import GenericModelForm
+from apis_core.generic.search import IcontainsSearchBackend, get_search_backend
+from apis_core.generic.serializers import (
+    GenericHyperlinkedModelSerializer,
+    serializer_factory,
+)
+from apis_core.generic.tables import GenericTable
+from apis_core.utils.filtermethods import (
+    construct_lookup,
+    related_entity_name,
+    related_property_name,
+)
+
+
+def timed(function, repeat: int = 5) -> float:
+    """
+    Run `function` `repeat` times and return the fastest run in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_api_list(model: str, limit: int = 100, repeat: int = 5) -> list:
+    """
+    Compare the regular serialization of a page of the generic API list
+    endpoint of `model` (`app_label.model`) with the `fastjson` format,
+    which serializes the page based on `QuerySet.values`.
+    """
+    app_label, model = model.split(".")
+    contenttype = ContentType.objects.get(app_label=app_label, model=model)
+    user = get_user_model().objects.filter(is_superuser=True).first()
+    view = ModelViewSet.as_view({"get": "list"})
+    factory = APIRequestFactory()
+
+    def request(format):
+        request = factory.get("/", {"limit": limit, "format": format})
+        if user is not None:
+            force_authenticate(request, user)
+        response = view(request, contenttype=contenttype)
+        response.render()
+        return response
+
+    results = []
+    for format in ["json", "fastjson"]:
+        # fill the caches before measuring
+        request(format)
+        results.append((format, timed(lambda: request(format), repeat)))
+    return results
+
+
+def benchmark_entity_lookup(model: str, limit: int = 100, repeat: int = 5) -> list:
+    """
+    Compare fetching `limit` instances of `model` (`app_label.model`, a
+    subclass of RootObject) one by one using `select_subclasses`, which
+    joins the tables of all RootObject subclasses, with `get_root_object`,
+    which reads the contenttype first and then queries the concrete table.
+    """
+    app_label, model = model.split(".")
+    model_class = ContentType.objects.get(
+        app_label=app_label, model=model
+    ).model_class()
+    pks = list(model_class.objects.order_by("pk").values_list("pk", flat=True)[:limit])
+
+    def select_subclasses():
+        for pk in pks:
+            RootObject.objects_inheritance.get_subclass(pk=pk)
+
+    def self_contenttype():
+        for pk in pks:
+            get_root_object(pk)
+
+    results = []
+    for label, function in [
+        ("select_subclasses", select_subclasses),
+        ("self_contenttype", self_contenttype),
+    ]:
+        function()
+        results.append((label, timed(function, repeat)))
+    return results
+
+
+def benchmark_search(model: str, limit: int = 10, repeat: int = 5) -> list:
+    """
+    Compare fetching the first `limit` autocomplete results of `model`
+    (`app_label.model`) using `icontains` lookups with the search backend
+    of the database. The query is the first word of the last object.
+    """
+    app_label, model = model.split(".")
+    model_class = ContentType.objects.get(
+        app_label=app_label, model=model
+    ).model_class()
+    backend = get_search_backend(model_class.objects.db)
+    fields = backend.get_fields(model_class)
+    values = model_class.objects.order_by("-pk").values_list(*fields).first() or []
+    words = [word for value in values if value for word in str(value).split()]
+    query = words[0] if words else ""
+
+    results = []
+    for label, search_backend in [
+        ("icontains", IcontainsSearchBackend()),
+        (backend.__class__.__name__, backend),
+    ]:
+
+        def function():
+            return list(search_backend.search(model_class.objects.all(), query)[:limit])
+
+        function()
+        results.append((label, timed(function, repeat)))
+    return results
+
+
+def _joined_related_property_name(queryset, value):
+    lookup, value = construct_lookup(value)
+    return queryset.filter(
+        Q(**{f"triple_set_from_obj__prop__name_forward{lookup}": value})
+        | Q(**{f"triple_set_from_obj__prop__name_reverse{lookup}": value})
+        | Q(**{f"triple_set_from_subj__prop__name_forward{lookup}": value})
+        | Q(**{f"triple_set_from_subj__prop__name_reverse{lookup}": value})
+    ).distinct()
+
+
+def _joined_related_entity_name(queryset, value, models):
+    lookup, value = construct_lookup(value)
+    query = Q(pk__in=[])
+    for model in models:
+        name = f"{model._meta.model_name}__name{lookup}"
+        query |= Q(**{f"triple_set_from_obj__subj__{name}": value})
+        query |= Q(**{f"triple_set_from_subj__obj__{name}": value})
+    return queryset.filter(query).distinct()
+
+
+def benchmark_related_filter(model: str, limit: int = 100, repeat: int = 5) -> list:
+    """
+    Compare filtering the list of `model` (`app_label.model`, a subclass
+    of RootObject) on the name of a related property and of a related
+    entity - counting the results and fetching the first `limit` of them,
+    like the list views do - using joins and `distinct` with the `pk__in`
+    subqueries of `apis_core.utils.filtermethods`. The names are taken
+    from the last triple.
+    """
+    app_label, model = model.split(".")
+    model_class = ContentType.objects.get(
+        app_label=app_label, model=model
+    ).model_class()
+    named_models = [
+        model
+        for model in RootObject.__subclasses__()
+        if any(field.name == "name" for field in model._meta.concrete_fields)
+    ]
+    triple = Triple.objects.order_by("-pk").first()
+    prop = triple.prop.name_forward if triple else ""
+    entity = getattr(get_root_object(triple.obj_id), "name", "") if triple else ""
+
+    def page(queryset):
+        return queryset.count(), list(queryset.order_by("pk")[:limit])
+
+    def joins():
+        queryset = model_class.objects.all()
+        page(_joined_related_property_name(queryset, prop))
+        page(_joined_related_entity_name(queryset, entity, named_models))
+
+    def subqueries():
+        queryset = model_class.objects.all()
+        page(related_property_name(queryset, "related_property", prop))
+        page(related_entity_name(queryset, "related_entity_name", entity))
+
+    results = []
+    for label, function in [("join", joins), ("subquery", subqueries)]:
+        function()
+        results.append((label, timed(function, repeat)))
+    return results
+
+
+def benchmark_relation_export(model: str, limit: int = 1000, repeat: int = 5) -> list:
+    """
+    Compare exporting the first `limit` relations of `model`
+    (`app_label.model`, Triple or a subclass) as CSV using the
+    django-tables2 export of the relation table with the streaming
+    export of `apis_core.apis_relations.export`.
+    """
+    app_label, model = model.split(".")
+    model_class = ContentType.objects.get(
+        app_label=app_label, model=model
+    ).model_class()
+    pks = list(model_class.objects.order_by("pk").values_list("pk", flat=True)[:limit])
+    table_class = table_factory(model_class, TripleTable)
+
+    def table():
+        table = table_class(model_class.objects.filter(pk__in=pks).order_by("pk"))
+        return TableExport("csv", table).export()
+
+    def stream():
+        triples = model_class.objects.filter(pk__in=pks)
+        return "".join(export.csv_export(triples))
+
+    results = []
+    for label, function in [("table", table), ("stream", stream)]:
+        function()
+        results.append((label, timed(function, repeat)))
+    return results
+
+
+def benchmark_class_factories(model: str, limit: int = 100, repeat: int = 5) -> list:
+    """
+    Compare creating the table, filterset, form and serializer classes of
+    `model` (`app_label.model`) `limit` times - once per request, like the
+    generic views used to - with the cached factories of
+    `apis_core.generic.factories`.
+    """
+    app_label, model = model.split(".")
+    model_class = ContentType.objects.get(
+        app_label=app_label, model=model
+    ).model_class()
+    bases = [
+        (table_factory, factories.cached_table_factory, GenericTable),
+        (filterset_factory, factories.cached_filterset_factory, GenericFilterSet),
+        (modelform_factory, factories.cached_modelform_factory, GenericModelForm),
+        (
+            serializer_factory,
+            factories.cached_serializer_factory,
+            GenericHyperlinkedModelSerializer,
+        ),
+    ]
+
+    def created():
+        for _ in range(limit):
+            for factory, _, base in bases:
+                factory(model_class, base)
+
+    def cached():
+        for _ in range(limit):
+            for _, factory, base in bases:
+                factory(model_class, base)
+
+    results = []
+    for label, function in [("created", created), ("cached", cached)]:
+        function()
+        results.append((label, timed(function, repeat)))
+    return results
+
+
+BENCHMARKS = {
+    "api-list": benchmark_api_list,
+    "entity-lookup": benchmark_entity_lookup,
+    "search": benchmark_search,
+    "related-filter": benchmark_related_filter,
+    "relation-export": benchmark_relation_export,
+    "class-factories": benchmark_class_factories,
+}
@@ -266,6 +266,8 @@ def get_all_contenttype_classes():
             "relationpublishedqueryset",
             "inheritanceforwardmanytoonedescriptor",
             "inheritanceforeignkey",
+            # derived from the triples, see apis_core.apis_relations.adjacency
+            "adjacency",
         ]
         apis_modules = [
             "apis_core.apis_metainfo.models",
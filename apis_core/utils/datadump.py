@@ -0,0 +1,341 @@
+"""
+Sharded datadump and the matching loader.
+
+The regular datadump (`apis_core.utils.helpers.datadump_serializer`) writes
+all the APIS data into one big document, which then has to be imported
+object by object using `loaddata`. For large instances this module provides
+an alternative: the data is split into shards - one file per model or per
+range of primary keys of a model - which can be written by multiple
+processes in parallel. A `manifest.json` lists the shards in dependency
+order, so `load_shards` can insert them in bulk in the right order.
+"""
+
+import json
+import logging
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+from reversion.models import Revision, Version
+
+from apis_core.apis_relations import adjacency
+from apis_core.apis_relations.models import Triple
+from apis_core.utils.helpers import datadump_get_models
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+def _pk_ranges(model, shard_size: int, using: str = DEFAULT_DB_ALIAS):
+    """
+    Split the primary keys of a model into ranges of at most `shard_size`
+    objects. Returns a list of (first_pk, last_pk) tuples.
+    """
+    pks = (
+        model._default_manager.using(using)
+        .order_by(model._meta.pk.name)
+        .values_list(model._meta.pk.name, flat=True)
+    )
+    ranges = []
+    first = last = None
+    count = 0
+    for pk in pks.iterator():
+        if first is None:
+            first = pk
+        last = pk
+        count += 1
+        if count == shard_size:
+            ranges.append((first, last))
+            first, count = None, 0
+    if first is not None:
+        ranges.append((first, last))
+    return ranges
+
+
+def _sort_by_relations(models: list) -> list:
+    """
+    `serializers.sort_dependencies` only records dependencies of models
+    with natural keys, so we additionally sort the models topologically
+    by their parents and their relations to other dumped models. The
+    order of models without dependencies between them is kept.
+    """
+
+    def dependencies(model):
+        deps = set(model._meta.get_parent_list())
+        for field in model._meta.local_fields + model._meta.local_many_to_many:
+            if field.is_relation and field.related_model is not None:
+                deps.add(field.related_model._meta.concrete_model)
+        deps.discard(model)
+        return deps & set(models)
+
+    pending = list(models)
+    ordered = []
+    while pending:
+        ready = [m for m in pending if not dependencies(m) - set(ordered)]
+        # break cycles by taking the first pending model
+        ordered.extend(ready or pending[:1])
+        pending = [m for m in pending if m not in ordered]
+    return ordered
+
+
+def datadump_get_shards(
+    additional_app_labels: list = [], shard_size: int = 0, using=DEFAULT_DB_ALIAS
+):
+    """
+    Create the list of shards for a datadump. The shards are in the
+    dependency order of their models. If `shard_size` is set, models
+    with more objects than `shard_size` are split into multiple shards
+    by primary key ranges, otherwise there is one shard per model.
+    """
+    shards = []
+    for model in _sort_by_relations(datadump_get_models(additional_app_labels)):
+        if model._meta.proxy or not router.allow_migrate_model(using, model):
+            continue
+        label = model._meta.label_lower
+        if shard_size:
+            ranges = _pk_ranges(model, shard_size, using)
+        else:
+            ranges = [(None, None)]
+        for first_pk, last_pk in ranges:
+            shards.append(
+                {
+                    "model": label,
+                    "file": f"{len(shards):05d}-{label}.json",
+                    "first_pk": first_pk,
+                    "last_pk": last_pk,
+                }
+            )
+    return shards
+
+
+def _dump_shard(shard: dict, directory: str, using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Serialize one shard into its file and return the number of objects
+    written. This runs in the worker processes, so it only gets picklable
+    arguments.
+    """
+    model = apps.get_model(shard["model"])
+    pk = model._meta.pk.name
+    queryset = model._default_manager.using(using).order_by(pk)
+    if shard["first_pk"] is not None:
+        queryset = queryset.filter(
+            **{f"{pk}__gte": shard["first_pk"], f"{pk}__lte": shard["last_pk"]}
+        )
+
+    count = 0
+
+    def counted(objects):
+        nonlocal count
+        for obj in objects:
+            count += 1
+            yield obj
+
+    with open(Path(directory) / shard["file"], "w") as fh:
+        serializers.serialize(
+            "json",
+            counted(queryset.iterator()),
+            stream=fh,
+            use_natural_foreign_keys=True,
+        )
+    return count
+
+
+def datadump_shards(
+    directory: str,
+    additional_app_labels: list = [],
+    shard_size: int = 0,
+    processes: int = 1,
+    using: str = DEFAULT_DB_ALIAS,
+) -> dict:
+    """
+    Write a sharded datadump to `directory`. The shards are written by
+    `processes` worker processes. Returns the manifest, which is also
+    written to `directory/manifest.json`.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    shards = datadump_get_shards(additional_app_labels, shard_size, using)
+
+    if processes > 1:
+        # the forked workers must not share the database connections
+        # of the parent process, they will open their own ones
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            counts = executor.map(
+                _dump_shard,
+                shards,
+                [str(directory)] * len(shards),
+                [using] * len(shards),
+            )
+            counts = list(counts)
+    else:
+        counts = [_dump_shard(shard, str(directory), using) for shard in shards]
+
+    for shard, count in zip(shards, counts):
+        shard["count"] = count
+    manifest = {"format": "json", "shards": shards}
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _bulk_insert(model, objects: list, using: str):
+    """
+    Insert the deserialized `objects` of `model` in bulk. This works
+    like `bulk_create`, but does not refuse models with multi table
+    inheritance - the datadump contains the parent rows separately, so
+    we only have to insert the local fields of each model.
+    Many to many relations are inserted in bulk into the through tables.
+    """
+    connection = connections[using]
+    fields = model._meta.local_concrete_fields
+    instances = [obj.object for obj in objects]
+    batch_size = max(connection.ops.bulk_batch_size(fields, instances), 1)
+    manager = model._base_manager.using(using)
+    # `bulk_create` raises a ValueError for models with multi table
+    # inheritance, so we use `_insert`, which `bulk_create` is built on.
+    # It is private API: the arguments used here are the same in Django
+    # 4.1 to 5.2 (the versions allowed by pyproject.toml), check them when
+    # raising the upper bound.
+    for start in range(0, len(instances), batch_size):
+        manager._insert(
+            instances[start : start + batch_size], fields=fields, using=using
+        )
+
+    for field in model._meta.local_many_to_many:
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            continue
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        rows = [
+            through(**{source: obj.object.pk, target: value})
+            for obj in objects
+            for value in obj.m2m_data.get(field.name, [])
+        ]
+        through._base_manager.using(using).bulk_create(rows, batch_size=batch_size)
+
+
+def load_shards(directory: str, using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Load a sharded datadump written by `datadump_shards`. The shards are
+    inserted in the order of the manifest, inside one transaction and
+    with constraint checks disabled; the constraints are checked once
+    after all the shards are loaded. Returns the number of objects loaded.
+    """
+    directory = Path(directory)
+    manifest = json.loads((directory / MANIFEST).read_text())
+    connection = connections[using]
+    models = []
+    loaded = 0
+
+    with transaction.atomic(using=using):
+        with connection.constraint_checks_disabled():
+            for shard in manifest["shards"]:
+                model = apps.get_model(shard["model"])
+                if model not in models:
+                    models.append(model)
+                with open(directory / shard["file"]) as fh:
+                    objects = list(
+                        serializers.deserialize(manifest["format"], fh, using=using)
+                    )
+                _bulk_insert(model, objects, using)
+                loaded += len(objects)
+                logger.debug("Loaded %d objects from %s", len(objects), shard["file"])
+        table_names = [model._meta.db_table for model in models]
+        connection.check_constraints(table_names=table_names)
+
+        # the primary keys were part of the data, so we have to reset the
+        # sequences of the databases that use them (see the `loaddata` command)
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for line in sequence_sql:
+                    cursor.execute(line)
+
+        # the triples were inserted without sending signals
+        if adjacency.enabled() and any(issubclass(m, Triple) for m in models):
+            adjacency.rebuild(using=using)
+    return loaded
+
+
+def datadump_delta(
+    additional_app_labels: list = [],
+    since_revision: int = None,
+    since=None,
+    using: str = DEFAULT_DB_ALIAS,
+) -> dict:
+    """
+    Create an incremental datadump containing only the objects that were
+    created, changed or deleted after the revision with the id
+    `since_revision` and/or after the datetime `since`. This is based on
+    the django-reversion revisions, so changes that were done outside of
+    a revision are not part of the delta.
+    The result contains the current state of the changed objects, a
+    list of tombstones for the deleted objects (which are only recorded if
+    `APIS_DELETION_REVISIONS` is set) and a `revision` id. The
+    `revision` id can be used as `since_revision` to get the next delta.
+    """
+    models = _sort_by_relations(datadump_get_models(additional_app_labels))
+    contenttypes = ContentType.objects.db_manager(using).get_for_models(*models)
+
+    # fix the upper bound, so that revisions created while we
+    # are exporting end up in the next delta
+    revision = Revision.objects.using(using).aggregate(last=Max("pk"))["last"] or 0
+    revisions = Revision.objects.using(using).filter(pk__lte=revision)
+    if since_revision is not None:
+        revisions = revisions.filter(pk__gt=since_revision)
+    if since is not None:
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        revisions = revisions.filter(date_created__gt=since)
+
+    changed = defaultdict(set)
+    versions = (
+        Version.objects.using(using)
+        .filter(revision__in=revisions, content_type__in=contenttypes.values())
+        .values_list("content_type_id", "object_id")
+        .distinct()
+    )
+    for content_type_id, object_id in versions.iterator():
+        changed[content_type_id].add(object_id)
+
+    objects = []
+    deleted = []
+    for model in models:
+        object_ids = changed.get(contenttypes[model].pk)
+        if not object_ids:
+            continue
+        pks = {model._meta.pk.to_python(object_id) for object_id in object_ids}
+        queryset = (
+            model._default_manager.using(using)
+            .filter(pk__in=pks)
+            .order_by(model._meta.pk.name)
+        )
+        existing = set()
+
+        def tracked(queryset):
+            for obj in queryset.iterator():
+                existing.add(obj.pk)
+                yield obj
+
+        objects.extend(
+            serializers.serialize(
+                "python", tracked(queryset), use_natural_foreign_keys=True
+            )
+        )
+        deleted.extend(
+            {"model": model._meta.label_lower, "pk": pk}
+            for pk in sorted(pks - existing)
+        )
+    return {"revision": revision, "objects": objects, "deleted": deleted}
@@ -2,8 +2,13 @@
 This module contains filter functions that can be used by django-filter filters
 See https://django-filter.readthedocs.io/en/main/ref/filters.html#method
 """
+from django.apps import apps
 from django.db.models import Q
 
+from apis_core.apis_metainfo.models import RootObject
+from apis_core.apis_relations import adjacency
+from apis_core.apis_relations.models import Adjacency, Property, Triple
+
 
 # should return tuple[str, str] once we are >=3.9
 def construct_lookup(value: str) -> tuple:
@@ -51,19 +56,79 @@ def flexible_string(queryset, name, value):
 
 # filtermethods for specific usecases:
 
-# TODO RDF: Check if this should be removed or adapted
+# The filters on related objects use `pk__in` subqueries over the triples
+# instead of joins, so the results do not have to be made distinct. The
+# subqueries are covered by the composite indexes of the `Triple` model or
+# use the adjacency table, if it is enabled.
+
+
+def related_to(queryset, subjects=None, objects=None):
+    """
+    Filter a queryset of root objects on the objects they are related to:
+    `objects` are the values (i.e. a `values("pk")` queryset) of the
+    objects the root objects are the subject of, `subjects` of the
+    subjects they are the object of; `None` skips a direction. `subjects`
+    and `objects` may also be Q objects filtering the triples (using the
+    fields `Triple` and `Adjacency` have in common, i.e. `prop`).
+    """
+    if adjacency.enabled():
+        return _related_to_adjacency(queryset, subjects, objects)
+
+    def triples(condition, field):
+        if not isinstance(condition, Q):
+            condition = Q(**{f"{field}__in": condition})
+        return Triple.objects.filter(condition)
+
+    query = Q(pk__in=[])
+    if objects is not None:
+        query |= Q(pk__in=triples(objects, "obj_id").values("subj_id"))
+    if subjects is not None:
+        query |= Q(pk__in=triples(subjects, "subj_id").values("obj_id"))
+    return queryset.filter(query)
+
+
+def _related_to_adjacency(queryset, subjects=None, objects=None):
+    def condition(other):
+        if isinstance(other, Q):
+            return other
+        return Q(other_id__in=other)
+
+    if subjects is not None and subjects is objects:
+        # both directions, so the direction does not matter
+        query = condition(subjects)
+    else:
+        query = Q(pk__in=[])
+        if objects is not None:
+            query |= Q(direction=Adjacency.FORWARD) & condition(objects)
+        if subjects is not None:
+            query |= Q(direction=Adjacency.REVERSE) & condition(subjects)
+    adjacencies = Adjacency.objects.filter(query)
+    return queryset.filter(pk__in=adjacencies.values("entity_id"))
+
+
+def root_objects_by_name(lookup: str, value: str):
+    """
+    Return the pks of the root objects whose concrete model has a `name`
+    field matching the `lookup` and the `value`. Only the tables of those
+    models are queried.
+    """
+    query = Q(pk__in=[])
+    for model in apps.get_models():
+        if issubclass(model, RootObject) and any(
+            field.name == "name" for field in model._meta.concrete_fields
+        ):
+            names = model.objects.filter(**{f"name{lookup}": value})
+            query |= Q(pk__in=names.values("pk"))
+    return RootObject.objects.filter(query).values("pk")
+
+
 def related_entity_name(queryset, name, value):
     """
     filter on the name of a related entity using :func:`construct_lookup`
     """
     lookup, value = construct_lookup(value)
-
-    queryset = queryset.filter(
-        Q(**{f"triple_set_from_obj__subj__name{lookup}": value})
-        | Q(**{f"triple_set_from_subj__obj__name{lookup}": value})
-    ).distinct()
-
-    return queryset
+    related = root_objects_by_name(lookup, value)
+    return related_to(queryset, subjects=related, objects=related)
 
 
 def related_property_name(queryset, name, value):
@@ -71,15 +136,11 @@ def related_property_name(queryset, name, value):
     filter on the name of a related property using :func:`construct_lookup`
     """
     lookup, value = construct_lookup(value)
-
-    queryset = queryset.filter(
-        Q(**{f"triple_set_from_obj__prop__name_forward{lookup}": value})
-        | Q(**{f"triple_set_from_obj__prop__name_reverse{lookup}": value})
-        | Q(**{f"triple_set_from_subj__prop__name_forward{lookup}": value})
-        | Q(**{f"triple_set_from_subj__prop__name_reverse{lookup}": value})
-    ).distinct()
-
-    return queryset
+    properties = Property.objects.filter(
+        Q(**{f"name_forward{lookup}": value}) | Q(**{f"name_reverse{lookup}": value})
+    )
+    prop = Q(prop_id__in=properties.values("pk"))
+    return related_to(queryset, subjects=prop, objects=prop)
 
 
 def related_arbitrary_model_name(queryset, name, value):
@@ -101,9 +162,14 @@ def related_arbitrary_model_name(queryset, name, value):
 
 
 def name_label_filter(queryset, name, value):
+    """
+    filter on the field `name` or on the labels of the objects using
+    :func:`construct_lookup`. The labels are looked up in a subquery,
+    so the results do not have to be made distinct.
+    """
     lookup, value = construct_lookup(value)
 
-    queryset_related_label = queryset.filter(**{"label__label" + lookup: value})
-    queryset_self_name = queryset.filter(**{name + lookup: value})
-
-    return (queryset_related_label | queryset_self_name).distinct().all()
+    labelled = queryset.model.objects.filter(**{"label__label" + lookup: value})
+    return queryset.filter(
+        Q(**{name + lookup: value}) | Q(pk__in=labelled.values("pk"))
+    )
@@ -3,16 +3,20 @@ import importlib
 import inspect
 import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 
-from apis_core.apis_relations.models import Property, TempTriple
+from apis_core.apis_relations import adjacency
+from apis_core.apis_relations.models import Adjacency, Property, TempTriple
 from apis_core.utils.settings import get_entity_settings_by_modelname
 from apis_core.apis_relations.tables import get_generic_triple_table
 from apis_core.apis_metainfo.models import Uri
-from apis_core.generic.helpers import module_paths, first_member_match
+from apis_core.apis_metainfo.resolvers import resolve_uris
+from apis_core.generic.helpers import get_override
 
 from django.apps import apps
-from django.db import DEFAULT_DB_ALIAS, router
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, router, transaction
 from django.db.models import Q
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
@@ -96,12 +100,11 @@ def datadump_get_objects(models: list = [], *args, **kwargs):
             yield from queryset.iterator()
 
 
-def datadump_get_queryset(additional_app_labels: list = []):
+def datadump_get_models(additional_app_labels: list = []):
     """
-    This method is loosely based on the `dumpdata` admin command.
-    It iterates throug the relevant app models and exports them using
-    a serializer and natural foreign keys.
-    Data exported this way can be reimported into a newly created Django APIS app
+    Return the list of models that are part of an APIS datadump, sorted
+    by their dependencies. This is used by `datadump_get_queryset` and
+    by the sharded datadump in `apis_core.utils.datadump`.
     """
 
     # get all APIS apps and all APIS models
@@ -127,9 +130,22 @@ def datadump_get_queryset(additional_app_labels: list = []):
         app_config = apps.get_app_config(app_label)
         app_list[app_config] = None
 
-    models = serializers.sort_dependencies(app_list.items(), allow_cycles=True)
+    # the adjacency table is derived from the triples, so it is not dumped
+    return [
+        model
+        for model in serializers.sort_dependencies(app_list.items(), allow_cycles=True)
+        if model is not Adjacency
+    ]
+
 
-    yield from datadump_get_objects(models)
+def datadump_get_queryset(additional_app_labels: list = []):
+    """
+    This method is loosely based on the `dumpdata` admin command.
+    It iterates throug the relevant app models and exports them using
+    a serializer and natural foreign keys.
+    Data exported this way can be reimported into a newly created Django APIS app
+    """
+    yield from datadump_get_objects(datadump_get_models(additional_app_labels))
 
 
 def datadump_serializer(additional_app_labels: list = [], serialier_format="json"):
@@ -154,10 +170,21 @@ def triple_sidebar(pk: int, entity_name: str, request, detail=True):
 
         other_entity_class_name = entity_class.__name__.lower()
 
-        triples_related_by_entity = triples_related_all.filter(
-            (Q(subj__self_contenttype=entity_content_type) & Q(obj__pk=pk))
-            | (Q(obj__self_contenttype=entity_content_type) & Q(subj__pk=pk))
-        )
+        if adjacency.enabled():
+            triples_related_by_entity = (
+                TempTriple.objects_inheritance.filter(
+                    pk__in=Adjacency.objects.filter(
+                        entity_id=pk, other_contenttype=entity_content_type
+                    ).values("triple_id")
+                )
+                .all()
+                .select_subclasses()
+            )
+        else:
+            triples_related_by_entity = triples_related_all.filter(
+                (Q(subj__self_contenttype=entity_content_type) & Q(obj__pk=pk))
+                | (Q(obj__self_contenttype=entity_content_type) & Q(subj__pk=pk))
+            )
 
         table_class = get_generic_triple_table(
             other_entity_class_name=other_entity_class_name,
@@ -190,11 +217,101 @@ def create_object_from_uri(uri: str, model: object) -> object:
             uri = Uri.objects.get(uri=uri)
             return uri.root_object
         except Uri.DoesNotExist:
-            importer_paths = module_paths(model, path="importers", suffix="Importer")
-            Importer = first_member_match(importer_paths)
+            Importer = get_override(model, "importers", "Importer")
             if Importer is not None:
                 importer = Importer(uri, model)
                 instance = importer.create_instance()
                 uri = Uri.objects.create(uri=importer.get_uri, root_object=instance)
                 return instance
     return None
+
+
+def _import_object_from_uri(importer_class, uri: str, model: object) -> int:
+    """
+    Import the object of one `uri` using `importer_class`, store the uri
+    and return the id of the object. If the uri was stored concurrently
+    by someone else, the import is rolled back and the id of the object
+    the uri belongs to is returned.
+    """
+    importer = importer_class(uri, model)
+    try:
+        with transaction.atomic():
+            instance = importer.create_instance()
+            Uri.objects.create(uri=importer.get_uri, root_object=instance)
+            return instance.pk
+    except IntegrityError:
+        root_object_id = (
+            Uri.objects.filter(uri=importer.get_uri)
+            .values_list("root_object_id", flat=True)
+            .first()
+        )
+        if root_object_id is None:
+            raise
+        return root_object_id
+
+
+def _import_object_from_uri_in_thread(*args) -> int:
+    # the database connections of a thread are not reused
+    # after the thread ends, so we have to close them
+    try:
+        return _import_object_from_uri(*args)
+    finally:
+        connections.close_all()
+
+
+def get_or_create_objects_from_uris(
+    uris: list, model: object, max_workers: int = None
+) -> tuple[dict, dict]:
+    """
+    The batch version of `create_object_from_uri`: the uris are cleaned
+    in bulk and the existing ones are resolved using one query per
+    batch. The uris that are not yet known are imported using the
+    importer of the `model`, `max_workers` of them concurrently (the
+    default is the `APIS_IMPORT_MAX_WORKERS` setting, on SQLite the
+    uris are always imported one after the other).
+    Returns a tuple of two dicts: the first maps the uris to the ids of
+    their objects, the second maps the uris that could not be resolved
+    or imported to an error message.
+    """
+    if max_workers is None:
+        max_workers = getattr(settings, "APIS_IMPORT_MAX_WORKERS", 4)
+    ids, errors = {}, {}
+    for uri in uris:
+        if not uri.startswith("http"):
+            errors[uri] = "Not an http(s) uri"
+    resolved = resolve_uris([uri for uri in uris if uri not in errors])
+
+    missing = [uri for uri, value in resolved.items() if value is None]
+    for uri, value in resolved.items():
+        if value is not None:
+            ids[uri] = value[0]
+    if missing:
+        importer_class = get_override(model, "importers", "Importer")
+        if importer_class is None:
+            errors.update({uri: f"There is no importer for {model}" for uri in missing})
+            missing = []
+    if missing:
+        # SQLite does not support concurrent writes
+        concurrent = connections[router.db_for_write(Uri)].vendor != "sqlite"
+        if concurrent and max_workers > 1 and len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    uri: executor.submit(
+                        _import_object_from_uri_in_thread, importer_class, uri, model
+                    )
+                    for uri in missing
+                }
+            calls = {uri: future.result for uri, future in futures.items()}
+        else:
+            calls = {
+                uri: functools.partial(
+                    _import_object_from_uri, importer_class, uri, model
+                )
+                for uri in missing
+            }
+        for uri, call in calls.items():
+            try:
+                ids[uri] = call()
+            except Exception as e:
+                errors[uri] = str(e)
+    return ids, errors
@@ -1,16 +1,39 @@
 # SPDX-FileCopyrightText: 2023 Birger Schacht
 # SPDX-License-Identifier: MIT
 
+import functools
 import re
+
 from apis_core.utils.settings import dict_from_toml_directory
 
 
-def clean_uri(uri: str) -> str:
+@functools.cache
+def _cleanuri_rules() -> list:
+    # the rules are read from the toml files once per process
     configs = dict_from_toml_directory("cleanuri")
+    return [
+        (re.compile(definition["regex"]), definition["replace"])
+        for definition in configs.values()
+    ]
+
+
+def _clean_uri(uri: str, rules: list) -> str:
     if uri is not None:
-        for key, definition in configs.items():
-            regex = definition["regex"]
-            replace = definition["replace"]
-            if m := re.match(regex, uri):
+        for regex, replace in rules:
+            if m := regex.match(uri):
                 uri = replace.format(m.group(1))
     return uri
+
+
+def clean_uri(uri: str) -> str:
+    return _clean_uri(uri, _cleanuri_rules())
+
+
+def clean_uris(uris: list) -> dict:
+    """
+    Clean multiple uris at once. The rules are only read once, so this
+    is a lot faster than calling `clean_uri` for every uri. Returns a
+    dict mapping the uris to the cleaned uris.
+    """
+    rules = _cleanuri_rules()
+    return {uri: _clean_uri(uri, rules) for uri in uris}
@@ -1,8 +1,36 @@
+from functools import lru_cache
+
 from django.template import loader
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from rest_framework import renderers
 
 
+@lru_cache(maxsize=None)
+def get_template(template_name):
+    """
+    Return the compiled template `template_name`. The templates are
+    compiled only once per process instead of on every render.
+    """
+    return loader.get_template(template_name)
+
+
+@lru_cache(maxsize=None)
+def select_template(template_names: tuple):
+    """
+    Return the first compiled template found of `template_names`.
+    """
+    return loader.select_template(template_names)
+
+
+@receiver(setting_changed)
+def clear_template_cache(setting, **kwargs):
+    if setting == "TEMPLATES":
+        get_template.cache_clear()
+        select_template.cache_clear()
+
+
 class TeiRenderer(renderers.BaseRenderer):
     media_type = "text/xml"
     format = "tei"
@@ -10,7 +38,7 @@ class TeiRenderer(renderers.BaseRenderer):
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         if self.template_name:
-            template = loader.get_template(self.template_name)
+            template = get_template(self.template_name)
             request = renderer_context["request"]
             return template.render(data, request=request)
         raise ImproperlyConfigured(
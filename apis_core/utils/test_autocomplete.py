@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apis_core.utils.autocomplete import (
+    CircuitBreaker,
+    ExternalAutocomplete,
+    LobidAutocompleteAdapter,
+    TypeSenseAutocompleteAdapter,
+    get_session,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if self.path.startswith("/slow"):
+            time.sleep(0.5)
+        if self.path.startswith("/error"):
+            self.send_response(500)
+            self.end_headers()
+            return
+        if self.path.startswith("/collections"):
+            data = {"hits": [{"document": {"id": "ts1", "label": "Typesense"}}]}
+        else:
+            data = [{"id": "https://d-nb.info/gnd/1", "label": "Lobid"}]
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except BrokenPipeError:
+            # the client gave up waiting for the slow response
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class ExternalAutocompleteTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        StubHandler.requests.clear()
+
+    def autocomplete(self, *adapters):
+        return type(
+            "StubExternalAutocomplete", (ExternalAutocomplete,), {"adapters": adapters}
+        )()
+
+    def test_get_results(self):
+        autocomplete = self.autocomplete(
+            LobidAutocompleteAdapter(endpoint=f"{self.url}/gnd/search"),
+            TypeSenseAutocompleteAdapter(
+                server=self.url, token="token", collections="entities"
+            ),
+        )
+        results = autocomplete.get_results("test")
+        self.assertEqual(
+            [result["id"] for result in results], ["https://d-nb.info/gnd/1", "ts1"]
+        )
+        stats = autocomplete.get_stats()
+        self.assertEqual(stats["LobidAutocompleteAdapter"]["calls"], 1)
+        self.assertFalse(stats["LobidAutocompleteAdapter"]["circuit_open"])
+
+    def test_deadline(self):
+        slow = LobidAutocompleteAdapter(endpoint=f"{self.url}/slow", timeout=0.1)
+        autocomplete = self.autocomplete(
+            slow, LobidAutocompleteAdapter(endpoint=f"{self.url}/gnd/search")
+        )
+        start = time.monotonic()
+        results = autocomplete.get_results("test")
+        self.assertLess(time.monotonic() - start, 0.4)
+        # the results of the adapter that answered in time are returned
+        self.assertEqual(len(results), 1)
+        self.assertEqual(slow.metrics.as_dict()["timeouts"], 1)
+
+    def test_deadline_counted_once(self):
+        slow = LobidAutocompleteAdapter(endpoint=f"{self.url}/slow", timeout=0.1)
+        autocomplete = self.autocomplete(slow)
+        self.assertEqual(autocomplete.get_results("test"), [])
+        # wait for the request that missed its deadline to fail in the background
+        for _ in range(50):
+            if slow.metrics.as_dict()["calls"]:
+                break
+            time.sleep(0.02)
+        self.assertEqual(slow.metrics.as_dict()["failures"], 1)
+        self.assertEqual(slow.circuit_breaker.failures, 1)
+
+    @override_settings(
+        APIS_AUTOCOMPLETE_ADAPTER_TIMEOUT=1, APIS_AUTOCOMPLETE_ADAPTER_CACHE_TIMEOUT=0
+    )
+    def test_settings(self):
+        adapter = LobidAutocompleteAdapter()
+        self.assertEqual(adapter.timeout, 1)
+        self.assertEqual(adapter.cache_timeout, 0)
+        self.assertEqual(LobidAutocompleteAdapter(timeout=2).timeout, 2)
+
+    def test_circuit_breaker(self):
+        failing = LobidAutocompleteAdapter(endpoint=f"{self.url}/error")
+        failing.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        autocomplete = self.autocomplete(failing)
+        for _ in range(3):
+            self.assertEqual(autocomplete.get_results("test"), [])
+        stats = failing.metrics.as_dict()
+        self.assertEqual(stats["failures"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertTrue(failing.circuit_breaker.is_open)
+
+        # after the reset timeout one request is let through
+        failing.circuit_breaker.reset_timeout = 0
+        failing.endpoint = f"{self.url}/gnd/search"
+        self.assertEqual(len(autocomplete.get_results("test")), 1)
+        self.assertFalse(failing.circuit_breaker.is_open)
+
+    def test_cache(self):
+        adapter = LobidAutocompleteAdapter(
+            endpoint=f"{self.url}/gnd/search", params={"format": "json"}
+        )
+        autocomplete = self.autocomplete(adapter)
+        first = autocomplete.get_results("test")
+        self.assertEqual(autocomplete.get_results("test"), first)
+        autocomplete.get_results("other")
+        self.assertEqual(len(StubHandler.requests), 2)
+        stats = adapter.metrics.as_dict()
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(stats["cache_misses"], 2)
+        self.assertAlmostEqual(stats["cache_hit_rate"], 1 / 3)
+        # the query is not stored in the params of the adapter
+        self.assertEqual(adapter.params, {"format": "json"})
+
+    def test_cache_max_size(self):
+        adapter = LobidAutocompleteAdapter(endpoint=f"{self.url}/gnd/search")
+        adapter.cache_max_size = 10
+        adapter.get_results("test")
+        adapter.get_results("test")
+        self.assertEqual(len(StubHandler.requests), 2)
+
+    def test_session(self):
+        self.assertIs(get_session(), get_session())
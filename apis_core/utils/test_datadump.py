@@ -0,0 +1,156 @@
+import tempfile
+
+import reversion
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.test import TestCase, override_settings
+from reversion.models import Revision, Version
+
+from apis_core.apis_metainfo.models import Collection, RootObject, Uri
+from apis_core.apis_relations.models import Property
+from apis_core.utils.datadump import datadump_delta, datadump_shards, load_shards
+
+
+class DatadumpShardsTest(TestCase):
+    def setUp(self):
+        user_type = ContentType.objects.get(app_label="auth", model="user")
+        for name in ["foo", "bar", "baz"]:
+            Collection.objects.create(name=name)
+            prop = Property.objects.create(name_forward=f"{name} of")
+            prop.subj_class.add(user_type)
+
+    def test_roundtrip(self):
+        properties = list(
+            Property.objects.order_by("pk").values_list("pk", "name_forward")
+        )
+        collections = list(Collection.objects.order_by("pk").values_list("pk", "name"))
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = datadump_shards(directory, shard_size=2)
+            property_shards = [
+                shard
+                for shard in manifest["shards"]
+                if shard["model"] == "apis_relations.property"
+            ]
+            self.assertEqual(len(property_shards), 2)
+            labels = [shard["model"] for shard in manifest["shards"]]
+            self.assertLess(
+                labels.index("apis_metainfo.rootobject"),
+                labels.index("apis_relations.property"),
+            )
+
+            RootObject.objects.all().delete()
+            Collection.objects.all().delete()
+            self.assertEqual(Property.objects.count(), 0)
+
+            load_shards(directory)
+
+        self.assertEqual(
+            list(Property.objects.order_by("pk").values_list("pk", "name_forward")),
+            properties,
+        )
+        self.assertEqual(
+            list(Collection.objects.order_by("pk").values_list("pk", "name")),
+            collections,
+        )
+        for prop in Property.objects.all():
+            self.assertEqual(prop.subj_class.get().model, "user")
+
+
+@override_settings(APIS_DELETION_REVISIONS=True)
+class DatadumpDeltaTest(TestCase):
+    def setUp(self):
+        with reversion.create_revision():
+            self.foo = Collection.objects.create(name="foo")
+            self.bar = Collection.objects.create(name="bar")
+            self.baz = Collection.objects.create(name="baz")
+
+    def test_delta(self):
+        revision = datadump_delta()["revision"]
+        self.assertEqual(datadump_delta(since_revision=revision)["objects"], [])
+
+        with reversion.create_revision():
+            self.foo.name = "foobar"
+            self.foo.save()
+            qux = Collection.objects.create(name="qux")
+        bar_pk = self.bar.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bar.delete()
+        # changes outside of a revision are not part of the delta
+        self.baz.name = "bazbar"
+        self.baz.save()
+
+        delta = datadump_delta(since_revision=revision)
+        self.assertGreater(delta["revision"], revision)
+        self.assertEqual(
+            sorted((obj["pk"], obj["fields"]["name"]) for obj in delta["objects"]),
+            sorted([(self.foo.pk, "foobar"), (qux.pk, "qux")]),
+        )
+        self.assertIn(
+            {"model": "apis_metainfo.collection", "pk": bar_pk}, delta["deleted"]
+        )
+        self.assertEqual(
+            datadump_delta(since_revision=delta["revision"])["objects"], []
+        )
+
+    def test_deletions(self):
+        revisions = Revision.objects.count()
+        # a bulk delete is stored in one revision
+        with self.captureOnCommitCallbacks(execute=True):
+            Collection.objects.filter(pk__in=[self.foo.pk, self.bar.pk]).delete()
+        self.assertEqual(Revision.objects.count(), revisions + 1)
+        self.assertEqual(Revision.objects.latest("pk").version_set.count(), 2)
+
+        # and so are cascaded deletes
+        prop = Property.objects.create(name_forward="knows")
+        Uri.objects.create(uri="https://example.org/knows", root_object=prop)
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.delete()
+        self.assertEqual(Revision.objects.count(), revisions + 2)
+        self.assertEqual(
+            {
+                version.content_type.model
+                for version in Revision.objects.latest("pk").version_set.all()
+            },
+            {"property", "rootobject", "uri"},
+        )
+
+        # deletions within a revision are added to it
+        with self.captureOnCommitCallbacks(execute=True):
+            with reversion.create_revision():
+                qux = Collection.objects.create(name="qux")
+                baz_pk = self.baz.pk
+                self.baz.delete()
+        self.assertEqual(Revision.objects.count(), revisions + 3)
+        self.assertEqual(
+            {
+                (version.content_type.model, version.object_id)
+                for version in Revision.objects.latest("pk").version_set.all()
+            },
+            {("collection", str(qux.pk)), ("collection", str(baz_pk))},
+        )
+
+    def test_deletions_rolled_back(self):
+        revisions = Revision.objects.count()
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.foo.delete()
+                raise ValueError
+        # the version of the rolled back deletion is not stored
+        bar_pk = self.bar.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bar.delete()
+        self.assertEqual(Revision.objects.count(), revisions + 1)
+        self.assertEqual(
+            [
+                version.object_id
+                for version in Revision.objects.latest("pk").version_set.all()
+            ],
+            [str(bar_pk)],
+        )
+
+    @override_settings(APIS_DELETION_REVISIONS=False)
+    def test_deletions_disabled(self):
+        versions = Version.objects.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.foo.delete()
+        self.assertEqual(Version.objects.count(), versions)
@@ -1,9 +1,17 @@
 # SPDX-FileCopyrightText: 2023 Birger Schacht
 # SPDX-License-Identifier: MIT
 
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 
-from .filtermethods import construct_lookup
+from apis_core.apis_relations.models import Property, Triple
+
+from .filtermethods import (
+    construct_lookup,
+    related_entity_name,
+    related_property_name,
+    related_to,
+)
 
 lookups = {
     "*foo*": ("__icontains", "foo"),
@@ -18,3 +26,49 @@ class FilterMethodstest(TestCase):
     def test_lookup(self):
         for lookup in lookups:
             self.assertEqual(construct_lookup(lookup), lookups[lookup])
+
+
+class RelatedFilterMethodsTest(TestCase):
+    def setUp(self):
+        # properties are root objects, so they are used as entities
+        contenttype = ContentType.objects.get_for_model(Property)
+        self.prop = Property.objects.create(
+            name_forward="is friend of", name_reverse="has friend"
+        )
+        self.other_prop = Property.objects.create(
+            name_forward="is enemy of", name_reverse="has enemy"
+        )
+        for prop in [self.prop, self.other_prop]:
+            prop.subj_class.add(contenttype)
+            prop.obj_class.add(contenttype)
+        self.alice = Property.objects.create(name_forward="alice")
+        self.bob = Property.objects.create(name_forward="bob")
+        self.carol = Property.objects.create(name_forward="carol")
+        Triple.objects.create(subj=self.alice, obj=self.bob, prop=self.prop)
+        Triple.objects.create(subj=self.alice, obj=self.carol, prop=self.prop)
+        Triple.objects.create(subj=self.carol, obj=self.bob, prop=self.other_prop)
+
+    def test_related_to(self):
+        queryset = Property.objects.all()
+        alice = Property.objects.filter(pk=self.alice.pk).values("pk")
+        self.assertCountEqual(
+            related_to(queryset, subjects=alice), [self.bob, self.carol]
+        )
+        self.assertCountEqual(related_to(queryset, objects=alice), [])
+        bob = Property.objects.filter(pk=self.bob.pk).values("pk")
+        self.assertCountEqual(
+            related_to(queryset, subjects=bob, objects=bob), [self.alice, self.carol]
+        )
+
+    def test_related_property_name(self):
+        queryset = Property.objects.all()
+        results = related_property_name(queryset, "related_property", "friend")
+        # alice is related twice, but is returned once
+        self.assertCountEqual(results, [self.alice, self.bob, self.carol])
+        results = related_property_name(queryset, "related_property", '"has enemy"')
+        self.assertCountEqual(results, [self.carol, self.bob])
+
+    def test_related_entity_name(self):
+        # there are no models with a `name` field in the test setup
+        results = related_entity_name(Property.objects.all(), "related", "bob")
+        self.assertCountEqual(results, [])
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+
+from apis_core.apis_metainfo.models import Uri
+from apis_core.apis_metainfo.resolvers import uri_cache
+from apis_core.apis_relations.models import Property
+from apis_core.generic.importers import GenericImporter
+from apis_core.utils.helpers import get_or_create_objects_from_uris
+
+
+class PropertyImporter(GenericImporter):
+    def request(self, uri):
+        if uri.endswith("broken"):
+            return {}
+        return {"name_forward": uri.rsplit("/", 1)[-1]}
+
+
+@mock.patch("apis_core.utils.helpers.get_override", return_value=PropertyImporter)
+class GetOrCreateObjectsFromUrisTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prop = Property.objects.create(name_forward="knows")
+        Uri.objects.create(uri="https://example.org/entity/knows", root_object=cls.prop)
+
+    def setUp(self):
+        uri_cache.clear()
+
+    def test_get_or_create_objects_from_uris(self, get_override):
+        ids, errors = get_or_create_objects_from_uris(
+            [
+                "https://example.org/entity/knows",
+                "https://example.org/entity/likes",
+                "https://example.org/entity/broken",
+                "likes",
+            ],
+            Property,
+            max_workers=1,
+        )
+        likes = Property.objects.get(name_forward="likes")
+        self.assertEqual(
+            ids,
+            {
+                "https://example.org/entity/knows": self.prop.pk,
+                "https://example.org/entity/likes": likes.pk,
+            },
+        )
+        self.assertEqual(list(errors), ["likes", "https://example.org/entity/broken"])
+        self.assertEqual(
+            Uri.objects.get(uri="https://example.org/entity/likes").root_object, likes
+        )
+
+        # existing uris are resolved with one query
+        with self.assertNumQueries(1):
+            ids, errors = get_or_create_objects_from_uris(
+                [
+                    "https://example.org/entity/knows",
+                    "https://example.org/entity/likes",
+                ],
+                Property,
+            )
+        self.assertEqual(len(ids), 2)
+
+
+@mock.patch("apis_core.utils.helpers.get_override", return_value=PropertyImporter)
+class GetOrCreateObjectsFromUrisConcurrentTestCase(TransactionTestCase):
+    # on SQLite the imports run one after the other, but the duplicate
+    # uri still has to be resolved to the object of the first import
+    def setUp(self):
+        uri_cache.clear()
+
+    def test_concurrent_imports(self, get_override):
+        uris = [f"https://example.org/entity/{i}" for i in range(10)]
+        # the same uri twice, one of the imports is rolled back
+        uris.append("https://example.org/entity/0/")
+        with mock.patch.object(
+            PropertyImporter, "clean_uri", lambda self, uri: uri.rstrip("/")
+        ):
+            ids, errors = get_or_create_objects_from_uris(uris, Property, max_workers=4)
+        self.assertEqual(errors, {})
+        self.assertEqual(len(ids), 11)
+        self.assertEqual(
+            ids["https://example.org/entity/0"], ids["https://example.org/entity/0/"]
+        )
+        self.assertEqual(Property.objects.count(), 10)
+        self.assertEqual(Uri.objects.count(), 10)
@@ -21,3 +21,13 @@ class NormalizeTest(TestCase):
         uri = "https://d-nb.info/gnd/118540475"
         res = "https://d-nb.info/gnd/118540475"
         self.assertEqual(normalize.clean_uri(uri), res)
+
+    def test_clean_uris(self):
+        uris = [
+            "https://www.geonames.org/2783029/achensee.html",
+            "https://d-nb.info/gnd/118540475",
+        ]
+        self.assertEqual(
+            normalize.clean_uris(uris),
+            {uri: normalize.clean_uri(uri) for uri in uris},
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("apis_metainfo", "0011_alter_rootobject_deprecated_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Person",
+            fields=[
+                (
+                    "rootobject_ptr",
+                    models.OneToOneField(
+                        auto_created=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        parent_link=True,
+                        primary_key=True,
+                        serialize=False,
+                        to="apis_metainfo.rootobject",
+                    ),
+                ),
+                ("name", models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                "abstract": False,
+            },
+            bases=("apis_metainfo.rootobject",),
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import models
+
+from apis_core.apis_entities.models import AbstractEntity
+
+
+class Person(AbstractEntity):
+    """
+    An entity model for the tests, projects define theirs in `apis_ontology`.
+    """
+
+    name = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return self.name
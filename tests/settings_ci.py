@@ -19,6 +19,7 @@ INSTALLED_APPS = [
     "apis_core.apis_vocabularies",
     "apis_core.generic",
     "apis_core.collections",
+    "tests.entities",
     "reversion",
     # ui stuff
     "crispy_forms",
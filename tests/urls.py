@@ -0,0 +1,6 @@
+from django.urls import include, path
+
+# the APIS urls expect to be included using the `apis` namespace
+urlpatterns = [
+    path("apis/", include("apis_core.urls", namespace="apis")),
+]